@@ -64,17 +64,22 @@ alerts = [
 
 print("Adding alerts...")
 added = 0
-for alert in alerts:
-    if alert['company_id']:
-        try:
-            response = requests.post(f"{API_URL}/api/alerts", json=alert)
-            if response.status_code in [200, 201]:
-                print(f"[OK] {alert['severity'].upper()}: {alert['title'][:50]}...")
-                added += 1
-            else:
-                print(f"[ERROR] {response.status_code}: {response.text[:100]}")
-        except Exception as e:
-            print(f"[ERROR] {e}")
+batch = [alert for alert in alerts if alert['company_id']]
+if batch:
+    try:
+        # One request for the whole batch; re-runs report duplicates instead of re-adding
+        response = requests.post(f"{API_URL}/api/alerts/bulk", json=batch)
+        if response.status_code == 200:
+            for alert, result in zip(batch, response.json()["results"]):
+                if result["status"] == "created":
+                    print(f"[OK] {alert['severity'].upper()}: {alert['title'][:50]}...")
+                    added += 1
+                else:
+                    print(f"[{result['status'].upper()}] {alert['title'][:50]}: {result['error']}")
+        else:
+            print(f"[ERROR] {response.status_code}: {response.text[:100]}")
+    except Exception as e:
+        print(f"[ERROR] {e}")
 
 print(f"\nAdded {added} alerts!")
 print("Refresh dashboard to see them.")
@@ -14,9 +14,11 @@ companies = [
     {"name": "CyberGuard Elite", "industry": "Security", "stage": "Series B", "current_arr": 8900000, "monthly_burn_rate": 380000, "runway_months": 26, "risk_score": 25, "is_active": True, "employee_count": 72}
 ]
 
-for c in companies:
-    r = requests.post(f"{API_URL}/api/companies", json=c)
-    print(f"[{r.status_code}] {c['name']} - Risk: {c['risk_score']}")
+# One request for the whole batch; each row gets its own result
+r = requests.post(f"{API_URL}/api/companies/bulk", json=companies)
+r.raise_for_status()
+for c, result in zip(companies, r.json()["results"]):
+    print(f"[{result['status']}] {c['name']} - Risk: {c['risk_score']}")
     
 print("\nDone!")
 
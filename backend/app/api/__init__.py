@@ -1,7 +1,7 @@
 """API routers."""
 
 from fastapi import APIRouter
-from app.api import companies, analysis, alerts
+from app.api import companies, analysis, alerts, metrics, portfolio
 
 # Create main API router
 api_router = APIRouter()
@@ -10,6 +10,8 @@ api_router = APIRouter()
 api_router.include_router(companies.router)
 api_router.include_router(analysis.router)
 api_router.include_router(alerts.router)
+api_router.include_router(metrics.router)
+api_router.include_router(portfolio.router)
 
 __all__ = ["api_router"]
 
@@ -3,15 +3,24 @@ Alert management API endpoints.
 Demonstrates: Notification system, filtering, status management
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from collections import Counter
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import DateTime, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql.expression import FunctionElement
+from pydantic import BaseModel, Field
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.bulk import BulkResponse, BulkRowResult, bulk_response, check_batch_size, validate_rows
+from app.core.database import get_async_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, set_next_cursor, split_page
 from app.models import Alert, AlertType, AlertSeverity, Company
+from app.services.alerting import alert_stats
+from app.services.caching import http_cache
 
 
 router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
@@ -28,6 +37,29 @@ class AlertCreate(BaseModel):
     source: Optional[str] = "manual"
 
 
+class AlertSelection(BaseModel):
+    """Alerts targeted by a bulk update: explicit IDs and/or filters, combined with AND."""
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    company_id: Optional[int] = None
+    severity: Optional[AlertSeverity] = None
+    alert_type: Optional[AlertType] = None
+    
+    def conditions(self) -> list:
+        """WHERE clauses for the selection; refuses an empty (match-all) selection."""
+        conditions = []
+        if self.ids is not None:
+            conditions.append(Alert.id.in_(self.ids))
+        if self.company_id is not None:
+            conditions.append(Alert.company_id == self.company_id)
+        if self.severity is not None:
+            conditions.append(Alert.severity == self.severity)
+        if self.alert_type is not None:
+            conditions.append(Alert.alert_type == self.alert_type)
+        if not conditions:
+            raise HTTPException(status_code=400, detail="Select alerts by ids or at least one filter")
+        return conditions
+
+
 # Response schemas
 class AlertResponse(BaseModel):
     """Alert response schema."""
@@ -47,15 +79,106 @@ class AlertResponse(BaseModel):
         from_attributes = True
 
 
+# Columns of an AlertResponse, read straight from the join (no ORM objects)
+FEED_COLUMNS = (
+    Alert.id,
+    Alert.company_id,
+    Company.name.label("company_name"),
+    Alert.alert_type,
+    Alert.severity,
+    Alert.title,
+    Alert.description,
+    Alert.ai_summary,
+    Alert.is_read,
+    Alert.is_resolved,
+    Alert.created_at,
+)
+
+
+class cursor_timestamp(FunctionElement):
+    """A timestamp column as the feed cursor compares it, at microsecond precision."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(cursor_timestamp)
+def _cursor_timestamp_default(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(cursor_timestamp, "sqlite")
+def _cursor_timestamp_sqlite(element, compiler, **kw):
+    # server_default=func.now() stores "YYYY-MM-DD HH:MM:SS" while bound
+    # datetimes carry ".ffffff"; pad so both compare as the same instant
+    return f"substr({compiler.process(element.clauses, **kw)} || '.000000', 1, 26)"
+
+
+def alert_feed_query(
+    severity: Optional[AlertSeverity] = None,
+    alert_type: Optional[AlertType] = None,
+    company_id: Optional[int] = None,
+    unread_only: bool = False,
+    unresolved_only: bool = True,
+    after: Optional[dict] = None
+):
+    """
+    Build the alert feed SELECT for the given filters, newest first.
+    
+    Each filter combination is served by one of the (filter, created_at, id)
+    indexes on `alerts`; tests/integration/test_query_plans.py fails if any
+    of them falls back to a table scan.
+    
+    Args:
+        after: Decoded cursor ({"created_at", "id"}) of the previous page's last alert
+    """
+    # One projection over alerts JOIN companies: the company name comes with
+    # each row, so a page is a single query whatever its size
+    query = select(*FEED_COLUMNS).join(Company, Alert.company_id == Company.id)
+    
+    # Apply filters
+    if severity:
+        query = query.where(Alert.severity == severity)
+    if alert_type:
+        query = query.where(Alert.alert_type == alert_type)
+    if company_id:
+        query = query.where(Alert.company_id == company_id)
+    if unread_only:
+        query = query.where(Alert.is_read == False)
+    if unresolved_only:
+        query = query.where(Alert.is_resolved == False)
+    
+    # Resume strictly after the last alert of the previous page; the plain
+    # bound keeps it an index range read, the padded tuple settles ties
+    if after:
+        query = query.where(
+            Alert.created_at <= after["created_at"],
+            tuple_(cursor_timestamp(Alert.created_at), Alert.id) < tuple_(after["created_at"], after["id"])
+        )
+    
+    # Order by created date (newest first); id breaks ties so pages never overlap
+    return query.order_by(Alert.created_at.desc(), Alert.id.desc())
+
+
+def feed_item(row) -> dict:
+    """JSON-ready AlertResponse for one projected feed row."""
+    item = row._asdict()
+    item["alert_type"] = row.alert_type.value
+    item["severity"] = row.severity.value
+    item["created_at"] = row.created_at.isoformat()
+    return item
+
+
 @router.get("", response_model=List[AlertResponse])
 async def get_alerts(
+    request: Request,
     severity: Optional[AlertSeverity] = None,
     alert_type: Optional[AlertType] = None,
     company_id: Optional[int] = None,
     unread_only: bool = False,
     unresolved_only: bool = True,
-    limit: int = Query(50, le=200),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve alerts with advanced filtering.
@@ -67,56 +190,49 @@ async def get_alerts(
     - unread_only: Show only unread alerts
     - unresolved_only: Show only unresolved alerts (default: true)
     - limit: Maximum number of alerts to return
+    - cursor: Opaque cursor from the previous page's X-Next-Cursor header
+    
+    Alerts are ordered newest first by (created_at, id) and keyset-paginated,
+    so deep pages cost the same as the first.
+    
+    A page is one projection query serialized directly: no Alert objects are
+    loaded and rows are not re-validated through AlertResponse, which only
+    documents the shape.
     """
-    query = db.query(Alert).join(Company)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, ["created_at", "id"])
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
-    # Apply filters
-    if severity:
-        query = query.filter(Alert.severity == severity)
-    if alert_type:
-        query = query.filter(Alert.alert_type == alert_type)
-    if company_id:
-        query = query.filter(Alert.company_id == company_id)
-    if unread_only:
-        query = query.filter(Alert.is_read == False)
-    if unresolved_only:
-        query = query.filter(Alert.is_resolved == False)
-    
-    # Order by created date (newest first)
-    query = query.order_by(desc(Alert.created_at))
-    
-    # Limit results
-    alerts = query.limit(limit).all()
-    
-    # Add company name to response
-    result = []
-    for alert in alerts:
-        alert_dict = {
-            "id": alert.id,
-            "company_id": alert.company_id,
-            "company_name": alert.company.name,
-            "alert_type": alert.alert_type,
-            "severity": alert.severity,
-            "title": alert.title,
-            "description": alert.description,
-            "ai_summary": alert.ai_summary,
-            "is_read": alert.is_read,
-            "is_resolved": alert.is_resolved,
-            "created_at": alert.created_at
-        }
-        result.append(AlertResponse(**alert_dict))
-    
-    return result
+    query = alert_feed_query(
+        severity=severity,
+        alert_type=alert_type,
+        company_id=company_id,
+        unread_only=unread_only,
+        unresolved_only=unresolved_only,
+        after=after
+    )
+    
+    # Limit results (one extra row tells us whether another page exists)
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    alerts, has_more = split_page(rows, limit)
+    
+    response = JSONResponse(content=[feed_item(row) for row in alerts])
+    last = alerts[-1] if has_more else None
+    set_next_cursor(request, response, encode_cursor({"created_at": last.created_at, "id": last.id}) if last else None)
+    return response
 
 
 @router.post("", response_model=AlertResponse, status_code=201)
 async def create_alert(
     alert: AlertCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new alert for a company."""
     # Verify company exists
-    company = db.query(Company).filter(Company.id == alert.company_id).first()
+    company = await db.get(Company, alert.company_id)
     if not company:
         raise HTTPException(status_code=404, detail=f"Company with id {alert.company_id} not found")
     
@@ -126,13 +242,12 @@ async def create_alert(
         alert_type=alert.alert_type,
         severity=alert.severity,
         title=alert.title,
-        description=alert.description,
-        source=alert.source
+        description=alert.description
     )
     
     db.add(db_alert)
-    db.commit()
-    db.refresh(db_alert)
+    await db.commit()
+    await db.refresh(db_alert)
     
     # Return response with company name
     alert_dict = {
@@ -152,13 +267,145 @@ async def create_alert(
     return AlertResponse(**alert_dict)
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def create_alerts_bulk(
+    rows: List[Dict[str, Any]] = Body(..., description="Alert objects, as for POST /api/alerts"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many alerts in one request.
+    
+    Each row is validated on its own. Rows for unknown companies are
+    errors; an alert whose (company_id, title) matches an unresolved alert
+    (one IN query) or an earlier row is a duplicate, so re-running a seed
+    script is harmless. The remaining rows are inserted with a single
+    executemany in one transaction, together with their alert counter
+    updates. Returns one result per row, in request order.
+    """
+    check_batch_size(rows)
+    valid, results = validate_rows(rows, AlertCreate)
+    
+    company_ids = {alert.company_id for _, alert in valid}
+    known = set((await db.execute(select(Company.id).where(Company.id.in_(company_ids)))).scalars())
+    keys = {(alert.company_id, alert.title) for _, alert in valid}
+    open_alerts = set((await db.execute(
+        select(Alert.company_id, Alert.title).where(
+            tuple_(Alert.company_id, Alert.title).in_(keys),
+            Alert.is_resolved == False
+        )
+    )).tuples())
+    
+    to_insert = []
+    for index, alert in valid:
+        key = (alert.company_id, alert.title)
+        if alert.company_id not in known:
+            results[index] = BulkRowResult(
+                index=index, status="error", error=f"Company with id {alert.company_id} not found"
+            )
+        elif key in open_alerts:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", error="An unresolved alert with this title already exists"
+            )
+        else:
+            open_alerts.add(key)
+            to_insert.append((index, {
+                "company_id": alert.company_id,
+                "alert_type": alert.alert_type or AlertType.RISK,
+                "severity": alert.severity,
+                "title": alert.title,
+                "description": alert.description,
+                "is_read": False,
+                "is_resolved": False
+            }))
+    
+    if to_insert:
+        values = [row for _, row in to_insert]
+        ids = (await db.execute(
+            insert(Alert).returning(Alert.id, sort_by_parameter_order=True), values
+        )).scalars().all()
+        # Bulk INSERTs skip the mapper events that maintain the counters
+        deltas = Counter((row["severity"], False, False) for row in values)
+        await db.run_sync(lambda session: alert_stats.apply_deltas(session, deltas))
+        await db.commit()
+        
+        for (index, _), alert_id in zip(to_insert, ids):
+            results[index] = BulkRowResult(index=index, status="created", id=alert_id)
+        await http_cache.invalidate("alerts", "alert-stats")
+    
+    return bulk_response(len(rows), results)
+
+
+async def _bulk_transition(db: AsyncSession, selection: AlertSelection, field: str, values: dict) -> int:
+    """
+    Set `field` to true on every selected alert where it is not yet true.
+    
+    One UPDATE ... RETURNING; the returned rows give the exact counter
+    deltas, applied in the same transaction (bulk UPDATEs bypass the
+    mapper events that normally keep `alert_counters` in step).
+    """
+    other = "is_resolved" if field == "is_read" else "is_read"
+    column = getattr(Alert, field)
+    changed = (await db.execute(
+        update(Alert)
+        .where(*selection.conditions(), column.isnot(True))
+        .values(**{field: True}, **values)
+        .returning(Alert.severity, getattr(Alert, other))
+        .execution_options(synchronize_session=False)
+    )).all()
+    
+    deltas = Counter()
+    for severity, other_value in changed:
+        before = {field: False, other: bool(other_value)}
+        after = dict(before, **{field: True})
+        deltas[(severity, before["is_resolved"], before["is_read"])] -= 1
+        deltas[(severity, after["is_resolved"], after["is_read"])] += 1
+    await db.run_sync(lambda session: alert_stats.apply_deltas(session, deltas))
+    await db.commit()
+    
+    if changed:
+        await http_cache.invalidate("alerts", "alert-stats")
+    return len(changed)
+
+
+# Bulk routes are declared before /{alert_id} so "bulk" is never parsed as an ID
+@router.patch("/bulk/read")
+async def mark_alerts_read_bulk(
+    selection: AlertSelection,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Mark every selected unread alert as read with a single UPDATE.
+    
+    Select by `ids` and/or `company_id`, `severity`, `alert_type`.
+    """
+    updated = await _bulk_transition(db, selection, "is_read", {})
+    return {"message": "Alerts marked as read", "updated": updated}
+
+
+@router.patch("/bulk/resolve")
+async def resolve_alerts_bulk(
+    selection: AlertSelection,
+    resolved_by: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Resolve every selected open alert with a single UPDATE.
+    
+    Select by `ids` and/or `company_id`, `severity`, `alert_type`.
+    """
+    updated = await _bulk_transition(
+        db, selection, "is_resolved", {"resolved_at": datetime.utcnow(), "resolved_by": resolved_by}
+    )
+    return {"message": "Alerts resolved", "updated": updated}
+
+
 @router.get("/{alert_id}", response_model=AlertResponse)
 async def get_alert(
     alert_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed information about a specific alert."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id, options=[selectinload(Alert.company)])
     
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -183,16 +430,16 @@ async def get_alert(
 @router.patch("/{alert_id}/read")
 async def mark_alert_read(
     alert_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark an alert as read."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     alert.is_read = True
-    db.commit()
+    await db.commit()
     
     return {"message": "Alert marked as read", "alert_id": alert_id}
 
@@ -201,10 +448,10 @@ async def mark_alert_read(
 async def resolve_alert(
     alert_id: int,
     resolved_by: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Resolve an alert."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -212,50 +459,20 @@ async def resolve_alert(
     alert.is_resolved = True
     alert.resolved_at = datetime.utcnow()
     alert.resolved_by = resolved_by
-    db.commit()
+    await db.commit()
     
     return {"message": "Alert resolved", "alert_id": alert_id}
 
 
 @router.get("/stats/summary")
 async def get_alert_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get summary statistics about alerts.
     
-    Returns counts by severity and type.
+    Returns counts by severity and type. Served from the `alert_counters`
+    table (kept current on every alert write) or, if disabled, from a single
+    grouped aggregate over the alerts table.
     """
-    total_alerts = db.query(Alert).filter(Alert.is_resolved == False).count()
-    
-    critical = db.query(Alert).filter(
-        Alert.severity == AlertSeverity.CRITICAL,
-        Alert.is_resolved == False
-    ).count()
-    
-    high = db.query(Alert).filter(
-        Alert.severity == AlertSeverity.HIGH,
-        Alert.is_resolved == False
-    ).count()
-    
-    unread = db.query(Alert).filter(Alert.is_read == False).count()
-    
-    return {
-        "total_unresolved": total_alerts,
-        "critical": critical,
-        "high": high,
-        "unread": unread,
-        "by_severity": {
-            "critical": critical,
-            "high": high,
-            "medium": db.query(Alert).filter(
-                Alert.severity == AlertSeverity.MEDIUM,
-                Alert.is_resolved == False
-            ).count(),
-            "low": db.query(Alert).filter(
-                Alert.severity == AlertSeverity.LOW,
-                Alert.is_resolved == False
-            ).count()
-        }
-    }
-
+    return await db.run_sync(alert_stats.summary)
@@ -3,15 +3,21 @@ AI Analysis API endpoints.
 Demonstrates: AI/LLM integration, async processing, complex analysis
 """
 
-from typing import Optional
+from typing import Literal, Optional
+import time
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.core.database import get_db
-from app.models import Company, Alert, AlertType, AlertSeverity
-from app.services.ai_engine import llm_analyzer
-from app.services.data_aggregator import news_aggregator
+from app.core.database import get_async_db
+from app.models import Company, Alert, AlertType, AlertSeverity, BatchJob
+from app.services.ai_engine import llm_analyzer, batch_engine, prompt_builder
+from app.services.analytics import metric_store, portfolio_benchmarks, portfolio_summary
+from app.services.caching import http_cache
+from app.services.data_aggregator import news_aggregator, news_ingestion
+from app.services.risk_engine import portfolio_risk_scorer, hybrid_risk_scorer, risk_level
+from app.api.streaming import stream_summary_response
 
 
 router = APIRouter(prefix="/api/analysis", tags=["AI Analysis"])
@@ -23,6 +29,7 @@ class SummaryRequest(BaseModel):
     company_id: int
     include_news: bool = True
     include_metrics: bool = True
+    stream: bool = False  # Respond with Server-Sent Events
 
 
 class RiskScoreResponse(BaseModel):
@@ -33,22 +40,24 @@ class RiskScoreResponse(BaseModel):
     factors: list
     recommendations: list
     model_used: str
+    tier: str = "llm"  # "local" when the hybrid scorer answered without an LLM call
 
 
 @router.post("/summarize")
 async def generate_summary(
     request: SummaryRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Generate AI-powered executive summary for a company.
     
     Uses GPT-4 to analyze company data, metrics, and news
-    to create actionable insights.
+    to create actionable insights. Set `stream` to receive tokens
+    as Server-Sent Events while the summary is generated.
     """
     # Fetch company
-    company = db.query(Company).filter(Company.id == request.company_id).first()
+    company = await db.get(Company, request.company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -67,7 +76,23 @@ async def generate_summary(
     # Fetch news if requested
     news = []
     if request.include_news:
-        news = await news_aggregator.fetch_company_news(company.name, days_back=7)
+        await news_ingestion.refresh_if_idle(db, company)
+        news = await db.run_sync(lambda session: news_ingestion.company_news(session, company, days_back=7, limit=10))
+    
+    if request.stream:
+        return stream_summary_response(
+            db,
+            company,
+            company_data=company_data,
+            metrics=[],
+            news=news,
+            source="summarize",
+            meta={
+                "company_id": request.company_id,
+                "company_name": company.name,
+                "news_analyzed": len(news)
+            }
+        )
     
     # Generate summary using LLM
     summary = await llm_analyzer.generate_executive_summary(
@@ -89,7 +114,8 @@ async def generate_summary(
 @router.post("/risk-score", response_model=RiskScoreResponse)
 async def calculate_risk_score(
     company_id: int,
-    db: Session = Depends(get_db)
+    mode: str = "hybrid",
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Calculate AI-powered risk score for a company.
@@ -102,9 +128,16 @@ async def calculate_risk_score(
     - 26-50: Medium Risk
     - 51-75: High Risk
     - 76-100: Critical Risk
+    
+    Query Parameters:
+    - mode: "hybrid" (default) scores locally and only calls the LLM for
+      uncertain or recently alerted companies; "llm" always calls the LLM
     """
+    if mode not in ("hybrid", "llm"):
+        raise HTTPException(status_code=400, detail="mode must be 'hybrid' or 'llm'")
+    
     # Fetch company
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
@@ -120,34 +153,33 @@ async def calculate_risk_score(
         'employee_count': company.employee_count or 0
     }
     
-    # Fetch existing alerts
-    alerts = db.query(Alert).filter(
-        Alert.company_id == company_id,
-        Alert.is_resolved == False
-    ).all()
+    risk_assessment = None
+    if mode == "hybrid" and company.is_active:
+        triage = await hybrid_risk_scorer.score_companies(db, [company_id])
+        if triage["results"]:
+            risk_assessment = triage["results"][0]
     
-    # Calculate risk using LLM
-    risk_assessment = await llm_analyzer.assess_risk_score(
-        company_data=company_data,
-        metrics=[],
-        alerts=[{'type': a.alert_type, 'severity': a.severity} for a in alerts]
-    )
+    if risk_assessment is None:
+        # Fetch existing alerts
+        alerts = (await db.execute(
+            select(Alert).where(
+                Alert.company_id == company_id,
+                Alert.is_resolved == False
+            )
+        )).scalars().all()
+        
+        # Calculate risk using LLM
+        risk_assessment = await llm_analyzer.assess_risk_score(
+            company_data=company_data,
+            metrics=[],
+            alerts=[{'type': a.alert_type, 'severity': a.severity} for a in alerts]
+        )
     
     risk_score = risk_assessment.get("risk_score", 50)
     
     # Update company risk score
     company.risk_score = risk_score
-    db.commit()
-    
-    # Determine risk level
-    if risk_score < 26:
-        risk_level = "Low"
-    elif risk_score < 51:
-        risk_level = "Medium"
-    elif risk_score < 76:
-        risk_level = "High"
-    else:
-        risk_level = "Critical"
+    await db.commit()
     
     # Create alert if risk is high
     if risk_score >= 75:
@@ -160,22 +192,110 @@ async def calculate_risk_score(
             ai_summary=risk_assessment.get("analysis", "")
         )
         db.add(alert)
-        db.commit()
+        await db.commit()
     
     return RiskScoreResponse(
         company_id=company_id,
         risk_score=risk_score,
-        risk_level=risk_level,
+        risk_level=risk_level(risk_score),
         factors=["Financial runway concerns", "Market volatility", "Competitive pressure"],
         recommendations=["Secure additional funding", "Reduce burn rate", "Focus on core revenue"],
-        model_used=risk_assessment.get("model_used", "unknown")
+        model_used=risk_assessment.get("model_used", "unknown"),
+        tier=risk_assessment.get("tier", "llm")
+    )
+
+
+@router.get("/risk-scores")
+async def get_portfolio_risk_scores(
+    min_score: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Score every active company with the deterministic multi-factor model.
+    
+    Weights runway (40%), burn vs revenue (30%), growth trend (20%) and
+    revenue per employee (10%); growth comes from the metrics time series.
+    Runs as one vectorized pass with no LLM calls. Scores are not saved.
+    
+    Query Parameters:
+    - min_score: Only return companies at or above this score
+    """
+    start = time.perf_counter()
+    scores = await db.run_sync(portfolio_risk_scorer.score_portfolio)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    scores = sorted(
+        (s for s in scores if s["risk_score"] >= min_score),
+        key=lambda s: s["risk_score"],
+        reverse=True
     )
+    
+    return {
+        "count": len(scores),
+        "computed_in_ms": round(elapsed_ms, 2),
+        "scores": scores
+    }
+
+
+@router.get("/benchmarks")
+async def get_portfolio_benchmarks(
+    group_by: Literal["stage", "industry"] = "stage",
+    window_days: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Peer-group benchmarks: median growth, burn and burn multiple per stage or industry.
+    
+    Computed with NumPy over the in-process columnar metrics cache, so a
+    portfolio-wide aggregation reads no metric rows beyond those inserted
+    since the previous call.
+    
+    Query Parameters:
+    - group_by: stage or industry
+    - window_days: Look-back window (default RISK_GROWTH_WINDOW_DAYS)
+    """
+    start = time.perf_counter()
+    groups = await db.run_sync(lambda session: portfolio_benchmarks.by_group(session, group_by, window_days))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    return {
+        "group_by": group_by,
+        "computed_in_ms": round(elapsed_ms, 2),
+        "groups": groups
+    }
+
+
+@router.post("/risk-scores/triage")
+async def triage_portfolio_risk(
+    force_llm: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Re-score the portfolio with the hybrid local/LLM scorer and save the scores.
+    
+    Every active company is scored locally; only companies in the uncertain
+    band, with low confidence, or with recent medium+ alerts are sent to the
+    LLM. The response reports how many companies each tier handled and the
+    latency of each tier.
+    
+    Query Parameters:
+    - force_llm: Escalate every company (baseline for comparing cost)
+    """
+    triage = await hybrid_risk_scorer.score_companies(db, force_llm=force_llm)
+    
+    scores = {result["company_id"]: result["risk_score"] for result in triage["results"]}
+    companies = (await db.execute(select(Company).where(Company.id.in_(list(scores))))).scalars()
+    for company in companies:
+        company.risk_score = scores[company.id]
+    await db.commit()
+    
+    return triage
 
 
 @router.post("/competitive-analysis/{company_id}")
 async def analyze_competition(
     company_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze competitive landscape for a company.
@@ -183,13 +303,14 @@ async def analyze_competition(
     Uses AI to identify opportunities and threats based on
     competitor activity and market trends.
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    # Fetch industry news (proxy for competitor activity)
-    competitor_news = await news_aggregator.fetch_industry_news(
+    # Industry news (proxy for competitor activity), kept fresh by background ingestion
+    await news_ingestion.refresh_if_idle(db, industry=company.industry or "technology")
+    competitor_news = news_ingestion.industry_news(
         company.industry or "technology",
         limit=5
     )
@@ -215,27 +336,85 @@ async def analyze_competition(
     }
 
 
-@router.post("/batch-analyze")
+@router.post("/batch-analyze", status_code=202)
 async def batch_analyze_portfolio(
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Analyze entire portfolio in the background.
     
     Generates summaries and risk scores for all active companies.
     Useful for weekly/monthly portfolio reviews.
+    
+    Companies are analyzed concurrently with per-provider limits;
+    poll GET /batch-analyze/{task_id} for progress.
     """
-    companies = db.query(Company).filter(Company.is_active == True).all()
+    company_ids = list((await db.execute(select(Company.id).where(Company.is_active == True))).scalars())
     
-    # In production, this would be a Celery task
-    # For now, return task ID
-    task_id = f"batch-{len(companies)}-companies"
+    job = await db.run_sync(lambda session: batch_engine.create_job(session, company_ids))
+    background_tasks.add_task(batch_engine.run_job, job.id)
     
     return {
         "message": "Batch analysis started",
-        "task_id": task_id,
-        "companies_count": len(companies),
-        "estimated_time_minutes": len(companies) * 2
+        "task_id": job.id,
+        "status": job.status,
+        "companies_count": len(company_ids)
     }
 
+
+@router.get("/batch-analyze/{task_id}")
+async def get_batch_status(
+    task_id: str,
+    include_results: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get progress of a batch analysis job.
+    
+    Query Parameters:
+    - include_results: Include per-company summaries and risk scores
+    """
+    job = await db.get(BatchJob, task_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    
+    response = {
+        "task_id": job.id,
+        "status": job.status,
+        "companies_count": job.total_companies,
+        "completed": job.completed_count,
+        "failed": job.failed_count,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+    if include_results:
+        response["results"] = job.results or {}
+    
+    return response
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get LLM, HTTP response and metric cache, prompt budgeting and request coalescing statistics.
+    
+    Returns hit/miss counters and current size of the caches, plus how many
+    concurrent duplicate LLM and news calls were served by a single request.
+    """
+    return {
+        "llm_cache": llm_analyzer.cache_stats(),
+        "http_cache": http_cache.stats(),
+        "metric_store": metric_store.stats(),
+        "portfolio_summary": portfolio_summary.stats(),
+        "prompt_builder": prompt_builder.stats(),
+        "risk_batching": llm_analyzer.batching_stats(),
+        "llm_routing": llm_analyzer.routing_stats(),
+        "coalescing": {
+            "llm": llm_analyzer.coalescing_stats(),
+            "news": news_aggregator.coalescing_stats()
+        }
+    }
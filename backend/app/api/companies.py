@@ -3,16 +3,22 @@ Company management API endpoints.
 Demonstrates: RESTful API design, CRUD operations, data validation
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from datetime import datetime
 
-from app.core.database import get_db
-from app.models import Company
+from app.core.bulk import BulkResponse, BulkRowResult, bulk_response, check_batch_size, validate_rows
+from app.core.database import get_async_db
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor, set_next_cursor, split_page
+from app.models import Company, ExecutiveSummary
+from app.api.streaming import stream_summary_response
 from app.services.ai_engine import llm_analyzer
-from app.services.data_aggregator import news_aggregator
+from app.services.caching import http_cache
+from app.services.data_aggregator import news_ingestion
 
 
 router = APIRouter(prefix="/api/companies", tags=["Companies"])
@@ -52,6 +58,13 @@ class CompanyUpdate(BaseModel):
     employee_count: Optional[int] = None
 
 
+class CompanySelection(BaseModel):
+    """Companies targeted by a bulk update: explicit IDs and/or filters, combined with AND."""
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    industry: Optional[str] = None
+    stage: Optional[str] = None
+
+
 class CompanyResponse(CompanyBase):
     """Schema for company response."""
     id: int
@@ -73,36 +86,56 @@ class CompanyResponse(CompanyBase):
 
 @router.get("", response_model=List[CompanyResponse])
 async def list_companies(
+    request: Request,
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     industry: Optional[str] = None,
     stage: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all portfolio companies with optional filtering.
+    List all portfolio companies with optional filtering, ordered by id.
+    
+    Pages are keyset-paginated: when more companies exist, the response
+    carries an `X-Next-Cursor` header (and a `Link: rel="next"` URL); pass
+    it back as `cursor` to fetch the next page at the cost of the first.
     
     Query Parameters:
-    - skip: Number of records to skip (pagination)
     - limit: Maximum number of records to return
+    - cursor: Opaque cursor from the previous page's X-Next-Cursor
+    - skip: Deprecated offset pagination, ignored when `cursor` is given
     - industry: Filter by industry
     - stage: Filter by funding stage
     """
-    query = db.query(Company).filter(Company.is_active == True)
+    query = select(Company).where(Company.is_active == True)
     
     if industry:
-        query = query.filter(Company.industry == industry)
+        query = query.where(Company.industry == industry)
     if stage:
-        query = query.filter(Company.stage == stage)
+        query = query.where(Company.stage == stage)
+    
+    if cursor:
+        try:
+            after = decode_cursor(cursor, ["id"])
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.where(Company.id > after["id"])
+    elif skip:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(query.order_by(Company.id).limit(limit + 1))).scalars().all()
+    companies, has_more = split_page(rows, limit)
     
-    companies = query.offset(skip).limit(limit).all()
+    set_next_cursor(request, response, encode_cursor({"id": companies[-1].id}) if has_more else None)
     return companies
 
 
 @router.post("", response_model=CompanyResponse, status_code=status.HTTP_201_CREATED)
 async def create_company(
     company: CompanyCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a new portfolio company.
@@ -110,7 +143,7 @@ async def create_company(
     Validates input and creates company record in database.
     """
     # Check if company with same name already exists
-    existing = db.query(Company).filter(Company.name == company.name).first()
+    existing = (await db.execute(select(Company).where(Company.name == company.name))).scalars().first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,16 +153,105 @@ async def create_company(
     # Create new company
     db_company = Company(**company.dict())
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
     
     return db_company
 
 
+@router.post("/bulk", response_model=BulkResponse)
+async def create_companies_bulk(
+    rows: List[Dict[str, Any]] = Body(..., description="Company objects, as for POST /api/companies"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add many portfolio companies in one request.
+    
+    Each row is validated on its own. Names that already exist (one IN
+    query) or repeat earlier in the batch are reported as duplicates; the
+    remaining rows are inserted with a single executemany in one
+    transaction. Returns one result per row, in request order.
+    """
+    check_batch_size(rows)
+    valid, results = validate_rows(rows, CompanyCreate)
+    
+    names = {company.name for _, company in valid}
+    existing = set((await db.execute(select(Company.name).where(Company.name.in_(names)))).scalars())
+    
+    to_insert = []
+    for index, company in valid:
+        if company.name in existing:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", error=f"Company with name '{company.name}' already exists"
+            )
+        else:
+            existing.add(company.name)
+            to_insert.append((index, company.model_dump()))
+    
+    if to_insert:
+        try:
+            ids = (await db.execute(
+                insert(Company).returning(Company.id, sort_by_parameter_order=True),
+                [values for _, values in to_insert]
+            )).scalars().all()
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Batch conflicted with a concurrent write; nothing was inserted"
+            )
+        for (index, _), company_id in zip(to_insert, ids):
+            results[index] = BulkRowResult(index=index, status="created", id=company_id)
+        # Core INSERTs skip the flush events that normally invalidate the cache
+        await http_cache.invalidate("companies")
+    
+    return bulk_response(len(rows), results)
+
+
+@router.patch("/bulk/deactivate")
+async def deactivate_companies_bulk(
+    selection: CompanySelection,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Soft delete every selected active company with a single UPDATE.
+    
+    Select by `ids` and/or `industry`, `stage`. Declared before the
+    /{company_id} routes so "bulk" is never parsed as an ID.
+    """
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(Company.id.in_(selection.ids))
+    if selection.industry is not None:
+        conditions.append(Company.industry == selection.industry)
+    if selection.stage is not None:
+        conditions.append(Company.stage == selection.stage)
+    if not conditions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Select companies by ids or at least one filter"
+        )
+    
+    ids = (await db.execute(
+        update(Company)
+        .where(*conditions, Company.is_active.isnot(False))
+        .values(is_active=False)
+        .returning(Company.id)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+    await db.commit()
+    
+    # Core UPDATEs skip the flush events that normally invalidate the cache
+    if ids:
+        await http_cache.invalidate("companies", *(f"company:{company_id}" for company_id in ids))
+    return {"message": "Companies deactivated", "updated": len(ids), "ids": sorted(ids)}
+
+
 @router.get("/{company_id}", response_model=CompanyResponse)
 async def get_company(
     company_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get detailed information about a specific company.
@@ -137,7 +259,7 @@ async def get_company(
     Path Parameters:
     - company_id: Unique identifier of the company
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(
@@ -152,14 +274,14 @@ async def get_company(
 async def update_company(
     company_id: int,
     company_update: CompanyUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update company information.
     
     Only provided fields will be updated.
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(
@@ -172,8 +294,8 @@ async def update_company(
     for field, value in update_data.items():
         setattr(company, field, value)
     
-    db.commit()
-    db.refresh(company)
+    await db.commit()
+    await db.refresh(company)
     
     return company
 
@@ -181,7 +303,7 @@ async def update_company(
 @router.delete("/{company_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_company(
     company_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Soft delete a company (marks as inactive).
@@ -189,7 +311,7 @@ async def delete_company(
     Path Parameters:
     - company_id: Unique identifier of the company
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(
@@ -198,7 +320,7 @@ async def delete_company(
         )
     
     company.is_active = False
-    db.commit()
+    await db.commit()
     
     return None
 
@@ -207,14 +329,15 @@ async def delete_company(
 async def get_company_news(
     company_id: int,
     days_back: int = 7,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fetch recent news articles about a company.
     
-    Integrates with external news APIs.
+    Served from the article store, which background ingestion keeps
+    in sync with external news APIs.
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(
@@ -222,8 +345,8 @@ async def get_company_news(
             detail=f"Company with id {company_id} not found"
         )
     
-    # Fetch news from external API
-    news = await news_aggregator.fetch_company_news(company.name, days_back)
+    await news_ingestion.refresh_if_idle(db, company)
+    news = await db.run_sync(lambda session: news_ingestion.company_news(session, company, days_back=days_back))
     
     return {
         "company_id": company_id,
@@ -236,14 +359,18 @@ async def get_company_news(
 @router.get("/{company_id}/insights")
 async def get_company_insights(
     company_id: int,
-    db: Session = Depends(get_db)
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get AI-generated insights for a company.
     
     Combines metrics, news, and AI analysis.
+    
+    Query Parameters:
+    - stream: Stream the executive summary as Server-Sent Events
     """
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.get(Company, company_id)
     
     if not company:
         raise HTTPException(
@@ -252,8 +379,8 @@ async def get_company_insights(
         )
     
     # Fetch related data
-    metrics = db.query(Company).filter(Company.id == company_id).first()  # Simplified
-    news = await news_aggregator.fetch_company_news(company.name, days_back=7)
+    await news_ingestion.refresh_if_idle(db, company)
+    news = await db.run_sync(lambda session: news_ingestion.company_news(session, company, days_back=7, limit=10))
     
     # Generate AI insights
     company_data = {
@@ -265,6 +392,21 @@ async def get_company_insights(
         'current_arr': company.current_arr
     }
     
+    if stream:
+        return stream_summary_response(
+            db,
+            company,
+            company_data=company_data,
+            metrics=[],
+            news=news,
+            source="insights",
+            meta={
+                "company_id": company_id,
+                "company_name": company.name,
+                "recent_news_count": len(news)
+            }
+        )
+    
     summary = await llm_analyzer.generate_executive_summary(
         company_data=company_data,
         metrics=[],
@@ -278,3 +420,44 @@ async def get_company_insights(
         "recent_news_count": len(news)
     }
 
+
+@router.get("/{company_id}/summaries")
+async def get_company_summaries(
+    company_id: int,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get previously generated executive summaries, newest first.
+    
+    Includes summaries persisted at the end of streamed insights.
+    """
+    company = await db.get(Company, company_id)
+    
+    if not company:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Company with id {company_id} not found"
+        )
+    
+    summaries = (await db.execute(
+        select(ExecutiveSummary).where(
+            ExecutiveSummary.company_id == company_id
+        ).order_by(ExecutiveSummary.created_at.desc(), ExecutiveSummary.id.desc()).limit(limit)
+    )).scalars().all()
+    
+    return {
+        "company_id": company_id,
+        "company_name": company.name,
+        "summaries": [
+            {
+                "id": s.id,
+                "summary": s.summary,
+                "model_used": s.model_used,
+                "source": s.source,
+                "news_analyzed": s.news_analyzed,
+                "created_at": s.created_at
+            }
+            for s in summaries
+        ]
+    }
@@ -0,0 +1,291 @@
+"""
+Metrics time-series API endpoints.
+Demonstrates: Batched ingestion, server-side downsampling, dialect-specific SQL
+"""
+
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import func, insert, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+from pydantic import BaseModel, Field
+from datetime import datetime, timedelta, timezone
+
+from app.core.bulk import BulkResponse, BulkRowResult, bulk_response, check_batch_size, validate_rows
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import split_page
+from app.models import Company, Metric
+from app.services.caching import http_cache
+
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+
+Bucket = Literal["auto", "raw", "day", "week", "month"]
+Aggregate = Literal["last", "avg", "min", "max"]
+
+# Bucket widths tried by "auto", narrowest first
+BUCKET_DAYS = {"day": 1, "week": 7, "month": 31}
+
+AGGREGATES = {"avg": func.avg, "min": func.min, "max": func.max}
+
+
+# Request schemas
+class MetricCreate(BaseModel):
+    """Schema for one ingested metric data point."""
+    company_id: int
+    metric_type: str = Field(..., min_length=1, max_length=100)
+    metric_value: float
+    metric_name: Optional[str] = Field(None, max_length=255)  # Defaults to metric_type
+    metric_unit: Optional[str] = Field(None, max_length=50)
+    recorded_at: Optional[datetime] = None  # Defaults to the time of ingestion
+    period_start: Optional[datetime] = None
+    period_end: Optional[datetime] = None
+    source: Optional[str] = "api"
+    source_url: Optional[str] = None
+    notes: Optional[str] = None
+
+
+# Response schemas
+class SeriesPoint(BaseModel):
+    """One point of a series: a raw reading, or one bucket of readings."""
+    t: datetime  # Reading time, or the start of the bucket
+    value: float
+    count: int  # Readings in the bucket (1 for raw points)
+
+
+class SeriesResponse(BaseModel):
+    """A company's series for one metric type over a window."""
+    company_id: int
+    metric_type: str
+    start: datetime
+    end: datetime
+    bucket: str
+    agg: str
+    truncated: bool  # True when older points were dropped to stay within `limit`
+    points: List[SeriesPoint]
+
+
+class bucket_start(FunctionElement):
+    """Start of the day, ISO week (Monday) or month containing a timestamp."""
+    type = DateTime()
+    inherit_cache = True
+    
+    def __init__(self, unit: str, expr):
+        if unit not in BUCKET_DAYS:
+            raise ValueError(f"Unknown bucket: {unit}")
+        self.unit = unit
+        super().__init__(expr)
+
+
+@compiles(bucket_start)
+def _bucket_start_default(element, compiler, **kw):
+    # The unit is rendered inline, not bound, so GROUP BY and SELECT compile
+    # to the identical expression (PostgreSQL compares them textually)
+    return f"date_trunc('{element.unit}', {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(bucket_start, "sqlite")
+def _bucket_start_sqlite(element, compiler, **kw):
+    expr = compiler.process(element.clauses, **kw)
+    if element.unit == "day":
+        return f"datetime({expr}, 'start of day')"
+    if element.unit == "week":
+        # Forward to Sunday (or stay on it), then back to that week's Monday
+        return f"datetime({expr}, 'start of day', 'weekday 0', '-6 days')"
+    return f"datetime({expr}, 'start of month')"
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware query values to match."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def auto_bucket(start: datetime, end: datetime, max_points: int) -> str:
+    """Narrowest bucket that spans the window in at most `max_points` buckets."""
+    span_days = (end - start).total_seconds() / 86400
+    for unit, days in BUCKET_DAYS.items():
+        if span_days / days <= max_points:
+            return unit
+    return "month"
+
+
+def metric_series_query(
+    company_id: int,
+    metric_type: str,
+    start: datetime,
+    end: datetime,
+    bucket: str = "raw",
+    agg: str = "last"
+):
+    """
+    Build the SELECT for one series over [start, end), newest point first.
+    
+    Rows are (t, value, count). Every variant reads a single range of
+    ix_metrics_series; bucketed variants group that range by bucket_start,
+    taking the avg/min/max of each bucket or its latest reading ("last").
+    """
+    in_window = (
+        Metric.company_id == company_id,
+        Metric.metric_type == metric_type,
+        Metric.recorded_at >= start,
+        Metric.recorded_at < end,
+    )
+    
+    if bucket == "raw":
+        return (
+            select(Metric.recorded_at.label("t"), Metric.metric_value.label("value"), literal(1).label("count"))
+            .where(*in_window)
+            .order_by(Metric.recorded_at.desc(), Metric.id.desc())
+        )
+    
+    t = bucket_start(bucket, Metric.recorded_at)
+    if agg == "last":
+        # Latest reading in each bucket: rank readings within their bucket
+        ranked = select(
+            t.label("t"),
+            Metric.metric_value.label("value"),
+            func.count().over(partition_by=t).label("count"),
+            func.row_number().over(
+                partition_by=t, order_by=(Metric.recorded_at.desc(), Metric.id.desc())
+            ).label("recency")
+        ).where(*in_window).subquery()
+        return (
+            select(ranked.c.t, ranked.c.value, ranked.c["count"])
+            .where(ranked.c.recency == 1)
+            .order_by(ranked.c.t.desc())
+        )
+    
+    return (
+        select(t.label("t"), AGGREGATES[agg](Metric.metric_value).label("value"), func.count().label("count"))
+        .where(*in_window)
+        .group_by(t)
+        .order_by(t.desc())
+    )
+
+
+def series_point(row) -> dict:
+    """JSON-ready SeriesPoint for one series row."""
+    t, value, count = row
+    return {"t": t.isoformat(), "value": value, "count": count}
+
+
+@router.post("/bulk", response_model=BulkResponse)
+async def ingest_metrics_bulk(
+    rows: List[Dict[str, Any]] = Body(..., description="Metric data points (MetricCreate objects)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest a batch of metric data points.
+    
+    Each row is validated on its own. Rows for unknown companies are
+    errors; a row with the same (company_id, metric_type, recorded_at) as a
+    stored point (one IN query) or an earlier row is a duplicate, so
+    re-sending a batch is harmless. The remaining rows are inserted with a
+    single executemany in one transaction. Returns one result per row, in
+    request order.
+    """
+    check_batch_size(rows)
+    valid, results = validate_rows(rows, MetricCreate)
+    
+    # Points without a timestamp are recorded at ingestion time
+    now = datetime.utcnow()
+    for _, metric in valid:
+        metric.recorded_at = utc_naive(metric.recorded_at) if metric.recorded_at else now
+        for field in ("period_start", "period_end"):
+            if getattr(metric, field):
+                setattr(metric, field, utc_naive(getattr(metric, field)))
+    
+    company_ids = {metric.company_id for _, metric in valid}
+    known = set((await db.execute(select(Company.id).where(Company.id.in_(company_ids)))).scalars())
+    keys = {(metric.company_id, metric.metric_type, metric.recorded_at) for _, metric in valid}
+    stored = set((await db.execute(
+        select(Metric.company_id, Metric.metric_type, Metric.recorded_at).where(
+            tuple_(Metric.company_id, Metric.metric_type, Metric.recorded_at).in_(keys)
+        )
+    )).tuples()) if keys else set()
+    
+    to_insert = []
+    for index, metric in valid:
+        key = (metric.company_id, metric.metric_type, metric.recorded_at)
+        if metric.company_id not in known:
+            results[index] = BulkRowResult(
+                index=index, status="error", error=f"Company with id {metric.company_id} not found"
+            )
+        elif key in stored:
+            results[index] = BulkRowResult(
+                index=index, status="duplicate", error="A point for this metric and time already exists"
+            )
+        else:
+            stored.add(key)
+            values = metric.model_dump()
+            values["metric_name"] = metric.metric_name or metric.metric_type
+            to_insert.append((index, values))
+    
+    if to_insert:
+        values = [row for _, row in to_insert]
+        ids = (await db.execute(
+            insert(Metric).returning(Metric.id, sort_by_parameter_order=True), values
+        )).scalars().all()
+        await db.commit()
+        
+        for (index, _), metric_id in zip(to_insert, ids):
+            results[index] = BulkRowResult(index=index, status="created", id=metric_id)
+        await http_cache.invalidate(*{f"metrics:{row['company_id']}" for row in values})
+    
+    return bulk_response(len(rows), results)
+
+
+@router.get("/{company_id}/{metric_type}", response_model=SeriesResponse)
+async def get_metric_series(
+    company_id: int,
+    metric_type: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Bucket = "auto",
+    agg: Aggregate = "last",
+    limit: int = Query(settings.METRICS_MAX_POINTS, ge=1, le=settings.METRICS_MAX_POINTS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a company's series for one metric type, downsampled in the database.
+    
+    Query Parameters:
+    - start, end: Window [start, end); defaults to the last METRICS_DEFAULT_WINDOW_DAYS days
+    - bucket: raw, day, week (from Monday) or month; auto picks the narrowest
+      bucket that keeps the window within `limit` points
+    - agg: Value reported per bucket: last reading, avg, min or max
+    - limit: Maximum points; if exceeded, the most recent points are kept
+    
+    Points are returned oldest first, each with the number of readings it
+    summarizes, so a chart over years of data costs a few hundred rows.
+    """
+    end = utc_naive(end) if end else datetime.utcnow()
+    start = utc_naive(start) if start else end - timedelta(days=settings.METRICS_DEFAULT_WINDOW_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    
+    if not await db.get(Company, company_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Company not found")
+    
+    if bucket == "auto":
+        bucket = auto_bucket(start, end, limit)
+    
+    query = metric_series_query(company_id, metric_type, start, end, bucket=bucket, agg=agg)
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    points, truncated = split_page(rows, limit)
+    
+    return {
+        "company_id": company_id,
+        "metric_type": metric_type,
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "agg": agg if bucket != "raw" else "raw",
+        "truncated": truncated,
+        "points": [series_point(row) for row in reversed(points)]
+    }
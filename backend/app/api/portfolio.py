@@ -0,0 +1,35 @@
+"""
+Portfolio overview API endpoints.
+Demonstrates: Precomputed snapshots, small first-paint payloads
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.services.analytics import portfolio_summary
+
+
+router = APIRouter(prefix="/api/portfolio", tags=["Portfolio"])
+
+
+@router.get("/summary")
+async def get_portfolio_summary(
+    top: int = Query(5, ge=0, le=settings.PORTFOLIO_SUMMARY_TOP_N),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Headline numbers for the dashboard in one small payload.
+    
+    Returns active company count, total ARR and burn, average and
+    ARR-weighted risk, risk buckets (low < 35 <= medium < 60 <= high),
+    unresolved alert counts and the `top` riskiest companies. Served from a
+    snapshot that is recomputed after company or alert writes, so the
+    dashboard can paint before (or without) loading the company list.
+    
+    Query Parameters:
+    - top: Number of at-risk companies to include
+    """
+    summary = await portfolio_summary.get(db)
+    return {**summary, "top_at_risk": summary["top_at_risk"][:top]}
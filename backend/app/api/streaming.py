@@ -0,0 +1,71 @@
+"""
+Server-Sent Events helpers for streaming AI output.
+Demonstrates: StreamingResponse, SSE framing, persisting streamed results
+"""
+
+from typing import AsyncIterator, Dict, List
+import json
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Company, ExecutiveSummary
+from app.services.ai_engine import llm_analyzer
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """Frame one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream_summary_response(
+    db: AsyncSession,
+    company: Company,
+    company_data: Dict,
+    metrics: List[Dict],
+    news: List[Dict],
+    source: str,
+    meta: Dict
+) -> StreamingResponse:
+    """
+    Stream an executive summary to the client as SSE.
+    
+    Emits a `meta` event immediately, `token` events as text arrives and a
+    final `done` event once the summary has been saved to
+    `executive_summaries`. Provider failures mid-stream emit `error` and
+    nothing is persisted.
+    """
+    company_id = company.id
+    
+    async def events() -> AsyncIterator[str]:
+        yield sse_event("meta", meta)
+        
+        async for event in llm_analyzer.stream_executive_summary(
+            company_data=company_data,
+            metrics=metrics,
+            news=news
+        ):
+            if event["type"] == "token":
+                yield sse_event("token", {"text": event["text"]})
+            elif event["type"] == "done":
+                # The request-scoped session is closed by now; SQLAlchemy
+                # sessions are reusable after close() and reconnect on demand.
+                # The id is set on flush, so skip refresh() (it would hold a connection).
+                record = ExecutiveSummary(
+                    company_id=company_id,
+                    summary=event["summary"],
+                    model_used=event["model_used"],
+                    source=source,
+                    news_analyzed=len(news)
+                )
+                db.add(record)
+                await db.commit()
+                yield sse_event("done", {"summary_id": record.id, "model_used": record.model_used})
+            else:
+                yield sse_event("error", {"detail": event["detail"]})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
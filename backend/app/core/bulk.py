@@ -0,0 +1,72 @@
+"""
+Helpers for bulk create endpoints.
+Demonstrates: Per-row validation, partial success reporting
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of one submitted row, by its position in the request."""
+    index: int
+    status: str  # created, duplicate or error
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """Summary of a bulk create request."""
+    created: int
+    duplicates: int
+    failed: int
+    results: List[BulkRowResult]
+
+
+def check_batch_size(rows: List[Any]) -> None:
+    """Reject empty or oversized batches before touching the database."""
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No rows submitted")
+    if len(rows) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ROWS} rows per request"
+        )
+
+
+def validate_rows(
+    rows: List[Dict[str, Any]],
+    schema: Type[BaseModel]
+) -> Tuple[List[Tuple[int, BaseModel]], Dict[int, BulkRowResult]]:
+    """
+    Validate each row on its own, so one bad row does not reject the batch.
+    
+    Returns:
+        (index, model) for the valid rows, and error results keyed by index
+    """
+    valid, errors = [], {}
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors[index] = BulkRowResult(index=index, status="error", error=message)
+    return valid, errors
+
+
+def bulk_response(total: int, results: Dict[int, BulkRowResult]) -> BulkResponse:
+    """Assemble the response with one result per submitted row, in order."""
+    ordered = [results[index] for index in range(total)]
+    return BulkResponse(
+        created=sum(r.status == "created" for r in ordered),
+        duplicates=sum(r.status == "duplicate" for r in ordered),
+        failed=sum(r.status == "error" for r in ordered),
+        results=ordered
+    )
@@ -0,0 +1,172 @@
+"""
+Pluggable key-value cache backends.
+Demonstrates: LRU eviction, TTL expiry, Redis integration with graceful degradation
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+from collections import OrderedDict
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Minimal async cache interface.
+
+    Values are strings (callers serialize to JSON); a TTL of None means the
+    backend default.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> Optional[int]:
+        """Number of live entries, if cheaply known."""
+        return None
+
+
+class InMemoryCache(CacheBackend):
+    """
+    In-process LRU cache with per-entry TTL.
+
+    Bounded by entry count: inserting beyond `max_entries` evicts the least
+    recently used entry. Expired entries are dropped lazily on access.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[int] = None):
+        """Initialize in-memory cache."""
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """
+    Redis-backed cache shared across workers.
+
+    Size bounds are delegated to the server (configure `maxmemory` with an
+    `allkeys-lru` policy). Connection errors are logged and treated as
+    misses so a Redis outage degrades to uncached behavior.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "investorlens:", default_ttl: Optional[int] = None):
+        """Initialize Redis cache."""
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await self._client.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        try:
+            await self._client.set(self.prefix + key, value, ex=ttl or None)
+        except Exception as e:
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    async def clear(self) -> None:
+        try:
+            async for key in self._client.scan_iter(match=self.prefix + "*"):
+                await self._client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed: {e}")
+
+
+def create_cache_backend(
+    kind: str,
+    redis_url: str = "",
+    prefix: str = "investorlens:",
+    max_entries: int = 1024,
+    default_ttl: Optional[int] = None
+) -> Optional[CacheBackend]:
+    """
+    Build a cache backend from configuration.
+
+    Args:
+        kind: "memory", "redis" or "none"
+        redis_url: Redis connection URL (redis backend only)
+        prefix: Key namespace (redis backend only)
+        max_entries: LRU bound (memory backend only)
+        default_ttl: Default entry lifetime in seconds
+
+    Returns:
+        Backend instance, or None when caching is disabled
+    """
+    kind = (kind or "none").lower()
+
+    if kind == "memory":
+        return InMemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    if kind == "redis":
+        return RedisCache(redis_url, prefix=prefix, default_ttl=default_ttl)
+    if kind != "none":
+        logger.warning(f"Unknown cache backend '{kind}', caching disabled")
+    return None
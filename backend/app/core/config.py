@@ -4,7 +4,7 @@ Demonstrates: DevOps best practices, environment management
 """
 
 from functools import lru_cache
-from typing import List, Union
+from typing import Dict, List, Union
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, field_validator
 import json
@@ -63,11 +63,65 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
     
+    # LLM response cache
+    LLM_CACHE_BACKEND: str = "memory"  # memory, redis or none
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    
+    # LLM prompt budgets (system + user prompt input tokens)
+    LLM_PROMPT_TOKEN_BUDGETS: Dict[str, int] = {"gpt-4": 1200, "claude-3-sonnet-20240229": 1500}  # JSON in env
+    LLM_PROMPT_TOKEN_BUDGET_DEFAULT: int = 1200  # Models not listed above
+    LLM_TOKEN_COUNT_CACHE_SIZE: int = 10000  # Memoized token counts of rendered news and metric lines
+    
+    # LLM provider routing ("provider:model" candidates per task, preferred first)
+    LLM_ROUTES: Dict[str, List[str]] = {
+        "summary": ["openai:gpt-4", "anthropic:claude-3-sonnet-20240229"],
+        "risk": ["anthropic:claude-3-sonnet-20240229", "openai:gpt-4"],
+        "competitive": ["openai:gpt-4", "anthropic:claude-3-sonnet-20240229"]
+    }  # JSON in env
+    LLM_ROUTER_WINDOW_SECONDS: int = 300  # Rolling window for per-route latency and error rates
+    LLM_ROUTER_WINDOW_SIZE: int = 200  # Most recent calls kept per route
+    LLM_ROUTER_MIN_SAMPLES: int = 10  # Calls in the window before a route's stats are trusted
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.5  # Routes failing more often are tried last until errors age out
+    LLM_HEDGE_ENABLED: bool = False  # Opt-in: also ask the next route when the first is slower than its p95 (pays for both calls)
+    LLM_HEDGE_MIN_DELAY_MS: float = 250.0  # Never hedge sooner than this
+    
+    # Local fake LLM providers (offline development and load tests; no API keys needed)
+    LLM_FAKE_PROVIDERS: bool = False
+    LLM_FAKE_LATENCY_MS: float = 800.0  # Median fake completion latency
+    LLM_FAKE_ERROR_RATE: float = 0.0  # Share of fake calls that raise
+    
+    # HTTP response cache (company/alert listings, company detail, alert stats)
+    HTTP_CACHE_BACKEND: str = "memory"  # memory, redis (shared by all workers) or none
+    HTTP_CACHE_TTL_SECONDS: int = 300  # Upper bound; writes invalidate affected entries at once
+    HTTP_CACHE_MAX_ENTRIES: int = 2048
+    
     # External APIs
     NEWS_API_KEY: str = ""
     LINKEDIN_API_KEY: str = ""
     SIMILARWEB_API_KEY: str = ""
     
+    # News HTTP client pool
+    NEWS_HTTP_MAX_CONNECTIONS: int = 20
+    NEWS_HTTP_MAX_KEEPALIVE: int = 10
+    NEWS_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    NEWS_HTTP_PER_HOST_CONCURRENCY: int = 8
+    NEWS_HTTP_TIMEOUT: float = 10.0
+    NEWS_HTTP2: bool = True  # Used when the h2 package is installed
+    
+    # News article store
+    NEWS_BACKFILL_DAYS: int = 30  # Window fetched for a company with no stored articles
+    NEWS_REFRESH_INTERVAL_SECONDS: int = 900  # Minimum time between refreshes of one company
+    
+    # Background news ingestion
+    NEWS_INGESTION_ENABLED: bool = True  # Runs only when NEWS_API_KEY is set
+    NEWS_INGESTION_INTERVAL_SECONDS: int = 3600  # Low-risk companies; riskier ones refresh 2-4x as often
+    NEWS_INGESTION_JITTER: float = 0.2  # +/- fraction applied to every interval
+    NEWS_INGESTION_RATE_PER_MINUTE: float = 30.0  # Global budget for outbound news requests
+    NEWS_INGESTION_SYNC_SECONDS: int = 300  # How often the company list is re-read
+    NEWS_INGESTION_POLL_SECONDS: float = 30.0  # Maximum idle sleep between ticks
+    NEWS_INDUSTRY_ARTICLES: int = 10
+    
     # AWS
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
@@ -77,6 +131,48 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
     
+    # Deterministic risk scoring
+    RISK_GROWTH_METRIC_TYPE: str = "revenue"  # Metric series used for the growth factor
+    RISK_GROWTH_WINDOW_DAYS: int = 365
+    
+    # Hybrid risk scoring (local score first, LLM only when needed)
+    RISK_UNCERTAIN_LOW: int = 40  # Local scores in [low, high] escalate to the LLM
+    RISK_UNCERTAIN_HIGH: int = 70
+    RISK_MIN_CONFIDENCE: float = 0.6  # Local scores below this confidence escalate
+    RISK_MATERIAL_CHANGE_DAYS: int = 7  # Recent medium+ alerts within this window escalate
+    RISK_LLM_CONCURRENCY: int = 4  # In-flight escalated LLM requests
+    RISK_LLM_BATCH_SIZE: int = 10  # Companies per batched risk prompt; 1 sends one request per company
+    RISK_LLM_BATCH_TOKENS_PER_COMPANY: int = 150  # Response max_tokens allowed per company in a batch
+    
+    # Bulk create endpoints
+    BULK_MAX_ROWS: int = 1000  # Rows accepted by one /bulk request
+    
+    # Metrics time series
+    METRICS_MAX_POINTS: int = 500  # Points returned by one series query; "auto" buckets stay under it
+    METRICS_DEFAULT_WINDOW_DAYS: int = 365  # Series window when the query gives no start
+    METRICS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Columnar cache budget; LRU metric types are evicted beyond it
+    METRICS_CACHE_ID_MARGIN: int = 1000  # Trailing metric IDs re-read on every refresh to catch inserts that commit out of ID order
+    METRICS_BURN_METRIC_TYPE: str = "burn_rate"  # Monthly burn series used by portfolio benchmarks
+    
+    # Portfolio dashboard summary
+    PORTFOLIO_SUMMARY_MAX_AGE_SECONDS: int = 60  # Recompute even without a detected write after this long
+    PORTFOLIO_SUMMARY_TOP_N: int = 10  # At-risk companies kept in the snapshot
+    
+    # Alert statistics
+    ALERT_STATS_FROM_COUNTERS: bool = True  # Serve stats from alert_counters instead of a GROUP BY scan
+    
+    # Batch analysis
+    BATCH_MAX_CONCURRENCY: int = 16  # Companies analyzed at once
+    BATCH_OPENAI_CONCURRENCY: int = 8  # In-flight GPT-4 requests
+    BATCH_ANTHROPIC_CONCURRENCY: int = 4  # In-flight Claude requests
+    
+    # Request profiling
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled automatically
+    PROFILING_TOKEN: str = ""  # Requests sending X-Profile: <token> are profiled; empty disables the header
+    PROFILING_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILING_OUTPUT_DIR: str = "profiles"  # Collapsed stacks and breakdowns are written here
+    PROFILING_MAX_FILES: int = 200  # Profiles kept; the oldest are deleted beyond this
+
     class Config:
         env_file = ".env"
         case_sensitive = True
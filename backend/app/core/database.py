@@ -4,15 +4,19 @@ Demonstrates: SQLAlchemy ORM, connection pooling, async support
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.core.config import settings
+from app.core.instrumentation import InstrumentedAsyncQueuePool, InstrumentedQueuePool, register_pool
 
 # Create SQLAlchemy engine with connection pooling
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,  # QueuePool that records checkout wait
     pool_pre_ping=True,  # Verify connections before using
     pool_size=10,  # Maximum number of permanent connections
     max_overflow=20,  # Maximum overflow connections
@@ -22,6 +26,41 @@ engine = create_engine(
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for each sync dialect we support
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Rewrite a sync database URL to use the dialect's async driver."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+# Async engine for request handlers, so queries never block the event loop
+# (aiosqlite uses NullPool, which takes no sizing arguments)
+async_pool_options = {} if settings.DATABASE_URL.startswith("sqlite") else {
+    "poolclass": InstrumentedAsyncQueuePool, "pool_size": 10, "max_overflow": 20
+}
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **async_pool_options
+)
+
+# Checked-out connections are exported on /metrics
+register_pool("sync", engine.pool)
+register_pool("async", async_engine.sync_engine.pool)
+
+# Async session factory; objects stay usable after commit (no implicit lazy reloads)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for ORM models
 Base = declarative_base()
 
@@ -42,6 +81,22 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database session dependency for FastAPI.
+    
+    Usage:
+        @app.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            return (await db.execute(select(Item))).scalars().all()
+    
+    Synchronous services can run against the same connection with
+    `await db.run_sync(lambda session: service(session, ...))`.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db() -> None:
     """Initialize database - create all tables."""
     Base.metadata.create_all(bind=engine)
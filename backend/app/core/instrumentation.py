@@ -0,0 +1,333 @@
+"""
+Prometheus instrumentation for HTTP requests, the database, LLM and news calls.
+Demonstrates: Latency histograms, per-request query accounting, custom collectors
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from starlette.requests import Request
+from starlette.routing import Match
+
+# Request, LLM and news latencies span milliseconds (cache hits) to a minute (LLM completions)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "investorlens_http_request_duration_seconds",
+    "Time from receiving a request to the start of its response",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "investorlens_http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "investorlens_db_query_duration_seconds",
+    "Execution time of a single SQL statement",
+    buckets=QUERY_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "investorlens_db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "investorlens_db_time_per_request_seconds",
+    "Total SQL execution time while handling one request",
+    ["route"],
+    buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "investorlens_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=QUERY_BUCKETS
+)
+LLM_REQUEST_DURATION = Histogram(
+    "investorlens_llm_request_duration_seconds",
+    "LLM provider call latency (to the last token for streams)",
+    ["provider", "model", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "investorlens_llm_tokens",
+    "Tokens billed by LLM providers",
+    ["provider", "model", "kind"]
+)
+LLM_ERRORS = Counter(
+    "investorlens_llm_errors",
+    "Failed LLM provider calls",
+    ["provider", "model", "error"]
+)
+NEWS_REQUEST_DURATION = Histogram(
+    "investorlens_news_api_request_duration_seconds",
+    "News API request latency",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+
+class RequestQueries:
+    """SQL statements and their total time for one request."""
+    
+    __slots__ = ("count", "seconds")
+    
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Set by the HTTP middleware; tasks and SQLAlchemy's async greenlets inherit it
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def current_queries() -> Optional[RequestQueries]:
+    """Query accounting of the request being handled, if any."""
+    return _request_queries.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    context.query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - context.query_start
+    DB_QUERY_DURATION.observe(elapsed)
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+
+
+def route_template(request: Request) -> str:
+    """
+    Path template of the route that served `request`, e.g. /api/companies/{company_id}.
+    
+    Templates keep the label set bounded. Responses that never reached the
+    router (served by the HTTP response cache) are matched here instead.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        for candidate in request.app.router.routes:
+            if candidate.matches(request.scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+@contextmanager
+def track_request(request: Request) -> Iterator[Dict]:
+    """
+    Record latency and SQL usage of one request.
+    
+    The caller stores the response status in the yielded dict; requests that
+    raise are recorded as 500.
+    """
+    method = request.method
+    outcome = {"status": 500}
+    queries = RequestQueries()
+    token = _request_queries.set(queries)
+    in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+    in_progress.inc()
+    start = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        elapsed = time.perf_counter() - start
+        in_progress.dec()
+        _request_queries.reset(token)
+        route = route_template(request)
+        HTTP_REQUEST_DURATION.labels(method, route, str(outcome["status"])).observe(elapsed)
+        DB_QUERIES_PER_REQUEST.labels(route).observe(queries.count)
+        DB_TIME_PER_REQUEST.labels(route).observe(queries.seconds)
+
+
+class _TimedCheckout:
+    """Pool mixin observing how long each checkout waits for a connection."""
+    
+    metrics_label = "default"
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool for the sync engine that records checkout wait."""
+    
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """Async-adapted QueuePool for the request engine that records checkout wait."""
+    
+    metrics_label = "async"
+
+
+class StatsCollector:
+    """
+    Expose the in-process caches' own counters at scrape time.
+    
+    Caches and single-flight groups already count hits, misses and coalesced
+    calls (see /api/analysis/cache/stats); rather than double-counting on
+    the hot path, their `stats()` functions and the connection pools are
+    read when Prometheus scrapes. These values are per worker process.
+    """
+    
+    def __init__(self):
+        self.caches: Dict[str, Callable[[], Dict]] = {}
+        self.coalescing: Dict[str, Callable[[], Dict]] = {}
+        self.pools: Dict[str, Pool] = {}
+        self.routers: Dict[str, Callable[[], Dict]] = {}
+    
+    def collect(self):
+        hits = CounterMetricFamily("investorlens_cache_hits", "Cache lookups that found an entry", labels=["cache"])
+        misses = CounterMetricFamily("investorlens_cache_misses", "Cache lookups that missed", labels=["cache"])
+        ratio = GaugeMetricFamily("investorlens_cache_hit_ratio", "Hits over lookups since start", labels=["cache"])
+        entries = GaugeMetricFamily("investorlens_cache_entries", "Entries currently cached", labels=["cache"])
+        for name, stats in self.caches.items():
+            values = stats()
+            hits.add_metric([name], values["hits"])
+            misses.add_metric([name], values["misses"])
+            ratio.add_metric([name], values["hit_ratio"])
+            entries.add_metric([name], values["entries"])
+        
+        calls = CounterMetricFamily("investorlens_singleflight_calls", "Calls into a single-flight group", labels=["group"])
+        coalesced = CounterMetricFamily(
+            "investorlens_singleflight_coalesced", "Calls served by another caller's in-flight request", labels=["group"]
+        )
+        for name, stats in self.coalescing.items():
+            values = stats()
+            calls.add_metric([name], values["calls"])
+            coalesced.add_metric([name], values["coalesced"])
+        
+        checked_out = GaugeMetricFamily("investorlens_db_pool_checked_out", "Connections checked out", labels=["pool"])
+        pool_size = GaugeMetricFamily("investorlens_db_pool_size", "Configured pool size", labels=["pool"])
+        for name, pool in self.pools.items():
+            checked_out.add_metric([name], pool.checkedout())
+            pool_size.add_metric([name], pool.size())
+        
+        hedges = CounterMetricFamily("investorlens_llm_hedges", "Second providers asked after a slow first one", labels=["router"])
+        failovers = CounterMetricFamily("investorlens_llm_failovers", "Next providers tried after an error", labels=["router"])
+        route_latency = GaugeMetricFamily(
+            "investorlens_llm_route_latency_seconds", "Rolling LLM route latency percentile", labels=["route", "quantile"]
+        )
+        route_errors = GaugeMetricFamily("investorlens_llm_route_error_ratio", "Rolling LLM route error rate", labels=["route"])
+        for name, stats in self.routers.items():
+            values = stats()
+            hedges.add_metric([name], values["hedges"])
+            failovers.add_metric([name], values["failovers"])
+            for route, route_values in values["routes"].items():
+                route_errors.add_metric([route], route_values["error_rate"])
+                for quantile in ("p50", "p95"):
+                    if route_values[f"{quantile}_ms"] is not None:
+                        route_latency.add_metric([route, quantile], route_values[f"{quantile}_ms"] / 1000)
+        
+        yield from (
+            hits, misses, ratio, entries, calls, coalesced, checked_out, pool_size,
+            hedges, failovers, route_latency, route_errors
+        )
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def register_cache(name: str, stats: Callable[[], Dict]) -> None:
+    """Export a cache's `stats()` (hits, misses, hit_ratio, entries)."""
+    stats_collector.caches[name] = stats
+
+
+def register_singleflight(name: str, stats: Callable[[], Dict]) -> None:
+    """Export a single-flight group's `stats()` (calls, coalesced)."""
+    stats_collector.coalescing[name] = stats
+
+
+def register_router(name: str, stats: Callable[[], Dict]) -> None:
+    """Export an LLM provider router's `stats()` (hedges, failovers, per-route latency and errors)."""
+    stats_collector.routers[name] = stats
+
+
+def register_pool(name: str, pool: Pool) -> None:
+    """Export a QueuePool's checked-out connections and size."""
+    if isinstance(pool, QueuePool):
+        stats_collector.pools[name] = pool
+
+
+class LLMCall:
+    """Handle for recording the token usage of one provider call."""
+    
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+    
+    def tokens(self, prompt: Optional[int] = None, completion: Optional[int] = None) -> None:
+        """Add billed tokens; providers that omit usage pass None."""
+        if prompt:
+            LLM_TOKENS.labels(self.provider, self.model, "prompt").inc(prompt)
+        if completion:
+            LLM_TOKENS.labels(self.provider, self.model, "completion").inc(completion)
+
+
+@contextmanager
+def observe_llm(provider: str, model: str) -> Iterator[LLMCall]:
+    """
+    Time one LLM provider call and count its errors.
+    
+    Usage:
+        with observe_llm("openai", model) as call:
+            response = await client.chat.completions.create(...)
+            call.tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
+    """
+    call = LLMCall(provider, model)
+    outcome = "ok"
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        outcome = "error"
+        LLM_ERRORS.labels(provider, model, type(e).__name__).inc()
+        raise
+    except BaseException:
+        # Cancelled, or a stream closed by its consumer
+        outcome = "cancelled"
+        raise
+    finally:
+        LLM_REQUEST_DURATION.labels(provider, model, outcome).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Exposition body and content type for /metrics.
+    
+    When PROMETHEUS_MULTIPROC_DIR is set (several workers), the histogram and
+    counter samples of all workers are merged from that directory.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        registry.register(stats_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
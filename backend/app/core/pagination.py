@@ -0,0 +1,67 @@
+"""
+Keyset (cursor) pagination helpers.
+Demonstrates: Seek-method pagination, opaque cursors, Link headers
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+import base64
+import json
+
+from fastapi import Request, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue."""
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Serialize the sort key of the last row on a page into an opaque token."""
+    payload = {
+        key: {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Token from a previous page
+        keys: Sort-key fields the cursor must contain
+    
+    Raises:
+        InvalidCursor: If the token is malformed or has different keys
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = {
+            key: datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for key, value in payload.items()
+        }
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    
+    if sorted(values) != sorted(keys):
+        raise InvalidCursor("Cursor does not match this listing")
+    return values
+
+
+def set_next_cursor(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Advertise the next page via X-Next-Cursor and an RFC 8288 Link header."""
+    if next_cursor is None:
+        return
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    next_url = request.url.include_query_params(cursor=next_cursor).remove_query_params("skip")
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+def split_page(rows: List, limit: int) -> tuple:
+    """Split `limit + 1` fetched rows into the page and whether more exist."""
+    return rows[:limit], len(rows) > limit
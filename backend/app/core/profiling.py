@@ -0,0 +1,307 @@
+"""
+Opt-in per-request profiling.
+Demonstrates: Sampling profilers on an event loop, task attribution, collapsed stacks
+"""
+
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+import asyncio
+import functools
+import hmac
+import inspect
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import uuid
+import weakref
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.instrumentation import current_queries, route_template
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+
+# Await categories reported in the breakdown
+CATEGORIES = ("llm", "news")
+
+
+class ProfileSession:
+    """
+    Samples and await timings of one profiled request.
+    
+    Await timings are wall-clock time with at least one call of the category
+    outstanding, so concurrent LLM calls under `asyncio.gather` are counted
+    once rather than summed.
+    """
+    
+    def __init__(self, request: Request, trigger: str, loop: asyncio.AbstractEventLoop):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = request.method
+        self.path = request.url.path
+        self.trigger = trigger
+        self.loop = loop
+        self.thread_id = threading.get_ident()
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.calls = dict.fromkeys(CATEGORIES, 0)
+        self.seconds = dict.fromkeys(CATEGORIES, 0.0)
+        self._outstanding = dict.fromkeys(CATEGORIES, 0)
+        self._busy_since = dict.fromkeys(CATEGORIES, 0.0)
+    
+    @contextmanager
+    def awaiting(self, category: str) -> Iterator[None]:
+        """Account one await of `category`."""
+        self.calls[category] += 1
+        if self._outstanding[category] == 0:
+            self._busy_since[category] = time.perf_counter()
+        self._outstanding[category] += 1
+        try:
+            yield
+        finally:
+            self._outstanding[category] -= 1
+            if self._outstanding[category] == 0:
+                self.seconds[category] += time.perf_counter() - self._busy_since[category]
+    
+    def breakdown(self) -> Dict:
+        """Where the request's wall time went."""
+        queries = current_queries()
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "total_seconds": round(self.elapsed or time.perf_counter() - self.start, 6),
+            "sql": {
+                "queries": queries.count if queries else None,
+                "seconds": round(queries.seconds, 6) if queries else None
+            },
+            **{
+                category: {"calls": self.calls[category], "seconds": round(self.seconds[category], 6)}
+                for category in CATEGORIES
+            },
+            "samples": sum(self.stacks.values()),
+            "interval_ms": settings.PROFILING_INTERVAL_MS
+        }
+    
+    def annotate(self, response: Response) -> None:
+        """Record the outcome and point the client at the profile."""
+        self.status = response.status_code
+        breakdown = self.breakdown()
+        timings = [f"total;dur={breakdown['total_seconds'] * 1000:.1f}"]
+        if breakdown["sql"]["seconds"] is not None:
+            timings.append(f"sql;dur={breakdown['sql']['seconds'] * 1000:.1f}")
+        timings += [f"{category};dur={breakdown[category]['seconds'] * 1000:.1f}" for category in CATEGORIES]
+        response.headers["X-Profile-Id"] = self.id
+        response.headers["Server-Timing"] = ", ".join(timings)
+
+
+# Session of the request being handled; child tasks inherit it
+_active: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+# Tasks started by profiled requests (and the requests' own tasks)
+_task_sessions: "weakref.WeakKeyDictionary[asyncio.Task, ProfileSession]" = weakref.WeakKeyDictionary()
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_qualname}"
+
+
+def collapse(frame) -> str:
+    """One stack in collapsed format, root first (flamegraph.pl / speedscope input)."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class RequestProfiler:
+    """
+    Sample the stacks of selected requests and time their LLM and news awaits.
+    
+    A request is profiled when it sends `X-Profile: <PROFILING_TOKEN>` or is
+    picked at PROFILING_SAMPLE_RATE. While any request is being profiled, one
+    background thread samples the event loop thread every
+    PROFILING_INTERVAL_MS and keeps a sample only when the loop is running a
+    task that belongs to a profiled request (its own task or one it spawned;
+    tasks are tagged by a task factory). Idle time and other requests' work
+    are therefore excluded: samples show where a request spends CPU, the
+    await timings show where it waits.
+    
+    cProfile was not used because it traces every call on the thread, so on
+    an event loop it attributes concurrent requests' work to the profiled one
+    and slows all of them down.
+    
+    Each profile is written to PROFILING_OUTPUT_DIR as `<name>.collapsed`
+    (one stack per line with its sample count) and `<name>.json` (the
+    breakdown). Streaming responses are profiled up to their first byte.
+    """
+    
+    def __init__(self):
+        """Initialize request profiler."""
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._patched_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+        self.profiles_written = 0
+    
+    def trigger_for(self, request: Request) -> Optional[str]:
+        """Why `request` should be profiled, or None."""
+        token = settings.PROFILING_TOKEN
+        if token and hmac.compare_digest(request.headers.get(PROFILE_HEADER, ""), token):
+            return "header"
+        if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return "sample"
+        return None
+    
+    @asynccontextmanager
+    async def profile(self, request: Request) -> AsyncIterator[Optional[ProfileSession]]:
+        """Profile the enclosed handling of `request` if it was selected; yields the session or None."""
+        trigger = self.trigger_for(request)
+        if trigger is None:
+            yield None
+            return
+        
+        loop = asyncio.get_running_loop()
+        self._tag_new_tasks(loop)
+        session = ProfileSession(request, trigger, loop)
+        task = asyncio.current_task()
+        _task_sessions[task] = session
+        token = _active.set(session)
+        self._add(session)
+        try:
+            yield session
+        finally:
+            self._remove(session)
+            _active.reset(token)
+            _task_sessions.pop(task, None)
+            session.elapsed = time.perf_counter() - session.start
+            session.route = route_template(request)
+            breakdown = session.breakdown()
+            try:
+                await asyncio.to_thread(self._write, session, breakdown)
+            except OSError as e:
+                logger.warning(f"Could not write profile {session.id}: {e}")
+    
+    def _tag_new_tasks(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install a task factory that tags tasks spawned by profiled requests."""
+        if loop in self._patched_loops:
+            return
+        previous = loop.get_task_factory()
+        
+        def task_factory(loop, coro, context=None):
+            if previous is not None:
+                task = previous(loop, coro) if context is None else previous(loop, coro, context=context)
+            else:
+                task = asyncio.Task(coro, loop=loop, context=context)
+            session = context.get(_active) if context is not None else _active.get()
+            if session is not None:
+                _task_sessions[task] = session
+            return task
+        
+        loop.set_task_factory(task_factory)
+        self._patched_loops.add(loop)
+    
+    def _add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                self._thread.start()
+    
+    def _remove(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.remove(session)
+    
+    def _sample(self) -> None:
+        """Sampler thread: runs while any session is active."""
+        interval = settings.PROFILING_INTERVAL_MS / 1000
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                loops = {(session.loop, session.thread_id) for session in self._sessions}
+            
+            frames = sys._current_frames()
+            for loop, thread_id in loops:
+                task = asyncio.current_task(loop)
+                session = _task_sessions.get(task) if task is not None else None
+                frame = frames.get(thread_id)
+                if session is not None and frame is not None:
+                    session.stacks[collapse(frame)] += 1
+            del frames
+            time.sleep(interval)
+    
+    def _write(self, session: ProfileSession, breakdown: Dict) -> None:
+        directory = Path(settings.PROFILING_OUTPUT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{session.started_at:%Y%m%dT%H%M%S}-{session.method}-{session.id}"
+        (directory / f"{name}.collapsed").write_text(
+            "".join(f"{stack} {count}\n" for stack, count in session.stacks.most_common())
+        )
+        (directory / f"{name}.json").write_text(json.dumps(breakdown, indent=2))
+        self.profiles_written += 1
+        
+        profiles = sorted(directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for old in profiles[:max(len(profiles) - settings.PROFILING_MAX_FILES, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def profiled_await(category: str):
+    """
+    Count the decorated coroutine or async generator as an await of `category`.
+    
+    Costs one context variable lookup when the request is not being profiled.
+    """
+    def decorate(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def generator_wrapper(*args, **kwargs):
+                session = _active.get()
+                generator = func(*args, **kwargs)
+                try:
+                    while True:
+                        # Only time spent producing items; the consumer's time is its own
+                        with session.awaiting(category) if session is not None else nullcontext():
+                            try:
+                                item = await generator.__anext__()
+                            except StopAsyncIteration:
+                                return
+                        yield item
+                finally:
+                    await generator.aclose()
+            return generator_wrapper
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            session = _active.get()
+            if session is None:
+                return await func(*args, **kwargs)
+            with session.awaiting(category):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Global instance
+request_profiler = RequestProfiler()
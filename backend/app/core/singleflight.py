@@ -0,0 +1,68 @@
+"""
+Single-flight request coalescing.
+Demonstrates: Shared in-flight futures, cancellation shielding, duplicate-suppression metrics
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+    
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running await the same task instead of repeating it.
+    The key is forgotten as soon as the work finishes, so this suppresses
+    duplicates only while they overlap (caching is a separate concern).
+    
+    The shared task is shielded, so a caller that is cancelled (e.g. a client
+    disconnect) does not cancel the work for the callers still waiting.
+    """
+    
+    def __init__(self, name: str):
+        """Initialize single-flight group."""
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn()` for `key`, or join the run already in flight.
+        
+        Args:
+            key: Identity of the work; equal keys must produce equal results
+            fn: Zero-argument coroutine function doing the work
+        
+        Returns:
+            The (shared) result of `fn()`; exceptions propagate to every caller
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so an unobserved failure is not logged as "never retrieved"
+        if not task.cancelled():
+            task.exception()
+    
+    def stats(self) -> Dict:
+        """Call, execution and coalescing counters."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesce_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self._in_flight)
+        }
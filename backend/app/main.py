@@ -7,13 +7,20 @@ Demonstrates: FastAPI app structure, middleware, CORS, API documentation
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import asyncio
 import time
 import logging
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import SessionLocal, async_engine, init_db
+from app.core.instrumentation import register_cache, register_router, register_singleflight, render_metrics, track_request
+from app.core.profiling import request_profiler
 from app.api import api_router
+from app.services.ai_engine import llm_analyzer, prompt_builder
+from app.services.alerting import alert_stats
+from app.services.caching import HTTPCacheMiddleware, http_cache
+from app.services.data_aggregator import news_aggregator, news_ingestion
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +38,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Response cache for hot GET endpoints; added before CORS so that CORS
+# (the outer middleware) also decorates responses served from the cache
+app.add_middleware(HTTPCacheMiddleware, cache=http_cache)
+
 # CORS middleware - TEMPORARY HARDCODED FIX
 # TODO: Remove hardcoding once Railway env var parsing is fixed
 HARDCODED_CORS = [
@@ -49,22 +60,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag", "X-Profile-Id", "Server-Timing"],  # Keyset pagination, revalidation, profiling
 )
 
 logger.info("✅ CORS middleware configured with HARDCODED origins")
 
 
-# Request timing middleware
+# Request timing middleware (outermost, so cached responses are timed too)
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    """Add processing time to response headers."""
+    """
+    Add processing time to response headers and record it on /metrics.
+    Selected requests are also profiled (see RequestProfiler).
+    """
     start_time = time.time()
-    response = await call_next(request)
+    with track_request(request) as outcome:
+        async with request_profiler.profile(request) as profile:
+            response = await call_next(request)
+            outcome["status"] = response.status_code
+            if profile is not None:
+                profile.annotate(response)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
 
+# Cache and coalescing counters exported on /metrics
+register_cache("llm", llm_analyzer.cache_stats)
+register_cache("http", http_cache.stats)
+register_singleflight("llm", llm_analyzer.coalescing_stats)
+register_singleflight("news", news_aggregator.coalescing_stats)
+register_router("llm", llm_analyzer.routing_stats)
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -89,6 +117,26 @@ async def startup_event():
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
+    
+    # Reconcile materialized alert counters with the alerts table
+    try:
+        db = SessionLocal()
+        try:
+            alert_stats.rebuild(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logger.error(f"Failed to rebuild alert counters: {e}")
+    
+    # Load tokenizer encodings off the event loop (tiktoken may download them)
+    await asyncio.to_thread(prompt_builder.counter.warm)
+    
+    # Open pooled HTTP client for news APIs
+    await news_aggregator.startup()
+    
+    # Keep stored news fresh off the request path
+    if settings.NEWS_INGESTION_ENABLED and settings.NEWS_API_KEY:
+        news_ingestion.start()
 
 
 # Shutdown event
@@ -96,6 +144,10 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info(f"Shutting down {settings.APP_NAME}...")
+    
+    await news_ingestion.stop()
+    await news_aggregator.aclose()
+    await async_engine.dispose()
 
 
 # Root endpoint
@@ -124,6 +176,17 @@ async def health_check():
     }
 
 
+# Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Request, database, LLM, news and cache metrics in Prometheus text format.
+    Not to be confused with /api/metrics (company time series).
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # Include API routers
 app.include_router(api_router)
 
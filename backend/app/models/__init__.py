@@ -3,6 +3,13 @@
 from app.models.company import Company
 from app.models.metrics import Metric
 from app.models.alert import Alert, AlertSeverity, AlertType
+from app.models.alert_counter import AlertCounter
+from app.models.batch_job import BatchJob, BatchJobStatus
+from app.models.summary import ExecutiveSummary
+from app.models.news import NewsArticle
 
-__all__ = ["Company", "Metric", "Alert", "AlertSeverity", "AlertType"]
+__all__ = [
+    "Company", "Metric", "Alert", "AlertSeverity", "AlertType", "AlertCounter",
+    "BatchJob", "BatchJobStatus", "ExecutiveSummary", "NewsArticle",
+]
 
@@ -1,9 +1,9 @@
 """
 Alert database model for notifications and warnings.
-Demonstrates: Enum types, status tracking
+Demonstrates: Enum types, status tracking, composite and partial indexes
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -38,11 +38,11 @@ class Alert(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Foreign key to company
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     # Alert details
-    alert_type = Column(Enum(AlertType), nullable=False, index=True)
-    severity = Column(Enum(AlertSeverity), nullable=False, index=True)
+    alert_type = Column(Enum(AlertType), nullable=False)
+    severity = Column(Enum(AlertSeverity), nullable=False)
     
     title = Column(String(500), nullable=False)
     description = Column(Text, nullable=False)
@@ -58,12 +58,31 @@ class Alert(Base):
     resolved_by = Column(String(255), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime, server_default=func.now(), index=True)
+    created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     company = relationship("Company", back_populates="alerts")
     
+    # Alert feed indexes: every filter the feed offers, followed by its
+    # (created_at, id) sort key, so a page is an index range read in order.
+    # The two default views (unresolved, unread) get partial indexes that
+    # only hold the rows they show. Managed by migration 0002.
+    __table_args__ = (
+        Index("ix_alerts_feed", created_at, id),
+        Index("ix_alerts_company_feed", company_id, created_at, id),
+        Index("ix_alerts_severity_feed", severity, created_at, id),
+        Index("ix_alerts_type_feed", alert_type, created_at, id),
+        Index(
+            "ix_alerts_unresolved_feed", created_at, id,
+            postgresql_where=(is_resolved == False), sqlite_where=(is_resolved == False)
+        ),
+        Index(
+            "ix_alerts_unread_feed", created_at, id,
+            postgresql_where=(is_read == False), sqlite_where=(is_read == False)
+        ),
+    )
+    
     def __repr__(self):
         return f"<Alert(id={self.id}, type='{self.alert_type}', severity='{self.severity}')>"
 
@@ -0,0 +1,100 @@
+"""
+Materialized alert counters kept in step with the alerts table.
+Demonstrates: Denormalized aggregates, ORM mapper events, incremental maintenance
+"""
+
+from typing import Dict
+
+from sqlalchemy import Boolean, Column, Enum, Integer, event, inspect, insert, update
+
+from app.core.database import Base
+from app.models.alert import Alert, AlertSeverity
+
+
+class AlertCounter(Base):
+    """
+    Number of alerts per (severity, is_resolved, is_read) combination.
+    
+    At most 16 rows, so dashboard statistics are a constant-size read no
+    matter how many alerts exist. Rows are adjusted by mapper events on
+    `Alert` in the same transaction as the alert change; bulk INSERT/UPDATE/
+    DELETE statements bypass those events and must apply their own deltas
+    (`adjust_counters`) or rebuild the counters.
+    """
+    
+    __tablename__ = "alert_counters"
+    
+    severity = Column(Enum(AlertSeverity), primary_key=True)
+    is_resolved = Column(Boolean, primary_key=True)
+    is_read = Column(Boolean, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return (f"<AlertCounter(severity='{self.severity}', resolved={self.is_resolved}, "
+                f"read={self.is_read}, count={self.count})>")
+
+
+def _adjust(connection, severity, is_resolved: bool, is_read: bool, delta: int) -> None:
+    """Add `delta` to one counter row, creating the row on first use."""
+    table = AlertCounter.__table__
+    key = (table.c.severity == severity) & (table.c.is_resolved == is_resolved) & (table.c.is_read == is_read)
+    result = connection.execute(update(table).where(key).values(count=table.c.count + delta))
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(
+            severity=severity, is_resolved=is_resolved, is_read=is_read, count=delta
+        ))
+
+
+def adjust_counters(connection, deltas: Dict[tuple, int]) -> None:
+    """
+    Apply counter deltas for alert writes that bypassed the ORM events.
+    
+    Args:
+        connection: Connection in the transaction that wrote the alerts
+        deltas: Change per (severity, is_resolved, is_read) key
+    """
+    for (severity, is_resolved, is_read), delta in deltas.items():
+        if delta:
+            _adjust(connection, severity, bool(is_resolved), bool(is_read), delta)
+
+
+def _key(target, before: bool = False) -> tuple:
+    """Counter key of an alert, as of now or as of before the current flush."""
+    state = inspect(target)
+    values = []
+    for name in COUNTED_FIELDS:
+        history = state.attrs[name].history
+        value = history.deleted[0] if before and history.deleted else getattr(target, name)
+        values.append(value if name == "severity" else bool(value))
+    return tuple(values)
+
+
+COUNTED_FIELDS = ("severity", "is_resolved", "is_read")
+
+
+def _load_previous_value(target, value, oldvalue, initiator) -> None:
+    """No-op; registered only for its active_history side effect."""
+
+
+# active_history loads the old value on assignment even when the attribute
+# was expired (e.g. by a commit), so after_update can see what changed
+for _name in COUNTED_FIELDS:
+    event.listen(getattr(Alert, _name), "set", _load_previous_value, active_history=True)
+
+
+@event.listens_for(Alert, "after_insert")
+def _count_inserted_alert(mapper, connection, target) -> None:
+    _adjust(connection, *_key(target), +1)
+
+
+@event.listens_for(Alert, "after_update")
+def _count_updated_alert(mapper, connection, target) -> None:
+    before, after = _key(target, before=True), _key(target)
+    if before != after:
+        _adjust(connection, *before, -1)
+        _adjust(connection, *after, +1)
+
+
+@event.listens_for(Alert, "after_delete")
+def _count_deleted_alert(mapper, connection, target) -> None:
+    _adjust(connection, *_key(target, before=True), -1)
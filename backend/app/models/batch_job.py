@@ -0,0 +1,50 @@
+"""
+Batch job database model for portfolio-wide analysis runs.
+Demonstrates: Job tracking, progress persistence, JSON result storage
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Enum
+from sqlalchemy.sql import func
+import enum
+import uuid
+
+from app.core.database import Base
+
+
+class BatchJobStatus(str, enum.Enum):
+    """Lifecycle states of a batch job."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BatchJob(Base):
+    """Persistent record of a portfolio batch analysis run."""
+    
+    __tablename__ = "batch_jobs"
+    
+    # Primary key (opaque task id handed back to clients)
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    
+    # Job details
+    job_type = Column(String(50), nullable=False, default="portfolio_analysis")
+    status = Column(Enum(BatchJobStatus), nullable=False, default=BatchJobStatus.PENDING, index=True)
+    
+    # Progress
+    total_companies = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    
+    # Input and output
+    company_ids = Column(JSON, nullable=False, default=list)
+    results = Column(JSON, nullable=True)  # {company_id: {...}}
+    error = Column(Text, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<BatchJob(id='{self.id}', status='{self.status}', progress={self.completed_count}/{self.total_companies})>"
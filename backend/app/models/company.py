@@ -60,6 +60,8 @@ class Company(Base):
     # Relationships
     metrics = relationship("Metric", back_populates="company", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="company", cascade="all, delete-orphan")
+    summaries = relationship("ExecutiveSummary", back_populates="company", cascade="all, delete-orphan")
+    news_articles = relationship("NewsArticle", back_populates="company", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Company(id={self.id}, name='{self.name}', stage='{self.stage}')>"
@@ -1,9 +1,9 @@
 """
 Metrics database model for tracking company performance over time.
-Demonstrates: Time-series data modeling, foreign keys
+Demonstrates: Time-series data modeling, foreign keys, covering series index
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -19,10 +19,10 @@ class Metric(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Foreign key to company
-    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     
     # Metric details
-    metric_type = Column(String(100), nullable=False, index=True)
+    metric_type = Column(String(100), nullable=False)
     # Types: revenue, burn_rate, runway, employee_count, web_traffic, 
     #        social_mentions, news_sentiment, etc.
     
@@ -45,6 +45,16 @@ class Metric(Base):
     # Relationships
     company = relationship("Company", back_populates="metrics")
     
+    # One company's series in time order is a single index range read; on
+    # PostgreSQL the value is carried in the index, so downsampling never
+    # visits the table
+    __table_args__ = (
+        Index(
+            "ix_metrics_series", company_id, metric_type, recorded_at,
+            postgresql_include=["metric_value"]
+        ),
+    )
+    
     def __repr__(self):
         return f"<Metric(company_id={self.company_id}, type='{self.metric_type}', value={self.metric_value})>"
 
@@ -0,0 +1,46 @@
+"""
+News article database model for persisted company news.
+Demonstrates: Deduplication via content hashes, composite constraints
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class NewsArticle(Base):
+    """News article mentioning a portfolio company."""
+    
+    __tablename__ = "news_articles"
+    __table_args__ = (
+        # One row per article per company, however often it is re-fetched
+        UniqueConstraint("company_id", "url_hash", name="uq_news_articles_company_url"),
+        # Serves "latest articles for a company" and the high-water-mark lookup
+        Index("ix_news_articles_company_published", "company_id", "published_at"),
+    )
+    
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign key to company
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    
+    # Article details
+    url_hash = Column(String(64), nullable=False)  # SHA-256 of the URL
+    url = Column(Text, nullable=True)
+    title = Column(String(500), nullable=True)
+    description = Column(Text, nullable=True)
+    source = Column(String(255), nullable=True)
+    sentiment = Column(String(20), nullable=True)
+    
+    # Timestamps
+    published_at = Column(DateTime, nullable=True)
+    fetched_at = Column(DateTime, server_default=func.now())
+    
+    # Relationships
+    company = relationship("Company", back_populates="news_articles")
+    
+    def __repr__(self):
+        return f"<NewsArticle(company_id={self.company_id}, title='{self.title}')>"
@@ -0,0 +1,37 @@
+"""
+Executive summary database model for persisted AI analysis.
+Demonstrates: Storing generated content, audit trail of model output
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ExecutiveSummary(Base):
+    """AI-generated executive summary for a portfolio company."""
+    
+    __tablename__ = "executive_summaries"
+    
+    # Primary key
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Foreign key to company
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    
+    # Generated content
+    summary = Column(Text, nullable=False)
+    model_used = Column(String(100), nullable=False)
+    source = Column(String(50), nullable=True)  # insights, summarize, batch, etc.
+    news_analyzed = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    
+    # Relationships
+    company = relationship("Company", back_populates="summaries")
+    
+    def __repr__(self):
+        return f"<ExecutiveSummary(company_id={self.company_id}, model='{self.model_used}')>"
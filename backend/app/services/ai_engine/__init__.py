@@ -1,6 +1,11 @@
 """AI Engine services."""
 
 from app.services.ai_engine.llm_analyzer import llm_analyzer, LLMAnalyzer
+from app.services.ai_engine.prompt_builder import prompt_builder, PromptBuilder, TokenCounter
+from app.services.ai_engine.provider_router import ProviderRouter, Route
+from app.services.ai_engine.batch_engine import batch_engine, PortfolioBatchEngine
 
-__all__ = ["llm_analyzer", "LLMAnalyzer"]
-
+__all__ = [
+    "llm_analyzer", "LLMAnalyzer", "prompt_builder", "PromptBuilder", "TokenCounter", "ProviderRouter", "Route",
+    "batch_engine", "PortfolioBatchEngine"
+]
@@ -0,0 +1,196 @@
+"""
+Concurrent portfolio batch analysis engine.
+Demonstrates: Bounded-concurrency asyncio scheduling, per-provider rate limiting, job persistence
+"""
+
+from typing import Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Company, BatchJob, BatchJobStatus
+from app.services.ai_engine.llm_analyzer import llm_analyzer
+from app.services.data_aggregator import news_ingestion
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioBatchEngine:
+    """
+    Fan out executive summaries and risk scores across the portfolio.
+
+    A global semaphore bounds how many companies are in flight at once,
+    while per-provider semaphores keep each LLM API (OpenAI, Anthropic)
+    under its own concurrency limit. News comes from the ingested article
+    store. Progress and results are written to the `batch_jobs` table as
+    companies finish.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_concurrency: Optional[int] = None,
+        provider_limits: Optional[Dict[str, int]] = None
+    ):
+        """Initialize batch engine."""
+        self.session_factory = session_factory
+        self.analyzer = llm_analyzer
+        self.news = news_ingestion
+        self.max_concurrency = max_concurrency or settings.BATCH_MAX_CONCURRENCY
+        self.provider_limits = provider_limits or {
+            "openai": settings.BATCH_OPENAI_CONCURRENCY,
+            "anthropic": settings.BATCH_ANTHROPIC_CONCURRENCY,
+        }
+        # Shared across jobs so two concurrent runs cannot double the load on a provider
+        self._provider_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def create_job(self, db: Session, company_ids: List[int]) -> BatchJob:
+        """
+        Persist a pending job for the given companies.
+
+        Args:
+            db: Database session
+            company_ids: IDs of the companies to analyze
+
+        Returns:
+            The newly created job record
+        """
+        job = BatchJob(
+            status=BatchJobStatus.PENDING,
+            company_ids=list(company_ids),
+            total_companies=len(company_ids),
+            results={}
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    async def run_job(self, job_id: str) -> None:
+        """
+        Execute a pending job to completion.
+
+        Intended to run as a FastAPI background task; opens its own session
+        because the request-scoped one is closed by the time it starts.
+        """
+        db = self.session_factory()
+        try:
+            job = db.get(BatchJob, job_id)
+            if job is None:
+                logger.error(f"Batch job {job_id} not found")
+                return
+
+            job.status = BatchJobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            db.commit()
+
+            companies = db.query(Company).filter(Company.id.in_(job.company_ids)).all()
+            for company in companies:
+                await self.news.refresh_if_idle(db, company)
+            snapshots = [
+                dict(self._company_snapshot(company), news=self.news.company_news(db, company, days_back=7, limit=10))
+                for company in companies
+            ]
+
+            limit = asyncio.Semaphore(self.max_concurrency)
+
+            async def analyze(snapshot: Dict) -> tuple:
+                async with limit:
+                    try:
+                        return snapshot, await self._analyze_company(snapshot), None
+                    except Exception as e:
+                        return snapshot, None, str(e)
+
+            results = dict(job.results or {})
+            for next_done in asyncio.as_completed([analyze(s) for s in snapshots]):
+                snapshot, outcome, error = await next_done
+                company_id = snapshot['id']
+
+                if error is None:
+                    results[str(company_id)] = outcome
+                    job.completed_count += 1
+                    company = db.get(Company, company_id)
+                    if company is not None:
+                        company.risk_score = outcome["risk_score"]
+                else:
+                    results[str(company_id)] = {"company_name": snapshot['name'], "error": error}
+                    job.failed_count += 1
+
+                # Reassign so SQLAlchemy detects the JSON change
+                job.results = dict(results)
+                db.commit()
+
+            job.status = BatchJobStatus.COMPLETED
+            job.finished_at = datetime.utcnow()
+            db.commit()
+
+        except Exception as e:
+            logger.error(f"Batch job {job_id} failed: {e}", exc_info=True)
+            db.rollback()
+            job = db.get(BatchJob, job_id)
+            if job is not None:
+                job.status = BatchJobStatus.FAILED
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.commit()
+        finally:
+            db.close()
+
+    async def _analyze_company(self, snapshot: Dict) -> Dict:
+        """Run summary and risk scoring concurrently for one company."""
+        news = snapshot['news']
+        company_data = {key: value for key, value in snapshot.items() if key not in ('id', 'news')}
+
+        async def summarize() -> Dict:
+            async with self._provider("openai"):
+                return await self.analyzer.generate_executive_summary(
+                    company_data=company_data,
+                    metrics=[],
+                    news=news
+                )
+
+        async def score() -> Dict:
+            async with self._provider("anthropic"):
+                return await self.analyzer.assess_risk_score(
+                    company_data=company_data,
+                    metrics=[],
+                    alerts=[]
+                )
+
+        summary, risk = await asyncio.gather(summarize(), score())
+
+        return {
+            "company_name": snapshot['name'],
+            "summary": summary.get("summary"),
+            "summary_model": summary.get("model_used"),
+            "risk_score": risk.get("risk_score", 50),
+            "risk_model": risk.get("model_used"),
+            "news_analyzed": len(news)
+        }
+
+    def _provider(self, name: str) -> asyncio.Semaphore:
+        """Get (creating lazily) the concurrency gate for a provider."""
+        if name not in self._provider_semaphores:
+            self._provider_semaphores[name] = asyncio.Semaphore(self.provider_limits.get(name, self.max_concurrency))
+        return self._provider_semaphores[name]
+
+    def _company_snapshot(self, company: Company) -> Dict:
+        """Copy the fields the analyzers need so tasks never touch the ORM session."""
+        return {
+            'id': company.id,
+            'name': company.name,
+            'industry': company.industry,
+            'stage': company.stage,
+            'current_arr': company.current_arr or 0,
+            'monthly_burn_rate': company.monthly_burn_rate or 0,
+            'runway_months': company.runway_months or 0,
+            'employee_count': company.employee_count or 0
+        }
+
+
+# Global instance
+batch_engine = PortfolioBatchEngine()
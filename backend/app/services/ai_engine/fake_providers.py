@@ -0,0 +1,159 @@
+"""
+Local fake LLM providers for offline development, tests and load tests.
+Demonstrates: Drop-in SDK fakes, seeded heavy-tailed latency, deterministic responses
+"""
+
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
+import random
+import re
+
+from app.core.config import settings
+
+# Share of calls that land in the latency tail, and how much slower they are
+TAIL_PROBABILITY = 0.05
+TAIL_MULTIPLIER = 6.0
+
+# Spread of the log-normal body of the latency distribution
+LATENCY_SIGMA = 0.25
+
+BATCH_COMPANY = re.compile(r"^COMPANY (\d+): ", re.MULTILINE)
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure."""
+
+
+class LatencyProfile:
+    """
+    Seeded latency and failure model of one fake provider.
+    
+    Latencies are log-normal around `median_ms`, with `tail_probability` of
+    calls `tail_multiplier` times slower: the long tail that hedging is for.
+    """
+    
+    def __init__(
+        self,
+        median_ms: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        tail_probability: float = TAIL_PROBABILITY,
+        tail_multiplier: float = TAIL_MULTIPLIER,
+        seed: Optional[int] = None
+    ):
+        """Initialize latency profile."""
+        self.median_ms = settings.LLM_FAKE_LATENCY_MS if median_ms is None else median_ms
+        self.error_rate = settings.LLM_FAKE_ERROR_RATE if error_rate is None else error_rate
+        self.tail_probability = tail_probability
+        self.tail_multiplier = tail_multiplier
+        self.random = random.Random(seed)
+        self.calls = 0
+    
+    def next_delay(self) -> float:
+        """Seconds the next call takes."""
+        delay = self.median_ms / 1000 * self.random.lognormvariate(0, LATENCY_SIGMA)
+        if self.random.random() < self.tail_probability:
+            delay *= self.tail_multiplier
+        return delay
+    
+    async def wait(self, provider: str) -> None:
+        """Sleep like a provider call, then fail at `error_rate`."""
+        self.calls += 1
+        delay = self.next_delay()
+        failing = self.random.random() < self.error_rate
+        await asyncio.sleep(delay / 2 if failing else delay)
+        if failing:
+            raise FakeProviderError(f"{provider} fake provider error")
+
+
+def fake_completion(prompt: str, model: str) -> str:
+    """
+    Deterministic reply in the format the prompt asks for.
+    
+    Batched risk prompts get one block per company, risk prompts a
+    RISK_SCORE, anything else a short summary; scores derive from the prompt
+    so repeated calls agree.
+    """
+    def score(text: str) -> int:
+        return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16) % 101
+    
+    refs = BATCH_COMPANY.findall(prompt)
+    if refs:
+        return "\n".join(
+            f"COMPANY: {ref}\nRISK_SCORE: {score(prompt + ref)}\nFACTORS: Runway, burn rate\nCONFIDENCE: low\nEND"
+            for ref in refs
+        )
+    if "RISK_SCORE" in prompt:
+        return (
+            f"RISK_SCORE: {score(prompt)}\nFACTORS: Runway, burn rate, growth\n"
+            f"RECOMMENDATIONS: Review the operating plan\nCONFIDENCE: low"
+        )
+    return f"Fake {model} analysis: performance is in line with plan. Keep monitoring runway and growth."
+
+
+def _usage(prompt: str, text: str) -> Dict[str, int]:
+    # Rough token counts, enough for the token counters to move
+    return {"prompt": len(prompt) // 4, "completion": len(text) // 4}
+
+
+class _FakeChatCompletions:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+    
+    async def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        await self.profile.wait("openai")
+        prompt = messages[-1]["content"]
+        text = fake_completion(prompt, model)
+        if stream:
+            return self._stream(text)
+        usage = _usage(prompt, text)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(prompt_tokens=usage["prompt"], completion_tokens=usage["completion"])
+        )
+    
+    async def _stream(self, text: str) -> AsyncIterator:
+        for word in text.split(" "):
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
+
+
+class FakeOpenAIClient:
+    """Stands in for AsyncOpenAI: `chat.completions.create`, streaming or not."""
+    
+    def __init__(self, profile: Optional[LatencyProfile] = None):
+        self.profile = profile or LatencyProfile()
+        self.chat = SimpleNamespace(completions=_FakeChatCompletions(self.profile))
+
+
+class _FakeMessages:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+    
+    async def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        await self.profile.wait("anthropic")
+        prompt = messages[-1]["content"]
+        text = fake_completion(prompt, model)
+        usage = _usage(prompt, text)
+        if stream:
+            return self._stream(text, usage)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=usage["prompt"], output_tokens=usage["completion"])
+        )
+    
+    async def _stream(self, text: str, usage: Dict[str, int]) -> AsyncIterator:
+        yield SimpleNamespace(type="message_start", message=SimpleNamespace(usage=SimpleNamespace(input_tokens=usage["prompt"])))
+        for word in text.split(" "):
+            await asyncio.sleep(0)
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=word + " "))
+        yield SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=usage["completion"]))
+
+
+class FakeAnthropicClient:
+    """Stands in for AsyncAnthropic: `messages.create`, streaming or not."""
+    
+    def __init__(self, profile: Optional[LatencyProfile] = None):
+        self.profile = profile or LatencyProfile()
+        self.messages = _FakeMessages(self.profile)
@@ -1,26 +1,79 @@
 """
 LLM-powered analysis service using OpenAI GPT-4 and Anthropic Claude.
-Demonstrates: AI/LLM integration, prompt engineering, async processing
+Demonstrates: AI/LLM integration, prompt engineering, async processing, provider routing
 """
 
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import asyncio
+import re
+import time
 from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
 from app.core.config import settings
+from app.core.instrumentation import observe_llm
+from app.core.profiling import profiled_await
+from app.core.singleflight import SingleFlight
+from app.services.ai_engine.fake_providers import FakeAnthropicClient, FakeOpenAIClient
+from app.services.ai_engine.prompt_builder import METRICS_MARKER, NEWS_MARKER, prompt_builder, rank_metrics
+from app.services.ai_engine.provider_router import ProviderRouter, Route
+from app.services.ai_engine.response_cache import llm_response_cache
+
+SUMMARY_SYSTEM_PROMPT = "You are an expert venture capital analyst specializing in portfolio company analysis."
+COMPETITIVE_SYSTEM_PROMPT = "You are a strategic business analyst specializing in competitive intelligence."
+
+RISK_MODEL = "claude-3-sonnet-20240229"
+
+# `model_used` labels reported to clients, by provider model id
+MODEL_LABELS = {"claude-3-sonnet-20240229": "claude-3-sonnet"}
+
+PROFILES_MARKER = "{profiles}"
+
+BATCH_RISK_TEMPLATE = f"""Analyze the risk profile of each portfolio company below and give each a risk score from 0-100 (100 = highest risk).
+
+{PROFILES_MARKER}
+
+Answer with one block per company, in the order given, using exactly this format and nothing else:
+COMPANY: [company number]
+RISK_SCORE: [number]
+FACTORS: [2-3 key risk factors]
+CONFIDENCE: [high/medium/low]
+END"""
+
+# Block header in batched risk responses, e.g. "COMPANY: 3"
+RISK_BLOCK_HEADER = re.compile(r"^\s*COMPANY\s*:?\s*(\d+)\s*:?\s*$", re.MULTILINE)
+RISK_BLOCK_END = re.compile(r"^\s*END\s*$", re.MULTILINE)
 
 
 class LLMAnalyzer:
     """
     AI-powered analyzer using Large Language Models.
     Supports multiple LLM providers for different use cases.
+    
+    Each task (summary, risk, competitive) is sent through the provider
+    router, which picks among the configured providers by recent latency and
+    error rate, fails over on errors and, with LLM_HEDGE_ENABLED, hedges slow
+    calls. Without any configured provider for a task, mock output is
+    returned as before.
     """
     
     def __init__(self):
         """Initialize LLM clients."""
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
-        self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None
+        if settings.LLM_FAKE_PROVIDERS:
+            self.openai_client = FakeOpenAIClient()
+            self.anthropic_client = FakeAnthropicClient()
+        else:
+            self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+            self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY) if settings.ANTHROPIC_API_KEY else None
+        self.router = ProviderRouter()
+        self.cache = llm_response_cache
+        self.prompts = prompt_builder
+        # Identical prompts issued concurrently share one provider call
+        self.inflight = SingleFlight("llm")
+        self.batch_requests = 0
+        self.batched_companies = 0
+        self.batch_fallbacks = 0
     
     async def generate_executive_summary(
         self, 
@@ -39,49 +92,25 @@ class LLMAnalyzer:
         Returns:
             Dictionary with summary and key insights
         """
-        if not self.openai_client:
+        if not self.available("summary"):
             return self._generate_mock_summary(company_data)
         
-        # Build context from data
-        context = self._build_context(company_data, metrics, news)
-        
-        # Create prompt for GPT-4
-        prompt = f"""You are an expert venture capital analyst. Analyze the following portfolio company data and provide a concise executive summary.
-
-Company: {company_data.get('name')}
-Industry: {company_data.get('industry')}
-Stage: {company_data.get('stage')}
-
-Recent Metrics:
-{self._format_metrics(metrics)}
-
-Recent News:
-{self._format_news(news)}
-
-Provide:
-1. A 2-3 sentence executive summary
-2. Key performance highlights (3-4 bullet points)
-3. Areas of concern (if any)
-4. Strategic recommendations (2-3 points)
-
-Be specific, data-driven, and actionable."""
-
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert venture capital analyst specializing in portfolio company analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,  # Lower temperature for more consistent analysis
-                max_tokens=800
+            summary_text, route = await self.router.run(
+                "summary",
+                lambda route: self._complete(
+                    route,
+                    prompt=self._build_summary_prompt(company_data, metrics, news, route.model),
+                    max_tokens=800,
+                    system_prompt=SUMMARY_SYSTEM_PROMPT,
+                    temperature=0.3  # Lower temperature for more consistent analysis
+                ),
+                self._provider_available
             )
             
-            summary_text = response.choices[0].message.content
-            
             return {
                 "summary": summary_text,
-                "model_used": "gpt-4",
+                "model_used": self._model_label(route),
                 "confidence": "high"
             }
             
@@ -89,6 +118,59 @@ Be specific, data-driven, and actionable."""
             print(f"Error generating summary: {e}")
             return self._generate_mock_summary(company_data)
     
+    async def stream_executive_summary(
+        self,
+        company_data: Dict,
+        metrics: List[Dict],
+        news: List[Dict]
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream an executive summary token by token.
+        
+        Uses the router's best summary route, moving on to the next one if a
+        provider fails before its first token, otherwise the mock summary.
+        Streams are not hedged. Cached completions are replayed as a single
+        chunk.
+        
+        Args:
+            company_data: Company information
+            metrics: Recent metrics data
+            news: Recent news articles
+            
+        Yields:
+            {"type": "token", "text": ...} events, then one
+            {"type": "done", "summary": ..., "model_used": ...} event, or
+            {"type": "error", ...} if the provider fails mid-stream
+        """
+        parts = []
+        for route in self.router.candidates("summary", self._provider_available):
+            prompt = self._build_summary_prompt(company_data, metrics, news, route.model)
+            if route.provider == "openai":
+                chunks = self._stream_openai(route.model, SUMMARY_SYSTEM_PROMPT, prompt, temperature=0.3, max_tokens=800)
+            else:
+                chunks = self._stream_anthropic(route.model, SUMMARY_SYSTEM_PROMPT, prompt, max_tokens=800)
+            model_used = self._model_label(route)
+            try:
+                async for text in chunks:
+                    parts.append(text)
+                    yield {"type": "token", "text": text}
+            except Exception as e:
+                print(f"Error streaming summary: {e}")
+                if parts:
+                    yield {"type": "error", "detail": "Summary stream interrupted", "partial": "".join(parts)}
+                    return
+            if parts:
+                break
+        
+        if not parts:
+            # No provider, or every provider failed before the first token
+            mock = self._generate_mock_summary(company_data)
+            yield {"type": "token", "text": mock["summary"]}
+            yield {"type": "done", "summary": mock["summary"], "model_used": mock["model_used"]}
+            return
+        
+        yield {"type": "done", "summary": "".join(parts), "model_used": model_used}
+    
     async def assess_risk_score(
         self, 
         company_data: Dict, 
@@ -98,7 +180,8 @@ Be specific, data-driven, and actionable."""
         """
         Calculate AI-powered risk score (0-100, where 100 is highest risk).
         
-        Uses Claude for complex reasoning about risk factors.
+        Uses Claude for complex reasoning about risk factors (routed like
+        every task, so GPT-4 can answer when Claude is slow or failing).
         
         Args:
             company_data: Company information
@@ -108,10 +191,10 @@ Be specific, data-driven, and actionable."""
         Returns:
             Dictionary with risk score, factors, and explanation
         """
-        if not self.anthropic_client:
+        if not self.available("risk"):
             return self._generate_mock_risk_score(company_data)
         
-        prompt = f"""Analyze this portfolio company's risk profile and provide a risk score from 0-100 (100 = highest risk).
+        template = f"""Analyze this portfolio company's risk profile and provide a risk score from 0-100 (100 = highest risk).
 
 Company: {company_data.get('name')}
 Industry: {company_data.get('industry')}
@@ -120,7 +203,7 @@ Burn Rate: ${company_data.get('monthly_burn_rate', 0):,.0f}/month
 ARR: ${company_data.get('current_arr', 0):,.0f}
 
 Recent Metrics Trends:
-{self._format_metrics(metrics)}
+{METRICS_MARKER}
 
 Active Alerts: {len(alerts)}
 
@@ -137,19 +220,21 @@ RECOMMENDATIONS: [recommendations]
 CONFIDENCE: [level]"""
 
         try:
-            response = await self.anthropic_client.messages.create(
-                model="claude-3-sonnet-20240229",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
+            content, route = await self.router.run(
+                "risk",
+                lambda route: self._complete(
+                    route,
+                    prompt=self.prompts.build(route.model, template, metrics=metrics),
+                    max_tokens=1000
+                ),
+                self._provider_available
             )
-            
-            content = response.content[0].text
             risk_score = self._parse_risk_score(content)
             
             return {
                 "risk_score": risk_score,
                 "analysis": content,
-                "model_used": "claude-3-sonnet",
+                "model_used": self._model_label(route),
                 "timestamp": "2024-01-15T10:00:00Z"
             }
             
@@ -157,6 +242,106 @@ CONFIDENCE: [level]"""
             print(f"Error assessing risk: {e}")
             return self._generate_mock_risk_score(company_data)
     
+    async def assess_risk_scores(
+        self,
+        items: List[Dict],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ) -> Tuple[List[Dict], int]:
+        """
+        Risk assessments for many companies, several per LLM request.
+        
+        Compact company profiles are packed into batched prompts (up to
+        `batch_size` companies and the model's prompt token budget each), and
+        the per-company RISK_SCORE blocks are parsed back out. Companies whose
+        block is missing, duplicated or invalid, and every company of a batch
+        whose request fails, are retried with `assess_risk_score`.
+        
+        Args:
+            items: Dicts with the `company_data`, `metrics` and `alerts`
+                arguments of `assess_risk_score`
+            batch_size: Companies per request, defaults to RISK_LLM_BATCH_SIZE
+            concurrency: Requests in flight, defaults to RISK_LLM_CONCURRENCY
+        
+        Returns:
+            (assessments, requests): assessments aligned with `items`, each
+            with the `latency_ms` of the request that produced it and that
+            request's `batch_size`, and the number of LLM requests made
+            (batched ones, failed ones included, plus single-company calls)
+        """
+        batch_size = batch_size or settings.RISK_LLM_BATCH_SIZE
+        limit = asyncio.Semaphore(concurrency or settings.RISK_LLM_CONCURRENCY)
+        results: List[Optional[Dict]] = [None] * len(items)
+        # Without a provider, single calls return the mock score without a request
+        single_requests = 1 if self.available("risk") else 0
+        requests = 0
+        
+        async def single(index: int, fallback: bool = False) -> None:
+            nonlocal requests
+            requests += single_requests
+            async with limit:
+                start = time.perf_counter()
+                assessment = await self.assess_risk_score(**items[index])
+            results[index] = {
+                **assessment,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "batch_size": 1,
+                "batch_fallback": fallback
+            }
+        
+        async def batch(indices: List[int]) -> None:
+            nonlocal requests
+            requests += 1
+            prompt = self._build_batch_risk_prompt([items[i] for i in indices])
+            async with limit:
+                start = time.perf_counter()
+                try:
+                    content, route = await self.router.run(
+                        "risk",
+                        lambda route: self._complete(
+                            route,
+                            prompt=prompt,
+                            max_tokens=settings.RISK_LLM_BATCH_TOKENS_PER_COMPANY * len(indices)
+                        ),
+                        self._provider_available
+                    )
+                except Exception as e:
+                    print(f"Error in batched risk assessment: {e}")
+                    content, route = "", None
+                latency_ms = round((time.perf_counter() - start) * 1000, 2)
+            self.batch_requests += 1
+            
+            blocks = self._parse_risk_blocks(content, len(indices))
+            failed = []
+            for ref, index in enumerate(indices, start=1):
+                block = blocks.get(ref)
+                if block is None:
+                    failed.append(index)
+                    continue
+                results[index] = {
+                    **block,
+                    "model_used": self._model_label(route),
+                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "latency_ms": latency_ms,
+                    "batch_size": len(indices),
+                    "batch_fallback": False
+                }
+            self.batched_companies += len(indices) - len(failed)
+            self.batch_fallbacks += len(failed)
+            await asyncio.gather(*(single(index, fallback=True) for index in failed))
+        
+        if not self.available("risk") or batch_size <= 1:
+            await asyncio.gather(*(single(index) for index in range(len(items))))
+            return results, requests
+        
+        # Batches are sized for the preferred route's prompt budget
+        model = self.router.candidates("risk", self._provider_available)[0].model
+        await asyncio.gather(*(
+            batch(indices) if len(indices) > 1 else single(indices[0])
+            for indices in self._risk_batches(items, batch_size, model)
+        ))
+        return results, requests
+    
     async def analyze_competitive_landscape(
         self, 
         company_data: Dict, 
@@ -172,82 +357,337 @@ CONFIDENCE: [level]"""
         Returns:
             Competitive analysis insights
         """
-        if not self.openai_client:
+        if not self.available("competitive"):
             return {
                 "opportunities": ["Market expansion potential", "Product differentiation"],
                 "threats": ["Increased competition", "Market saturation"],
                 "strategic_actions": ["Focus on customer retention", "Accelerate product development"]
             }
         
-        prompt = f"""Analyze the competitive landscape for this portfolio company:
+        template = f"""Analyze the competitive landscape for this portfolio company:
 
 Company: {company_data.get('name')}
 Industry: {company_data.get('industry')}
 
 Competitor Activity:
-{self._format_news(competitor_news)}
+{NEWS_MARKER}
 
 Identify:
 1. Key Opportunities (3 items)
 2. Potential Threats (3 items)
 3. Strategic Actions to Consider (3-4 items)"""
-
+        
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a strategic business analyst specializing in competitive intelligence."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.4,
-                max_tokens=600
+            analysis_text, route = await self.router.run(
+                "competitive",
+                lambda route: self._complete(
+                    route,
+                    prompt=self.prompts.build(
+                        route.model, template, news=competitor_news, system_prompt=COMPETITIVE_SYSTEM_PROMPT
+                    ),
+                    max_tokens=600,
+                    system_prompt=COMPETITIVE_SYSTEM_PROMPT,
+                    temperature=0.4
+                ),
+                self._provider_available
             )
             
             return {
-                "analysis": response.choices[0].message.content,
-                "model_used": "gpt-4"
+                "analysis": analysis_text,
+                "model_used": self._model_label(route)
             }
             
         except Exception as e:
             print(f"Error in competitive analysis: {e}")
             return {"analysis": "Competitive analysis unavailable", "model_used": "fallback"}
     
+    def cache_stats(self) -> Dict:
+        """Response cache hit/miss counters."""
+        return self.cache.stats()
+    
+    def coalescing_stats(self) -> Dict:
+        """How many concurrent duplicate completions were folded into one call."""
+        return self.inflight.stats()
+    
+    def batching_stats(self) -> Dict:
+        """Batched risk requests, companies they scored and companies retried one by one."""
+        return {
+            "requests": self.batch_requests,
+            "companies": self.batched_companies,
+            "fallbacks": self.batch_fallbacks
+        }
+    
+    def routing_stats(self) -> Dict:
+        """Failovers, hedges and each route's rolling latency and error rate."""
+        return self.router.stats()
+    
+    def available(self, task: str) -> bool:
+        """Whether any provider configured for `task` has a client."""
+        return bool(self.router.candidates(task, self._provider_available))
+    
+    # Provider calls
+    
+    def _provider_available(self, provider: str) -> bool:
+        if provider == "openai":
+            return self.openai_client is not None
+        if provider == "anthropic":
+            return self.anthropic_client is not None
+        return False
+    
+    @staticmethod
+    def _model_label(route: Route) -> str:
+        return MODEL_LABELS.get(route.model, route.model)
+    
+    async def _complete(
+        self,
+        route: Route,
+        prompt: str,
+        max_tokens: int,
+        system_prompt: str = "",
+        temperature: float = 0.3
+    ) -> str:
+        """Completion on one route (Anthropic calls keep the API's default temperature)."""
+        if route.provider == "openai":
+            return await self._complete_openai(route.model, system_prompt, prompt, temperature, max_tokens)
+        return await self._complete_anthropic(route.model, prompt, max_tokens, system_prompt=system_prompt)
+    
+    @profiled_await("llm")
+    async def _complete_openai(
+        self,
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """Chat completion via OpenAI, served from the response cache when possible."""
+        cache_key = self.cache.make_key(model, system_prompt, prompt, temperature, max_tokens)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        async def complete() -> str:
+            with self.router.observe(Route("openai", model)), observe_llm("openai", model) as call:
+                response = await self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    call.tokens(usage.prompt_tokens, usage.completion_tokens)
+            text = response.choices[0].message.content
+            
+            await self.cache.set(cache_key, text)
+            return text
+        
+        return await self.inflight.do(cache_key, complete)
+    
+    @profiled_await("llm")
+    async def _complete_anthropic(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        system_prompt: str = ""
+    ) -> str:
+        """Message completion via Anthropic, served from the response cache when possible."""
+        cache_key = self.cache.make_key(model, system_prompt, prompt, None, max_tokens)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        async def complete() -> str:
+            # The system parameter is only sent when set
+            system = {"system": system_prompt} if system_prompt else {}
+            with self.router.observe(Route("anthropic", model)), observe_llm("anthropic", model) as call:
+                response = await self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    messages=[{"role": "user", "content": prompt}],
+                    **system
+                )
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    call.tokens(usage.input_tokens, usage.output_tokens)
+            text = response.content[0].text
+            
+            await self.cache.set(cache_key, text)
+            return text
+        
+        return await self.inflight.do(cache_key, complete)
+    
+    @profiled_await("llm")
+    async def _stream_openai(
+        self,
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion from OpenAI, caching the full text once it completes."""
+        cache_key = self.cache.make_key(model, system_prompt, prompt, temperature, max_tokens)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        # Streamed chat completions carry no usage, so only latency and errors are recorded
+        with self.router.observe(Route("openai", model)), observe_llm("openai", model):
+            stream = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    yield text
+        
+        await self.cache.set(cache_key, "".join(parts))
+    
+    @profiled_await("llm")
+    async def _stream_anthropic(
+        self,
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Stream a message from Anthropic, caching the full text once it completes."""
+        cache_key = self.cache.make_key(model, system_prompt, prompt, None, max_tokens)
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        with self.router.observe(Route("anthropic", model)), observe_llm("anthropic", model) as call:
+            stream = await self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                system=system_prompt,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
+            )
+            async for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    parts.append(event.delta.text)
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    call.tokens(prompt=event.message.usage.input_tokens)
+                elif event.type == "message_delta":
+                    call.tokens(completion=event.usage.output_tokens)
+        
+        await self.cache.set(cache_key, "".join(parts))
+    
     # Helper methods
     
+    def _build_summary_prompt(self, company_data: Dict, metrics: List[Dict], news: List[Dict], model: str) -> str:
+        """Render the executive summary prompt within `model`'s token budget."""
+        template = f"""You are an expert venture capital analyst. Analyze the following portfolio company data and provide a concise executive summary.
+
+Company: {company_data.get('name')}
+Industry: {company_data.get('industry')}
+Stage: {company_data.get('stage')}
+
+Recent Metrics:
+{METRICS_MARKER}
+
+Recent News:
+{NEWS_MARKER}
+
+Provide:
+1. A 2-3 sentence executive summary
+2. Key performance highlights (3-4 bullet points)
+3. Areas of concern (if any)
+4. Strategic recommendations (2-3 points)
+
+Be specific, data-driven, and actionable."""
+        return self.prompts.build(model, template, metrics=metrics, news=news, system_prompt=SUMMARY_SYSTEM_PROMPT)
+    
     def _build_context(self, company_data: Dict, metrics: List[Dict], news: List[Dict]) -> str:
         """Build context string from data."""
         return f"Company: {company_data.get('name')}\nMetrics: {len(metrics)} data points\nNews: {len(news)} articles"
     
-    def _format_metrics(self, metrics: List[Dict]) -> str:
-        """Format metrics for LLM prompt."""
-        if not metrics:
-            return "No recent metrics available"
-        
-        formatted = []
-        for metric in metrics[:5]:  # Last 5 metrics
-            formatted.append(
-                f"- {metric.get('metric_name')}: {metric.get('metric_value')} {metric.get('metric_unit', '')}"
-            )
-        return "\n".join(formatted)
+    def _risk_profile(self, item: Dict) -> str:
+        """One-line company profile for batched risk prompts."""
+        company = item["company_data"]
+        profile = (
+            f"{company.get('name')} | Industry: {company.get('industry')} | Stage: {company.get('stage')} | "
+            f"Runway: {company.get('runway_months', 'Unknown')} months | "
+            f"Burn: ${company.get('monthly_burn_rate') or 0:,.0f}/month | ARR: ${company.get('current_arr') or 0:,.0f} | "
+            f"Active alerts: {len(item.get('alerts') or [])}"
+        )
+        latest, _ = rank_metrics(item.get("metrics") or [])
+        if latest:
+            profile += " | Metrics: " + "; ".join(line[2:] for line in latest[:3])
+        return profile
     
-    def _format_news(self, news: List[Dict]) -> str:
-        """Format news for LLM prompt."""
-        if not news:
-            return "No recent news available"
-        
-        formatted = []
-        for article in news[:3]:  # Last 3 articles
-            formatted.append(f"- {article.get('title')} ({article.get('date', 'Recent')})")
-        return "\n".join(formatted)
+    def _risk_batches(self, items: List[Dict], batch_size: int, model: str = RISK_MODEL) -> List[List[int]]:
+        """Group item indices into batches of at most `batch_size` that fit `model`'s prompt token budget."""
+        counter = self.prompts.counter
+        available = self.prompts.budget_for(model) - counter.count(BATCH_RISK_TEMPLATE, model)
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for index, item in enumerate(items):
+            # The "COMPANY n: " prefix and separating newline are a few tokens at most
+            cost = counter.count_cached(self._risk_profile(item), model) + 6
+            if current and (len(current) >= batch_size or used + cost > available):
+                batches.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
     
-    def _parse_risk_score(self, content: str) -> int:
-        """Parse risk score from LLM response."""
-        # Simple parsing - look for RISK_SCORE: [number]
-        import re
+    def _build_batch_risk_prompt(self, items: List[Dict]) -> str:
+        """Render one batched risk prompt; companies are numbered from 1."""
+        profiles = "\n".join(f"COMPANY {ref}: {self._risk_profile(item)}" for ref, item in enumerate(items, start=1))
+        return BATCH_RISK_TEMPLATE.replace(PROFILES_MARKER, profiles)
+    
+    def _parse_risk_score(self, content: str, default: Optional[int] = 50) -> Optional[int]:
+        """Parse risk score from LLM response; `default` if it is missing or outside 0-100."""
         match = re.search(r'RISK_SCORE:\s*(\d+)', content)
-        if match:
+        if match and 0 <= int(match.group(1)) <= 100:
             return int(match.group(1))
-        return 50  # Default moderate risk
+        return default  # Default moderate risk
+    
+    def _parse_risk_blocks(self, content: str, count: int) -> Dict[int, Dict]:
+        """
+        Per-company blocks of a batched risk response, keyed by company number.
+        
+        Only valid blocks are returned: a number in 1..count that appears
+        once, with a RISK_SCORE in 0-100.
+        """
+        headers = list(RISK_BLOCK_HEADER.finditer(content))
+        seen: Dict[int, int] = {}
+        blocks: Dict[int, Dict] = {}
+        for position, header in enumerate(headers):
+            ref = int(header.group(1))
+            seen[ref] = seen.get(ref, 0) + 1
+            end = headers[position + 1].start() if position + 1 < len(headers) else len(content)
+            body = RISK_BLOCK_END.split(content[header.end():end], maxsplit=1)[0].strip()
+            score = self._parse_risk_score(body, default=None)
+            if 1 <= ref <= count and score is not None:
+                blocks[ref] = {"risk_score": score, "analysis": body}
+        return {ref: block for ref, block in blocks.items() if seen[ref] == 1}
     
     def _generate_mock_summary(self, company_data: Dict) -> Dict:
         """Generate mock summary when API key is not available."""
@@ -0,0 +1,285 @@
+"""
+Token-budget-aware prompt assembly for LLMAnalyzer.
+Demonstrates: Token counting with tiktoken, greedy packing by information value, memoized counts
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+import math
+import threading
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Encoding used for models tiktoken does not know (e.g. Claude); close enough for budgeting
+FALLBACK_ENCODING = "cl100k_base"
+
+# Metric names reported first, most important first; others follow by recency
+KEY_METRICS = ("arr", "revenue", "mrr", "burn_rate", "runway", "cash", "growth", "churn", "headcount")
+
+# A neutral (or unscored) article ranks like one this many days older
+NEUTRAL_NEWS_PENALTY_DAYS = 3
+
+METRICS_MARKER = "{metrics}"
+NEWS_MARKER = "{news}"
+
+
+class TokenCounter:
+    """
+    Count tokens with tiktoken, memoizing the counts of repeated lines.
+    
+    Encodings are loaded on first use. tiktoken downloads them once (set
+    TIKTOKEN_CACHE_DIR to ship them with the image); if that fails, counts
+    fall back to an estimate of one token per 4 UTF-8 bytes, which slightly
+    over-counts English text, and loading is not retried.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None):
+        """Initialize token counter."""
+        self.max_entries = max_entries or settings.LLM_TOKEN_COUNT_CACHE_SIZE
+        self._encodings: Dict[str, object] = {}
+        self._unavailable = False
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def encoding(self, model: str):
+        """tiktoken encoding for `model`, or None when tiktoken cannot load one."""
+        if self._unavailable:
+            return None
+        if model in self._encodings:
+            return self._encodings[model]
+        try:
+            import tiktoken
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+        except Exception as e:
+            logger.warning(f"tiktoken encodings unavailable, estimating token counts: {e}")
+            self._unavailable = True
+            return None
+        self._encodings[model] = encoding
+        return encoding
+    
+    def warm(self) -> None:
+        """Load the encodings of every budgeted model (blocking; may download)."""
+        for model in settings.LLM_PROMPT_TOKEN_BUDGETS:
+            self.encoding(model)
+    
+    def count(self, text: str, model: str) -> int:
+        """Exact (or estimated) token count of `text`."""
+        encoding = self.encoding(model)
+        if encoding is None:
+            return math.ceil(len(text.encode("utf-8")) / 4)
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def count_cached(self, text: str, model: str) -> int:
+        """Token count of a line that recurs across prompts (an article, a metric)."""
+        encoding = self.encoding(model)
+        key = (encoding.name if encoding is not None else "estimate", text)
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return count
+        count = self.count(text, model)
+        with self._lock:
+            self.misses += 1
+            self._counts[key] = count
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return count
+    
+    def stats(self) -> Dict:
+        """Memoized count hits and misses."""
+        return {
+            "encoding": "estimate" if self._unavailable else "tiktoken",
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._counts)
+        }
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+def _number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return f"{value:,}" if isinstance(value, (int, float)) else str(value)
+
+
+def rank_metrics(metrics: Sequence[Dict]) -> Tuple[List[str], List[str]]:
+    """
+    Metric lines in the order they are worth including.
+    
+    Returns:
+        (latest, history): one line per metric with its newest value and the
+        change from the previous reading, key metrics first; then older
+        readings, newest first
+    """
+    series: Dict[str, List[Tuple[int, Dict]]] = {}
+    for position, metric in enumerate(metrics):
+        name = metric.get("metric_name") or metric.get("metric_type") or "metric"
+        series.setdefault(name, []).append((position, metric))
+    
+    def newest_first(item: Tuple[int, Dict]):
+        # Callers pass metrics newest first; recorded_at, when present, decides
+        recorded = _parse_time(item[1].get("recorded_at"))
+        return (recorded is None, -(recorded.timestamp() if recorded else 0), item[0])
+    
+    for name, readings in series.items():
+        series[name] = [metric for _, metric in sorted(readings, key=newest_first)]
+    
+    def priority(name: str):
+        key = (series[name][0].get("metric_type") or name).lower()
+        return KEY_METRICS.index(key) if key in KEY_METRICS else len(KEY_METRICS)
+    
+    latest, history = [], []
+    for name in sorted(series, key=priority):
+        readings = series[name]
+        current = readings[0]
+        unit = f" {current['metric_unit']}" if current.get("metric_unit") else ""
+        line = f"- {name}: {_number(current.get('metric_value'))}{unit}"
+        if len(readings) > 1:
+            previous = readings[1].get("metric_value")
+            line += f" (previous {_number(previous)}"
+            if isinstance(previous, (int, float)) and previous and isinstance(current.get("metric_value"), (int, float)):
+                line += f", {(current['metric_value'] - previous) / abs(previous):+.1%}"
+            line += ")"
+        latest.append(line)
+        for older in readings[2:]:
+            recorded = _parse_time(older.get("recorded_at"))
+            when = f" on {recorded:%Y-%m-%d}" if recorded else ""
+            history.append(f"- {name}{when}: {_number(older.get('metric_value'))}{unit}")
+    return latest, history
+
+
+def rank_news(news: Sequence[Dict], now: Optional[datetime] = None) -> List[str]:
+    """One line per distinct article, recent and non-neutral first."""
+    now = now or datetime.utcnow()
+    seen = set()
+    ranked = []
+    for position, article in enumerate(news):
+        title = (article.get("title") or "").strip()
+        if not title or title.lower() in seen:
+            continue
+        seen.add(title.lower())
+        published = _parse_time(article.get("published_at"))
+        age_days = (now - published).total_seconds() / 86400 if published else position
+        sentiment = article.get("sentiment")
+        if sentiment not in ("positive", "negative"):
+            age_days += NEUTRAL_NEWS_PENALTY_DAYS
+        date = f"{published:%Y-%m-%d}" if published else article.get("date", "Recent")
+        details = ", ".join(part for part in (date, article.get("source"), sentiment) if part)
+        ranked.append((age_days, position, f"- {title} ({details})"))
+    return [line for _, _, line in sorted(ranked)]
+
+
+class PromptBuilder:
+    """
+    Fill a prompt's metrics and news sections up to the model's input budget.
+    
+    The budget (LLM_PROMPT_TOKEN_BUDGETS) covers the system prompt and the
+    whole user prompt. The fixed text is counted first; the remainder is
+    filled greedily with, in order: each metric's latest value, news
+    articles, then older metric readings. Lines are added in rank order and
+    skipped if they do not fit. Line counts are memoized, so repeated
+    articles are not re-tokenized, and the final prompt is counted once to
+    guarantee it stays within budget.
+    """
+    
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        """Initialize prompt builder."""
+        self.counter = counter or TokenCounter()
+        self.builds = 0
+        self.omitted_lines = 0
+    
+    @staticmethod
+    def budget_for(model: str) -> int:
+        """Input token budget for `model`."""
+        return settings.LLM_PROMPT_TOKEN_BUDGETS.get(model, settings.LLM_PROMPT_TOKEN_BUDGET_DEFAULT)
+    
+    def build(
+        self,
+        model: str,
+        template: str,
+        metrics: Optional[Sequence[Dict]] = None,
+        news: Optional[Sequence[Dict]] = None,
+        system_prompt: str = "",
+        budget: Optional[int] = None
+    ) -> str:
+        """
+        Render `template`, replacing {metrics} and {news} with as much as fits.
+        
+        Args:
+            model: Model the prompt is for (selects encoding and budget)
+            template: Prompt text containing the section markers (replaced
+                literally, so company names need no escaping)
+            metrics: Metric readings, newest first
+            news: Articles
+            system_prompt: Counted against the budget too
+            budget: Overrides the model's configured budget
+        """
+        budget = budget or self.budget_for(model)
+        latest, history = rank_metrics(metrics or [])
+        articles = rank_news(news or [])
+        candidates = [("metrics", line) for line in latest] + [("news", line) for line in articles] + [
+            ("metrics", line) for line in history
+        ]
+        
+        system_tokens = self.counter.count(system_prompt, model) if system_prompt else 0
+        remaining = budget - system_tokens - self.counter.count(self._render(template, [], metrics, news), model)
+        
+        picked = []
+        for section, line in candidates:
+            cost = self.counter.count_cached(line + "\n", model)
+            if cost <= remaining:
+                picked.append((section, line))
+                remaining -= cost
+        
+        prompt = self._render(template, picked, metrics, news)
+        # Line counts are only approximately additive; drop the last picks until the whole prompt fits
+        while picked and self.counter.count(prompt, model) + system_tokens > budget:
+            picked.pop()
+            prompt = self._render(template, picked, metrics, news)
+        
+        self.builds += 1
+        self.omitted_lines += len(candidates) - len(picked)
+        return prompt
+    
+    @staticmethod
+    def _render(template: str, picked: List[Tuple[str, str]], metrics, news) -> str:
+        metric_lines = [line for section, line in picked if section == "metrics"]
+        news_lines = [line for section, line in picked if section == "news"]
+        if metric_lines:
+            metrics_text = "\n".join(metric_lines)
+        else:
+            metrics_text = "Metrics omitted to fit the token budget" if metrics else "No recent metrics available"
+        if news_lines:
+            news_text = "\n".join(news_lines)
+        else:
+            news_text = "News omitted to fit the token budget" if news else "No recent news available"
+        return template.replace(METRICS_MARKER, metrics_text).replace(NEWS_MARKER, news_text)
+    
+    def stats(self) -> Dict:
+        """Prompt and token count activity for monitoring."""
+        return {"builds": self.builds, "omitted_lines": self.omitted_lines, "token_counts": self.counter.stats()}
+
+
+# Global instance
+prompt_builder = PromptBuilder()
@@ -0,0 +1,245 @@
+"""
+Latency-aware LLM provider routing.
+Demonstrates: Rolling latency/error windows, failover, hedged requests against tail latency
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import math
+import time
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Route(NamedTuple):
+    """One provider/model a task can be sent to."""
+    
+    provider: str
+    model: str
+    
+    @classmethod
+    def parse(cls, label: str) -> "Route":
+        provider, _, model = label.partition(":")
+        return cls(provider, model)
+    
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+class NoRouteAvailable(LookupError):
+    """No configured provider can serve the task."""
+
+
+class RouteStats:
+    """
+    Latencies and errors of a route's recent provider calls.
+    
+    Keeps at most `max_samples` calls from the last `window_seconds`, so a
+    route that failed recovers once its errors age out. Percentiles are over
+    successful calls only; errors are often fast and would flatter them.
+    """
+    
+    def __init__(self, window_seconds: float, max_samples: int):
+        """Initialize route stats."""
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+    
+    def record(self, seconds: float, error: bool, now: Optional[float] = None) -> None:
+        """Add one call's latency and outcome."""
+        self._samples.append((time.monotonic() if now is None else now, seconds, error))
+    
+    def summary(self, now: Optional[float] = None) -> Dict:
+        """Calls, error rate and latency percentiles (seconds) over the window."""
+        cutoff = (time.monotonic() if now is None else now) - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        latencies = [seconds for _, seconds, error in self._samples if not error]
+        calls = len(self._samples)
+        return {
+            "calls": calls,
+            "errors": calls - len(latencies),
+            "error_rate": (calls - len(latencies)) / calls if calls else 0.0,
+            "p50": float(np.percentile(latencies, 50)) if latencies else None,
+            "p95": float(np.percentile(latencies, 95)) if latencies else None
+        }
+
+
+class ProviderRouter:
+    """
+    Send each LLM task to the fastest healthy provider, with failover and hedging.
+    
+    Candidates per task come from LLM_ROUTES. Every provider call made
+    through `observe` updates its route's rolling stats; `candidates` orders
+    healthy routes by median latency (routes without LLM_ROUTER_MIN_SAMPLES
+    calls keep their configured order after the measured ones) and puts
+    routes above LLM_ROUTER_MAX_ERROR_RATE last.
+    
+    `run` tries the first candidate and fails over to the next on an error.
+    With LLM_HEDGE_ENABLED, once the first candidate has been slower than
+    its own p95 (and LLM_HEDGE_MIN_DELAY_MS) the next candidate is asked as
+    well and the first answer wins. The loser is not waited for; provider
+    calls are shielded by the analyzer's single-flight group, so it still
+    finishes, records its latency and fills the response cache.
+    """
+    
+    def __init__(self, routes: Optional[Dict[str, List[str]]] = None):
+        """Initialize provider router."""
+        self._routes = routes
+        self._stats: Dict[Route, RouteStats] = {}
+        self.requests = 0
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    @property
+    def routes(self) -> Dict[str, List[Route]]:
+        """Configured candidates per task, preferred first."""
+        routes = self._routes if self._routes is not None else settings.LLM_ROUTES
+        return {task: [Route.parse(label) for label in labels] for task, labels in routes.items()}
+    
+    def route_stats(self, route: Route) -> RouteStats:
+        """Rolling stats of `route` (created on first use)."""
+        if route not in self._stats:
+            self._stats[route] = RouteStats(settings.LLM_ROUTER_WINDOW_SECONDS, settings.LLM_ROUTER_WINDOW_SIZE)
+        return self._stats[route]
+    
+    @staticmethod
+    def measured(summary: Dict) -> bool:
+        """Whether a route has enough recent calls for its stats to count."""
+        return summary["calls"] >= settings.LLM_ROUTER_MIN_SAMPLES
+    
+    def healthy(self, route: Route) -> bool:
+        """False while the route's recent error rate is above LLM_ROUTER_MAX_ERROR_RATE."""
+        summary = self.route_stats(route).summary()
+        return not self.measured(summary) or summary["error_rate"] <= settings.LLM_ROUTER_MAX_ERROR_RATE
+    
+    def candidates(self, task: str, available: Callable[[str], bool] = lambda provider: True) -> List[Route]:
+        """Routes for `task` whose provider is available, best first."""
+        def rank(item: Tuple[int, Route]):
+            position, route = item
+            summary = self.route_stats(route).summary()
+            latency = summary["p50"] if self.measured(summary) and summary["p50"] is not None else math.inf
+            return (not self.healthy(route), latency, position)
+        
+        routes = [route for route in self.routes.get(task, []) if available(route.provider)]
+        return [route for _, route in sorted(enumerate(routes), key=rank)]
+    
+    def hedge_delay(self, route: Route) -> Optional[float]:
+        """Seconds to wait on `route` before hedging, or None if its p95 is not known yet."""
+        summary = self.route_stats(route).summary()
+        if not self.measured(summary) or summary["p95"] is None:
+            return None
+        return max(summary["p95"], settings.LLM_HEDGE_MIN_DELAY_MS / 1000)
+    
+    @contextmanager
+    def observe(self, route: Route) -> Iterator[None]:
+        """Time one provider call of `route` into its rolling stats."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.route_stats(route).record(time.perf_counter() - start, error=True)
+            raise
+        # Cancelled calls say nothing about the route and are not recorded
+        self.route_stats(route).record(time.perf_counter() - start, error=False)
+    
+    async def run(
+        self,
+        task: str,
+        call: Callable[[Route], Awaitable[T]],
+        available: Callable[[str], bool] = lambda provider: True
+    ) -> Tuple[T, Route]:
+        """
+        Complete `task` on the best route, failing over and hedging as needed.
+        
+        Args:
+            task: Key into LLM_ROUTES ("summary", "risk", ...)
+            call: Does the work on one route (builds the prompt for its model
+                and calls the provider)
+            available: Whether a provider is configured
+        
+        Returns:
+            (result, route that produced it)
+        
+        Raises:
+            NoRouteAvailable: if no candidate's provider is available
+            Exception: the last candidate's error if every candidate failed
+        """
+        remaining = self.candidates(task, available)
+        if not remaining:
+            raise NoRouteAvailable(f"No LLM provider available for {task}")
+        self.requests += 1
+        
+        pending: Dict[asyncio.Task, Route] = {}
+        started: Dict[asyncio.Task, float] = {}
+        hedge: Optional[asyncio.Task] = None
+        last_error: Optional[BaseException] = None
+        
+        def launch() -> asyncio.Task:
+            route = remaining.pop(0)
+            attempt = asyncio.ensure_future(call(route))
+            pending[attempt] = route
+            started[attempt] = time.perf_counter()
+            return attempt
+        
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if settings.LLM_HEDGE_ENABLED and hedge is None and remaining and len(pending) == 1:
+                    (attempt, route), = pending.items()
+                    delay = self.hedge_delay(route)
+                    if delay is not None:
+                        timeout = max(0.0, delay - (time.perf_counter() - started[attempt]))
+                
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    hedge = launch()
+                    continue
+                
+                for attempt in done:
+                    route = pending.pop(attempt)
+                    if attempt.exception() is None:
+                        if attempt is hedge:
+                            self.hedge_wins += 1
+                        return attempt.result(), route
+                    last_error = attempt.exception()
+                    logger.warning(f"LLM route {route} failed for {task}: {last_error!r}")
+                
+                if not pending and remaining:
+                    self.failovers += 1
+                    launch()
+            raise last_error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+    
+    def stats(self) -> Dict:
+        """Routing counters and each route's rolling latency and error rate."""
+        routes = {}
+        for route, route_stats in self._stats.items():
+            summary = route_stats.summary()
+            routes[str(route)] = {
+                "calls": summary["calls"],
+                "error_rate": round(summary["error_rate"], 4),
+                "p50_ms": round(summary["p50"] * 1000, 1) if summary["p50"] is not None else None,
+                "p95_ms": round(summary["p95"] * 1000, 1) if summary["p95"] is not None else None,
+                "healthy": self.healthy(route)
+            }
+        return {
+            "requests": self.requests,
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "routes": routes
+        }
@@ -0,0 +1,93 @@
+"""
+Content-addressed cache for LLM completions.
+Demonstrates: Hash-keyed memoization, hit/miss accounting, pluggable storage
+"""
+
+from typing import Dict, Optional
+import hashlib
+import json
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+
+
+class LLMResponseCache:
+    """
+    Cache completions keyed on everything that determines the output.
+
+    The key is a SHA-256 over (model, system prompt, rendered prompt,
+    temperature, max tokens), so a byte-identical request is answered from
+    the cache while any change to the prompt produces a new entry.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: Optional[int] = None):
+        """Initialize response cache."""
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: str,
+        prompt: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """Build the content address for a completion request."""
+        payload = json.dumps([model, system_prompt, prompt, temperature, max_tokens], ensure_ascii=False)
+        return "llm:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return cached completion text, counting the hit or miss."""
+        if not self.enabled:
+            return None
+
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, text: str) -> None:
+        """Store completion text."""
+        if self.enabled and text:
+            await self.backend.set(key, text, ttl=self.ttl)
+
+    async def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        if self.enabled:
+            await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self.backend.size() if self.enabled else 0,
+            "ttl_seconds": self.ttl
+        }
+
+
+# Global instance
+llm_response_cache = LLMResponseCache(
+    create_cache_backend(
+        settings.LLM_CACHE_BACKEND,
+        redis_url=settings.REDIS_URL,
+        prefix="investorlens:",
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        default_ttl=settings.LLM_CACHE_TTL_SECONDS
+    ),
+    ttl=settings.LLM_CACHE_TTL_SECONDS
+)
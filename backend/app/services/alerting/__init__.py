@@ -0,0 +1,5 @@
+"""Alert services."""
+
+from app.services.alerting.stats import alert_stats, AlertStatsService, summarize
+
+__all__ = ["alert_stats", "AlertStatsService", "summarize"]
@@ -0,0 +1,128 @@
+"""
+Alert statistics from one aggregate query or the materialized counters.
+Demonstrates: Conditional aggregation, O(1) reads from denormalized counters
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Alert, AlertCounter, AlertSeverity
+from app.models.alert_counter import adjust_counters
+
+CounterRow = Tuple[AlertSeverity, bool, bool, int]
+
+SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+
+def stats_payload(by_severity: Dict[str, int], unread: int) -> Dict:
+    """The /api/alerts/stats/summary response from unresolved counts per severity."""
+    return {
+        "total_unresolved": sum(by_severity.values()),
+        "critical": by_severity["critical"],
+        "high": by_severity["high"],
+        "unread": unread,
+        "by_severity": {level: by_severity[level] for level in SEVERITY_ORDER}
+    }
+
+
+def summarize(rows: Iterable[CounterRow]) -> Dict:
+    """Build the statistics from (severity, is_resolved, is_read, count) rows."""
+    by_severity = {level: 0 for level in SEVERITY_ORDER}
+    unread = 0
+    for severity, is_resolved, is_read, count in rows:
+        if not is_resolved:
+            by_severity[AlertSeverity(severity).value] += count
+        if not is_read:
+            unread += count
+    return stats_payload(by_severity, unread)
+
+
+class AlertStatsService:
+    """
+    Serve alert statistics without counting the alerts table per severity.
+    
+    `aggregate` scans alerts once with conditional counts; `from_counters`
+    reads the at most 16 rows of `alert_counters`, which mapper events on
+    Alert keep current. Bulk statements that bypass the ORM either pass
+    their known deltas to `apply_deltas` or, when the affected rows are not
+    known, call `rebuild` (also run at startup) to recount from the alerts table.
+    """
+    
+    def __init__(self, use_counters: Optional[bool] = None):
+        """Initialize alert stats service."""
+        self.use_counters = settings.ALERT_STATS_FROM_COUNTERS if use_counters is None else use_counters
+    
+    def aggregate(self, db: Session) -> Dict:
+        """
+        Statistics from one scan of the alerts table.
+        
+        Conditional counts need no sort or hash step, which makes this
+        cheaper than a GROUP BY (and than one COUNT per number).
+        """
+        unresolved = Alert.is_resolved == False
+        *per_severity, unread = db.execute(select(
+            *(func.count(case((unresolved & (Alert.severity == AlertSeverity(level)), 1))) for level in SEVERITY_ORDER),
+            func.count(case((Alert.is_read == False, 1)))
+        )).one()
+        return stats_payload(dict(zip(SEVERITY_ORDER, per_severity)), unread)
+    
+    def grouped_counts(self, db: Session) -> list:
+        """Alert counts per (severity, is_resolved, is_read) in one GROUP BY query."""
+        return db.execute(
+            select(Alert.severity, Alert.is_resolved, Alert.is_read, func.count())
+            .group_by(Alert.severity, Alert.is_resolved, Alert.is_read)
+        ).all()
+    
+    def from_counters(self, db: Session) -> Dict:
+        """Statistics from the materialized counters (constant cost)."""
+        rows = db.execute(
+            select(AlertCounter.severity, AlertCounter.is_resolved, AlertCounter.is_read, AlertCounter.count)
+        ).all()
+        return summarize(rows)
+    
+    def summary(self, db: Session) -> Dict:
+        """Statistics from the configured source."""
+        return self.from_counters(db) if self.use_counters else self.aggregate(db)
+    
+    def apply_deltas(self, db: Session, deltas: Dict[tuple, int]) -> None:
+        """
+        Adjust the counters for a bulk statement, in the caller's transaction.
+        
+        Args:
+            deltas: Change in alert count per (severity, is_resolved, is_read)
+        """
+        adjust_counters(db.connection(), deltas)
+    
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every counter from the alerts table in one transaction.
+        
+        Returns:
+            Number of counter rows written
+        """
+        # Seed every combination so concurrent first writes only ever UPDATE
+        counts = {
+            (severity, is_resolved, is_read): 0
+            for severity in AlertSeverity
+            for is_resolved in (False, True)
+            for is_read in (False, True)
+        }
+        # NULL flags (never written by the ORM, which defaults them) count as False
+        for severity, is_resolved, is_read, count in self.grouped_counts(db):
+            counts[(AlertSeverity(severity), bool(is_resolved), bool(is_read))] += count
+        rows = [
+            {"severity": severity, "is_resolved": is_resolved, "is_read": is_read, "count": count}
+            for (severity, is_resolved, is_read), count in counts.items()
+        ]
+        
+        db.execute(delete(AlertCounter))
+        db.execute(insert(AlertCounter), rows)
+        db.commit()
+        return len(rows)
+
+
+# Global instance
+alert_stats = AlertStatsService()
@@ -0,0 +1,10 @@
+"""Portfolio analytics: columnar metrics cache, benchmarks and the dashboard summary."""
+
+from app.services.analytics.metric_store import metric_store, MetricColumnStore, MetricColumns
+from app.services.analytics.benchmarks import portfolio_benchmarks, PortfolioBenchmarks
+from app.services.analytics.portfolio_summary import portfolio_summary, PortfolioSummaryService
+
+__all__ = [
+    "metric_store", "MetricColumnStore", "MetricColumns", "portfolio_benchmarks", "PortfolioBenchmarks",
+    "portfolio_summary", "PortfolioSummaryService",
+]
@@ -0,0 +1,111 @@
+"""
+Portfolio benchmarks computed over the columnar metrics cache.
+Demonstrates: Vectorized cross-portfolio aggregation, group-by medians
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Company
+from app.services.analytics.metric_store import MetricColumnStore, metric_store
+
+# Company attributes benchmarks can be grouped by
+GROUP_BY = ("stage", "industry")
+
+
+def _median(values: np.ndarray) -> Optional[float]:
+    known = values[~np.isnan(values)]
+    return round(float(np.median(known)), 4) if len(known) else None
+
+
+class PortfolioBenchmarks:
+    """
+    Medians of growth, burn and burn multiple across peer groups.
+    
+    Per-company inputs come from the metric store as whole-portfolio arrays
+    (one reduction per metric type, no per-company queries); only the
+    grouping itself loops, once per group.
+    
+    Burn multiple is cash burned over the window divided by ARR added over
+    it. ARR added is derived from the current ARR and the growth of the
+    revenue series, so it holds whatever unit the series is recorded in.
+    Burn is the mean `burn_rate` reading in the window (or the company's
+    current monthly burn) times the window's months. It is undefined (null)
+    for companies whose ARR did not grow.
+    """
+    
+    def __init__(self, store: Optional[MetricColumnStore] = None):
+        """Initialize portfolio benchmarks."""
+        self.store = store or metric_store
+    
+    def company_metrics(self, db: Session, window_days: int) -> Dict[str, np.ndarray]:
+        """Growth, monthly burn and burn multiple for every active company, as aligned arrays."""
+        rows = db.execute(
+            select(Company.id, Company.stage, Company.industry, Company.current_arr, Company.monthly_burn_rate)
+            .where(Company.is_active == True)
+            .order_by(Company.id)
+        ).all()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        since = datetime.utcnow() - timedelta(days=window_days)
+        
+        growth = self.store.growth(db, settings.RISK_GROWTH_METRIC_TYPE, ids, since)
+        burn = self.store.mean(db, settings.METRICS_BURN_METRIC_TYPE, ids, since)
+        current_burn = np.array([row[4] for row in rows], dtype=float)
+        burn = np.where(np.isnan(burn), current_burn, burn)
+        arr = np.array([row[3] for row in rows], dtype=float)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            net_new_arr = arr - arr / (1 + growth)
+            burned = burn * window_days / 30
+            burn_multiple = np.where(net_new_arr > 0, burned / net_new_arr, np.nan)
+        
+        return {
+            "company_id": ids,
+            "stage": np.array([row[1] or "Unknown" for row in rows], dtype=object),
+            "industry": np.array([row[2] or "Unknown" for row in rows], dtype=object),
+            "arr": arr,
+            "growth": growth,
+            "monthly_burn": burn,
+            "burn_multiple": burn_multiple
+        }
+    
+    def by_group(self, db: Session, group_by: str = "stage", window_days: Optional[int] = None) -> List[Dict]:
+        """
+        Benchmarks per stage or industry, largest groups first.
+        
+        Args:
+            db: Database session
+            group_by: "stage" or "industry"
+            window_days: Look-back window, defaults to RISK_GROWTH_WINDOW_DAYS
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Cannot group by {group_by!r}")
+        window_days = window_days or settings.RISK_GROWTH_WINDOW_DAYS
+        metrics = self.company_metrics(db, window_days)
+        if len(metrics["company_id"]) == 0:
+            return []
+        
+        groups, codes = np.unique(metrics[group_by].astype(str), return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        
+        results = []
+        for group, members in zip(groups, np.split(order, boundaries)):
+            results.append({
+                group_by: str(group),
+                "companies": len(members),
+                "total_arr": float(np.nansum(metrics["arr"][members])),
+                "median_growth": _median(metrics["growth"][members]),
+                "median_monthly_burn": _median(metrics["monthly_burn"][members]),
+                "median_burn_multiple": _median(metrics["burn_multiple"][members])
+            })
+        return sorted(results, key=lambda r: (-r["companies"], r[group_by]))
+
+
+# Global instance
+portfolio_benchmarks = PortfolioBenchmarks()
@@ -0,0 +1,321 @@
+"""
+In-process columnar cache of the metrics time series.
+Demonstrates: Columnar (CSR) layout, incremental refresh, memory-bounded LRU
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence, Set, Tuple
+import logging
+import threading
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Metric
+
+logger = logging.getLogger(__name__)
+
+
+def align(keys: np.ndarray, values: np.ndarray, wanted: Sequence[int]) -> np.ndarray:
+    """Values for `wanted` from sorted `keys`; NaN where a key is missing."""
+    wanted = np.asarray(wanted, dtype=np.int64)
+    out = np.full(len(wanted), np.nan)
+    if len(keys) == 0:
+        return out
+    positions = np.clip(np.searchsorted(keys, wanted), 0, len(keys) - 1)
+    found = keys[positions] == wanted
+    out[found] = values[positions[found]]
+    return out
+
+
+class MetricColumns:
+    """
+    One metric type as parallel arrays sorted by (company_id, recorded_at).
+    
+    `companies` holds the distinct company IDs in ascending order and company
+    `companies[i]` owns rows `offsets[i]:offsets[i + 1]`, so per-company
+    reductions are single `np.add.reduceat` calls over contiguous segments.
+    """
+    
+    def __init__(self, company_ids: np.ndarray, times: np.ndarray, values: np.ndarray):
+        keep = ~np.isnat(times)
+        company_ids, times, values = company_ids[keep], times[keep], values[keep]
+        order = np.lexsort((times, company_ids))
+        self.times = times[order]
+        self.values = values[order]
+        self.companies, starts = np.unique(company_ids[order], return_index=True)
+        self.offsets = np.append(starts, len(order)).astype(np.int64)
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[int, datetime, float]]) -> "MetricColumns":
+        """Build from (company_id, recorded_at, metric_value) rows."""
+        company_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        times = np.array([row[1] for row in rows], dtype="datetime64[us]")
+        values = np.fromiter((row[2] for row in rows), dtype=float, count=len(rows))
+        return cls(company_ids, times, values)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes + self.companies.nbytes + self.offsets.nbytes
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def row_companies(self) -> np.ndarray:
+        """Company ID of every row."""
+        return np.repeat(self.companies, np.diff(self.offsets))
+    
+    def merge(self, rows: Sequence[Tuple[int, datetime, float]]) -> "MetricColumns":
+        """New columns with `rows` added in their (company, time) positions."""
+        added = MetricColumns.from_rows(rows)
+        return MetricColumns(
+            np.concatenate([self.row_companies(), added.row_companies()]),
+            np.concatenate([self.times, added.times]),
+            np.concatenate([self.values, added.values])
+        )
+    
+    def window(self, since: datetime, until: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Index of each company's first reading in [since, until), and how many there are.
+        
+        Times are sorted within a segment, so a company's in-window readings
+        are the contiguous rows first .. first + count - 1.
+        """
+        if len(self.companies) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        starts = self.offsets[:-1]
+        since = np.datetime64(since, "us")
+        before = np.add.reduceat((self.times < since).astype(np.int64), starts)
+        in_window = self.times >= since
+        if until is not None:
+            in_window &= self.times < np.datetime64(until, "us")
+        count = np.add.reduceat(in_window.astype(np.int64), starts)
+        return starts + before, count
+
+
+class MetricColumnStore:
+    """
+    Columnar copy of `metrics`, one MetricColumns per metric type.
+    
+    Types are loaded on first use. Every read first pulls rows inserted since
+    the last read: IDs above the high-water mark, plus the trailing
+    METRICS_CACHE_ID_MARGIN IDs below it, because a transaction can commit
+    after one holding a higher ID. IDs in that trailing window that are
+    already cached are remembered and skipped. An insert that commits more
+    than the margin behind the high-water mark is missed until the cache is
+    cleared. ORM updates and deletes of metrics drop the cache (see
+    `_track_changes`); other out-of-band rewrites of the table need `clear`.
+    When the arrays exceed `max_bytes`, the least recently used types are
+    evicted and reload on their next use.
+    
+    Queries run outside `_lock`, which only guards swapping the arrays: under
+    `AsyncSession.run_sync` every caller shares the event loop thread, so a
+    lock held across I/O would block the loop on the second caller. Results
+    read before a `clear` or invalidation are discarded.
+    """
+    
+    def __init__(self, max_bytes: Optional[int] = None, id_margin: Optional[int] = None):
+        """Initialize metric column store."""
+        self.max_bytes = settings.METRICS_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.id_margin = settings.METRICS_CACHE_ID_MARGIN if id_margin is None else id_margin
+        self._columns: "OrderedDict[str, MetricColumns]" = OrderedDict()
+        self._watermark = 0
+        self._seen: Set[int] = set()  # Cached IDs within the trailing margin
+        self._generation = 0
+        self._stale = False
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.refreshes = 0
+        self.evictions = 0
+    
+    def _reset(self) -> None:
+        self._columns.clear()
+        self._seen.clear()
+        self._watermark = 0
+        self._stale = False
+        self._generation += 1
+    
+    def clear(self) -> None:
+        """Drop every cached type; the next read reloads from the database."""
+        with self._lock:
+            self._reset()
+    
+    def invalidate(self) -> None:
+        """Mark the cache stale after metrics were updated or deleted."""
+        self._stale = True
+    
+    def _current(self, generation: int) -> bool:
+        """Whether nothing was cleared or invalidated since `generation` was read."""
+        return generation == self._generation and not self._stale
+    
+    def _refresh(self, db: Session) -> None:
+        """Merge rows inserted since the last refresh into the loaded types."""
+        with self._lock:
+            if self._stale:
+                self._reset()
+            generation, watermark, loaded = self._generation, self._watermark, list(self._columns)
+        
+        max_id = db.execute(select(func.max(Metric.id))).scalar() or 0
+        rows = []
+        if loaded and max_id > 0 and max_id >= watermark:
+            rows = db.execute(
+                select(Metric.id, Metric.metric_type, Metric.company_id, Metric.recorded_at, Metric.metric_value)
+                .where(
+                    Metric.id > watermark - self.id_margin,
+                    Metric.id <= max_id,
+                    Metric.metric_type.in_(loaded)
+                )
+            ).all()
+        
+        with self._lock:
+            if not self._current(generation):
+                return
+            if max_id < watermark:
+                # The table was rebuilt underneath us; IDs are no longer comparable
+                self._reset()
+                return
+            floor = self._watermark - self.id_margin
+            added: Dict[str, list] = {}
+            for metric_id, metric_type, *row in rows:
+                if metric_id > floor and metric_id not in self._seen and metric_type in self._columns:
+                    added.setdefault(metric_type, []).append(row)
+                    self._seen.add(metric_id)
+            for metric_type, new_rows in added.items():
+                self._columns[metric_type] = self._columns[metric_type].merge(new_rows)
+            if added:
+                self.refreshes += 1
+            if max_id > self._watermark:
+                self._watermark = max_id
+                floor = self._watermark - self.id_margin
+                self._seen = {metric_id for metric_id in self._seen if metric_id > floor}
+    
+    def columns(self, db: Session, metric_type: str) -> MetricColumns:
+        """Current columns for one metric type, loading them on first use."""
+        self._refresh(db)
+        with self._lock:
+            columns = self._columns.get(metric_type)
+            if columns is not None:
+                self._columns.move_to_end(metric_type)
+                return columns
+            generation = self._generation
+        
+        rows = db.execute(
+            select(Metric.id, Metric.company_id, Metric.recorded_at, Metric.metric_value)
+            .where(Metric.metric_type == metric_type)
+        ).all()
+        columns = MetricColumns.from_rows([row[1:] for row in rows])
+        
+        with self._lock:
+            self.loads += 1
+            if not self._current(generation):
+                return columns
+            if metric_type in self._columns:
+                # Loaded concurrently by another caller
+                return self._columns[metric_type]
+            if columns.nbytes > self.max_bytes:
+                logger.warning(f"Metric type {metric_type!r} ({columns.nbytes} bytes) exceeds the cache budget; not cached")
+                return columns
+            self._columns[metric_type] = columns
+            floor = self._watermark - self.id_margin
+            self._seen.update(row[0] for row in rows if row[0] > floor)
+            while self.nbytes > self.max_bytes:
+                self._columns.popitem(last=False)
+                self.evictions += 1
+            return columns
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(columns.nbytes for columns in self._columns.values())
+    
+    def growth(
+        self,
+        db: Session,
+        metric_type: str,
+        company_ids: Sequence[int],
+        since: datetime
+    ) -> np.ndarray:
+        """
+        Fractional change between each company's first and last reading since `since`.
+        
+        Returns:
+            Array aligned with `company_ids`; NaN with fewer than two readings
+            or a non-positive first reading
+        """
+        columns = self.columns(db, metric_type)
+        if len(columns) == 0:
+            return np.full(len(company_ids), np.nan)
+        
+        first, count = columns.window(since)
+        # Companies with no readings in the window point one past their segment; clip to stay in bounds
+        last = np.minimum(first + np.maximum(count, 1) - 1, len(columns) - 1)
+        first = np.minimum(first, len(columns) - 1)
+        start, end = columns.values[first], columns.values[last]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_company = np.where((count >= 2) & (start > 0), (end - start) / start, np.nan)
+        return align(columns.companies, per_company, company_ids)
+    
+    def mean(
+        self,
+        db: Session,
+        metric_type: str,
+        company_ids: Sequence[int],
+        since: datetime
+    ) -> np.ndarray:
+        """Mean of each company's readings since `since`, aligned with `company_ids` (NaN if none)."""
+        columns = self.columns(db, metric_type)
+        if len(columns) == 0:
+            return np.full(len(company_ids), np.nan)
+        
+        _, count = columns.window(since)
+        in_window = columns.times >= np.datetime64(since, "us")
+        totals = np.add.reduceat(np.where(in_window, columns.values, 0.0), columns.offsets[:-1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_company = np.where(count > 0, totals / count, np.nan)
+        return align(columns.companies, per_company, company_ids)
+    
+    def latest(self, db: Session, metric_type: str, company_ids: Sequence[int]) -> np.ndarray:
+        """Each company's most recent reading, aligned with `company_ids` (NaN if none)."""
+        columns = self.columns(db, metric_type)
+        return align(columns.companies, columns.values[columns.offsets[1:] - 1], company_ids)
+    
+    def stats(self) -> Dict:
+        """Cache size and activity for monitoring."""
+        return {
+            "metric_types": list(self._columns),
+            "rows": sum(len(columns) for columns in self._columns.values()),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions
+        }
+
+
+def _changed_metrics(objects: Iterable) -> bool:
+    return any(isinstance(obj, Metric) for obj in objects)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changes(session, flush_context) -> None:
+    """Note updates and deletes of metrics; inserts are caught by the ID refresh in `_refresh`."""
+    if _changed_metrics(session.deleted) or _changed_metrics(obj for obj in session.dirty if session.is_modified(obj)):
+        session.info["metric_store_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session) -> None:
+    if session.info.pop("metric_store_stale", False):
+        metric_store.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session, previous_transaction) -> None:
+    session.info.pop("metric_store_stale", None)
+
+
+# Global instance
+metric_store = MetricColumnStore()
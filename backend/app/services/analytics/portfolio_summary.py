@@ -0,0 +1,129 @@
+"""
+Precomputed portfolio dashboard summary.
+Demonstrates: Maintained snapshots, tag-version validation, conditional aggregation
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+import asyncio
+import time
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Company
+from app.services.alerting import alert_stats
+from app.services.caching import http_cache
+
+# Risk buckets shown on the dashboard: [lower bound, upper bound)
+RISK_BUCKETS = {"low": (0, 35), "medium": (35, 60), "high": (60, 101)}
+
+# Cache tags whose data the summary is computed from
+SUMMARY_TAGS = ("companies", "alerts", "alert-stats")
+
+
+class PortfolioSummaryService:
+    """
+    Keep the dashboard's headline numbers as a small in-process snapshot.
+    
+    The snapshot records the HTTP cache's versions of SUMMARY_TAGS when it is
+    computed. Every company or alert write bumps one of those versions (via
+    the ORM events or the bulk endpoints), so the next read sees the mismatch
+    and recomputes; with the HTTP cache disabled, or for writes it cannot
+    see, the snapshot is also recomputed once it is `max_age` seconds old.
+    Recomputing is two aggregate queries plus the alert counters, and
+    concurrent readers of a stale snapshot wait for a single recompute.
+    """
+    
+    def __init__(self, max_age: Optional[int] = None, top_n: Optional[int] = None):
+        """Initialize portfolio summary service."""
+        self.max_age = settings.PORTFOLIO_SUMMARY_MAX_AGE_SECONDS if max_age is None else max_age
+        self.top_n = top_n or settings.PORTFOLIO_SUMMARY_TOP_N
+        self._snapshot: Optional[Dict] = None
+        self._versions: Optional[Dict[str, str]] = None
+        self._computed_at = 0.0
+        self._lock = asyncio.Lock()
+        self.computations = 0
+        self.reads = 0
+    
+    def clear(self) -> None:
+        """Forget the snapshot; the next read recomputes."""
+        self._snapshot = None
+        self._versions = None
+    
+    def compute(self, db: Session) -> Dict:
+        """Build the summary from the database."""
+        active = Company.is_active == True
+        risk = func.coalesce(Company.risk_score, 50)
+        arr = func.coalesce(Company.current_arr, 0.0)
+        
+        totals = db.execute(select(
+            func.count(),
+            func.sum(arr),
+            func.sum(func.coalesce(Company.monthly_burn_rate, 0.0)),
+            func.avg(risk),
+            func.sum(risk * arr),
+            *(func.count(case(((risk >= low) & (risk < high), 1))) for low, high in RISK_BUCKETS.values())
+        ).where(active)).one()
+        count, total_arr, total_burn, average_risk, risk_arr, *buckets = totals
+        total_arr = float(total_arr or 0)
+        
+        top = db.execute(
+            select(Company.id, Company.name, risk.label("risk_score"), Company.runway_months, Company.current_arr)
+            .where(active)
+            .order_by(risk.desc(), Company.id)
+            .limit(self.top_n)
+        ).all()
+        
+        return {
+            "total_companies": count,
+            "total_arr": total_arr,
+            "total_monthly_burn": float(total_burn or 0),
+            "average_risk_score": round(float(average_risk), 1) if count else 0.0,
+            # Risk weighted by ARR: large companies move the number more
+            "weighted_risk_score": round(float(risk_arr) / total_arr, 1) if total_arr else None,
+            "risk_buckets": dict(zip(RISK_BUCKETS, buckets)),
+            "alerts": alert_stats.summary(db),
+            "top_at_risk": [row._asdict() for row in top],
+            "computed_at": datetime.utcnow().isoformat()
+        }
+    
+    def _is_fresh(self, versions: Optional[Dict[str, str]]) -> bool:
+        return (
+            self._snapshot is not None
+            and time.monotonic() - self._computed_at < self.max_age
+            and versions == self._versions
+        )
+    
+    async def get(self, db: AsyncSession) -> Dict:
+        """The current summary, recomputed first if a write or `max_age` made it stale."""
+        self.reads += 1
+        # Publish invalidations queued by commits outside a request
+        await http_cache.settle()
+        versions = await http_cache.versions(SUMMARY_TAGS)
+        if self._is_fresh(versions):
+            return self._snapshot
+        
+        async with self._lock:
+            # Another reader may have recomputed while we waited
+            if self._is_fresh(versions):
+                return self._snapshot
+            snapshot = await db.run_sync(self.compute)
+            self._snapshot, self._versions, self._computed_at = snapshot, versions, time.monotonic()
+            self.computations += 1
+            return snapshot
+    
+    def stats(self) -> Dict:
+        """Read and recompute counters for monitoring."""
+        return {
+            "reads": self.reads,
+            "computations": self.computations,
+            "age_seconds": round(time.monotonic() - self._computed_at, 1) if self._snapshot else None,
+            "max_age_seconds": self.max_age
+        }
+
+
+# Global instance
+portfolio_summary = PortfolioSummaryService()
@@ -0,0 +1,5 @@
+"""Caching services."""
+
+from app.services.caching.http_cache import http_cache, HTTPResponseCache, HTTPCacheMiddleware
+
+__all__ = ["http_cache", "HTTPResponseCache", "HTTPCacheMiddleware"]
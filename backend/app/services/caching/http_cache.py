@@ -0,0 +1,335 @@
+"""
+Tag-invalidated HTTP response cache with ETag revalidation.
+Demonstrates: Versioned cache keys, ORM-driven invalidation, conditional GETs
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Match
+
+from app.core.cache import CacheBackend, create_cache_backend
+from app.core.config import settings
+from app.models import Alert, Company, Metric
+
+logger = logging.getLogger(__name__)
+
+# Cached GET routes (by path template) and the tags each response depends on
+CACHED_ROUTES: Dict[str, Callable[[Dict], Tuple[str, ...]]] = {
+    "/api/companies": lambda params: ("companies",),
+    "/api/companies/{company_id}": lambda params: (f"company:{params['company_id']}",),
+    "/api/alerts": lambda params: ("alerts",),
+    "/api/alerts/stats/summary": lambda params: ("alert-stats",),
+    "/api/metrics/{company_id}/{metric_type}": lambda params: (f"metrics:{params['company_id']}",),
+}
+
+# Response headers stored with the body and replayed on hits
+REPLAYED_HEADERS = ("content-type", "x-next-cursor", "link")
+
+# Alert fields that the statistics count
+COUNTED_ALERT_FIELDS = ("severity", "is_read", "is_resolved")
+
+CACHE_CONTROL = "private, no-cache"  # Clients may store, but must revalidate with If-None-Match
+
+
+def _changed(obj, *fields: str) -> bool:
+    """Whether any of `fields` changed in the flush being processed."""
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+
+def tags_for_changes(new: Iterable, dirty: Iterable, deleted: Iterable) -> Set[str]:
+    """
+    Cache tags made stale by a flush of the given objects.
+    
+    Companies invalidate the company list and their own detail; a renamed or
+    deleted company also invalidates the alert feed, which shows the name.
+    Alerts invalidate the feed, and the statistics only when a counted
+    field (or the alert's existence) changed. Metrics invalidate their
+    company's series.
+    """
+    tags: Set[str] = set()
+    for obj in new:
+        if isinstance(obj, Company):
+            tags.add("companies")
+        elif isinstance(obj, Alert):
+            tags.update(("alerts", "alert-stats"))
+        elif isinstance(obj, Metric):
+            tags.add(f"metrics:{obj.company_id}")
+    
+    for obj in dirty:
+        if isinstance(obj, Company):
+            tags.update(("companies", f"company:{obj.id}"))
+            if _changed(obj, "name"):
+                tags.add("alerts")
+        elif isinstance(obj, Alert):
+            tags.add("alerts")
+            if _changed(obj, *COUNTED_ALERT_FIELDS):
+                tags.add("alert-stats")
+        elif isinstance(obj, Metric):
+            tags.add(f"metrics:{obj.company_id}")
+    
+    for obj in deleted:
+        if isinstance(obj, Company):
+            tags.update(("companies", f"company:{obj.id}", "alerts"))
+        elif isinstance(obj, Alert):
+            tags.update(("alerts", "alert-stats"))
+        elif isinstance(obj, Metric):
+            tags.add(f"metrics:{obj.company_id}")
+    return tags
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class HTTPResponseCache:
+    """
+    Cache whole GET responses and invalidate them by tag.
+    
+    Every tag has a version token stored in the backend; a response is
+    cached under a key that embeds the current versions of its tags, so
+    invalidating a tag is a single write of a fresh token and stale entries
+    simply stop being addressed (they age out by TTL or LRU). Works the same
+    on the in-memory and Redis backends.
+    
+    Tags are collected from ORM flushes (see `_collect_tags`) and published
+    after the transaction commits; bulk statements that bypass the ORM must
+    call `invalidate` themselves.
+    """
+    
+    def __init__(self, backend: Optional[CacheBackend], ttl: Optional[int] = None):
+        """Initialize HTTP response cache."""
+        self.backend = backend
+        self.ttl = ttl
+        self.pending: Set[str] = set()
+        self._flushes: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+    
+    async def _tag_version(self, tag: str) -> str:
+        key = f"tag:{tag}"
+        version = await self.backend.get(key)
+        if version is None:
+            # Never reuse a version: an evicted tag must not revive old entries
+            version = uuid.uuid4().hex
+            await self.backend.set(key, version, ttl=0)
+        return version
+    
+    async def versions(self, tags: Iterable[str]) -> Optional[Dict[str, str]]:
+        """
+        Current version of each tag (None when the cache is disabled).
+        
+        Lets other in-process snapshots detect writes the same way cached
+        responses do: equal versions mean no invalidation since.
+        """
+        if not self.enabled:
+            return None
+        return {tag: await self._tag_version(tag) for tag in tags}
+    
+    async def make_key(self, request: Request, tags: Iterable[str]) -> str:
+        """Cache key for a request, bound to the current version of each tag."""
+        versions = [f"{tag}={await self._tag_version(tag)}" for tag in sorted(tags)]
+        query = sorted(request.query_params.multi_items())
+        payload = json.dumps([request.url.path, query, versions], separators=(",", ":"))
+        return "http:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    async def get(self, key: str) -> Optional[Dict]:
+        """Cached response entry, counting the hit or miss."""
+        raw = await self.backend.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+    
+    async def set(self, key: str, entry: Dict) -> None:
+        """Store a response entry."""
+        await self.backend.set(key, json.dumps(entry), ttl=self.ttl)
+    
+    async def invalidate(self, *tags: str) -> None:
+        """Make every cached response that depends on any of `tags` stale."""
+        if not self.enabled:
+            return
+        for tag in tags:
+            await self.backend.set(f"tag:{tag}", uuid.uuid4().hex, ttl=0)
+        self.invalidations += len(tags)
+    
+    def mark_stale(self, tags: Iterable[str]) -> None:
+        """Queue tags whose data was committed; published by `flush_pending`."""
+        if not self.enabled:
+            return
+        self.pending.update(tags)
+        # Publish promptly for writes outside a request (background jobs)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.flush_pending())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+    
+    async def flush_pending(self) -> None:
+        """Invalidate every tag queued by committed transactions."""
+        if not self.pending:
+            return
+        tags, self.pending = self.pending, set()
+        try:
+            await self.invalidate(*tags)
+        except Exception as e:
+            logger.warning(f"HTTP cache invalidation failed: {e}")
+            self.pending.update(tags)
+    
+    async def settle(self) -> None:
+        """Publish queued tags and wait for invalidations already in flight."""
+        await self.flush_pending()
+        # Flushes scheduled on another (e.g. since closed) event loop cannot be awaited here
+        loop = asyncio.get_running_loop()
+        flushes = [task for task in self._flushes if task.get_loop() is loop]
+        if flushes:
+            await asyncio.gather(*flushes, return_exceptions=True)
+    
+    async def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        if self.enabled:
+            await self.backend.clear()
+        self.pending.clear()
+        self.hits = self.misses = self.not_modified = self.invalidations = 0
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.enabled else "none",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "entries": self.backend.size() if self.enabled else 0,
+            "ttl_seconds": self.ttl
+        }
+    
+    def respond(self, request: Request, entry: Dict) -> Response:
+        """200 with the cached body, or 304 if the client already has it."""
+        headers = {"ETag": entry["etag"], "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), entry["etag"]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        headers.update(entry["headers"])
+        return Response(content=entry["body"].encode("utf-8"), status_code=200, headers=headers)
+
+
+class HTTPCacheMiddleware(BaseHTTPMiddleware):
+    """
+    Serve the routes in CACHED_ROUTES from an HTTPResponseCache.
+    
+    Pending invalidations are settled before a cached route is looked up and
+    before any other response is returned, so a client never reads its own
+    write from a stale entry.
+    """
+    
+    def __init__(self, app, cache: "HTTPResponseCache"):
+        super().__init__(app)
+        self.cache = cache
+        self._routes: Optional[List[tuple]] = None
+    
+    def _match(self, request: Request) -> Optional[Tuple[str, ...]]:
+        """Tags of the cached route serving `request`, if any."""
+        if self._routes is None:
+            self._routes = [
+                (route, CACHED_ROUTES[route.path])
+                for route in request.app.router.routes
+                if getattr(route, "path", None) in CACHED_ROUTES
+            ]
+        for route, tags in self._routes:
+            match, child_scope = route.matches(request.scope)
+            if match == Match.FULL:
+                return tags(child_scope.get("path_params", {}))
+        return None
+    
+    async def dispatch(self, request: Request, call_next):
+        cache = self.cache
+        tags = self._match(request) if cache.enabled and request.method == "GET" else None
+        if tags is None:
+            response = await call_next(request)
+            await cache.settle()
+            return response
+        
+        await cache.settle()
+        key = await cache.make_key(request, tags)
+        entry = await cache.get(key)
+        if entry is not None:
+            return cache.respond(request, entry)
+        
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = {
+            "body": body.decode("utf-8"),
+            "etag": _etag(body),
+            "headers": {name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers}
+        }
+        await cache.set(key, entry)
+        return cache.respond(request, entry)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tags(session, flush_context) -> None:
+    """Remember which cached responses this flush makes stale."""
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    tags = tags_for_changes(session.new, dirty, session.deleted)
+    if tags:
+        session.info.setdefault("http_cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_tags(session) -> None:
+    tags = session.info.pop("http_cache_tags", None)
+    if tags:
+        http_cache.mark_stale(tags)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tags(session, previous_transaction) -> None:
+    session.info.pop("http_cache_tags", None)
+
+
+# Global instance
+http_cache = HTTPResponseCache(
+    create_cache_backend(
+        settings.HTTP_CACHE_BACKEND,
+        redis_url=settings.REDIS_URL,
+        prefix="investorlens:",
+        max_entries=settings.HTTP_CACHE_MAX_ENTRIES,
+        default_ttl=settings.HTTP_CACHE_TTL_SECONDS
+    ),
+    ttl=settings.HTTP_CACHE_TTL_SECONDS
+)
@@ -1,6 +1,11 @@
 """Data aggregation services."""
 
 from app.services.data_aggregator.news_scraper import news_aggregator, NewsAggregator
+from app.services.data_aggregator.news_store import news_repository, NewsRepository
+from app.services.data_aggregator.ingestion import news_ingestion, NewsIngestionScheduler
 
-__all__ = ["news_aggregator", "NewsAggregator"]
-
+__all__ = [
+    "news_aggregator", "NewsAggregator",
+    "news_repository", "NewsRepository",
+    "news_ingestion", "NewsIngestionScheduler",
+]
@@ -0,0 +1,344 @@
+"""
+Background news ingestion scheduler.
+Demonstrates: Priority scheduling, jitter, token-bucket rate limiting, asyncio background tasks
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Company
+from app.services.data_aggregator.news_store import news_repository, NewsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class RateBudget:
+    """
+    Token bucket shared by every outbound news request.
+    
+    Refills continuously at `rate_per_minute` and holds at most `burst`
+    tokens, so short bursts are allowed but the long-run rate is capped.
+    """
+    
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize rate budget."""
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = burst or max(1, int(rate_per_minute // 6))
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self._updated = clock()
+    
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+    
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+
+
+class NewsIngestionScheduler:
+    """
+    Periodically refresh stored news for every active company.
+    
+    Each target (a company, or an industry for competitor news) sits in a
+    min-heap keyed on its next due time. Refresh intervals shrink as a
+    company's risk score rises, every interval is jittered so refreshes do
+    not synchronize, and all requests draw from one global RateBudget.
+    Request handlers read the store and never wait on the news API while
+    the loop runs; without it (NEWS_INGESTION_ENABLED=false) they refresh on
+    read, throttled, as before background ingestion.
+    """
+    
+    COMPANY = "company"
+    INDUSTRY = "industry"
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        repository: NewsRepository = news_repository,
+        base_interval: Optional[float] = None,
+        jitter: Optional[float] = None,
+        rate_per_minute: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None
+    ):
+        """Initialize ingestion scheduler."""
+        self.session_factory = session_factory
+        self.repository = repository
+        self.base_interval = base_interval or settings.NEWS_INGESTION_INTERVAL_SECONDS
+        self.jitter = settings.NEWS_INGESTION_JITTER if jitter is None else jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.budget = RateBudget(rate_per_minute or settings.NEWS_INGESTION_RATE_PER_MINUTE, clock=clock)
+        
+        self._queue: List[Tuple[float, int, int, str, object]] = []
+        self._due: Dict[Tuple[str, object], float] = {}
+        self._seq = itertools.count()
+        self._last_fetched: Dict[Tuple[str, object], float] = {}
+        self._last_sync: Optional[float] = None
+        self._industry_news: Dict[str, List[Dict]] = {}
+        
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    # Scheduling
+    
+    def interval_for(self, risk_score: Optional[int]) -> float:
+        """Refresh interval for a company: riskier companies are refreshed more often."""
+        risk_score = 50 if risk_score is None else risk_score
+        if risk_score >= 75:
+            return self.base_interval / 4
+        if risk_score >= 50:
+            return self.base_interval / 2
+        return self.base_interval
+    
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+    
+    def _schedule(self, kind: str, key, due_at: float, priority: int = 0) -> None:
+        # Superseded heap entries are skipped when popped (lazy deletion)
+        self._due[(kind, key)] = due_at
+        heapq.heappush(self._queue, (due_at, -priority, next(self._seq), kind, key))
+    
+    @property
+    def running(self) -> bool:
+        """Whether the ingestion loop is running in this process."""
+        return self._task is not None and not self._task.done()
+    
+    def request_refresh(self, company_id: int) -> None:
+        """Move a company to the front of the queue (e.g. a read found nothing stored)."""
+        self._schedule_now(self.COMPANY, company_id)
+    
+    def _schedule_now(self, kind: str, key) -> None:
+        """
+        Bump a target to the front of the queue.
+        
+        Skipped when the loop is not running (nothing would consume the
+        entry), when the target is already due, and when it was fetched
+        within NEWS_REFRESH_INTERVAL_SECONDS, so repeated reads of a quiet
+        company do not each cost a news API request.
+        """
+        if not self.running:
+            return
+        now = self.clock()
+        due_at = self._due.get((kind, key))
+        if due_at is not None and due_at <= now:
+            return
+        last = self._last_fetched.get((kind, key))
+        if last is not None and now - last < settings.NEWS_REFRESH_INTERVAL_SECONDS:
+            return
+        self._schedule(kind, key, now, priority=100)
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def sync_targets(self, db: Session) -> None:
+        """
+        Reconcile the queue with the active companies and their industries.
+        
+        New targets are spread over the first jitter window of their
+        interval so a cold start does not fire every request at once.
+        """
+        now = self.clock()
+        rows = db.query(Company.id, Company.risk_score, Company.industry).filter(Company.is_active == True).all()
+        
+        wanted = set()
+        for company_id, risk_score, industry in rows:
+            wanted.add((self.COMPANY, company_id))
+            if (self.COMPANY, company_id) not in self._due:
+                interval = self.interval_for(risk_score)
+                self._schedule(self.COMPANY, company_id, now + self.rng.uniform(0, interval * self.jitter), risk_score or 0)
+            if industry:
+                wanted.add((self.INDUSTRY, industry))
+                if (self.INDUSTRY, industry) not in self._due:
+                    self._schedule(self.INDUSTRY, industry, now + self.rng.uniform(0, self.base_interval * self.jitter))
+        
+        for target in list(self._due):
+            if target not in wanted:
+                del self._due[target]
+        
+        self._last_sync = now
+    
+    # Execution
+    
+    async def run_pending(self) -> int:
+        """
+        Refresh every target that is due, then return.
+        
+        This is the whole ingestion loop minus the sleeping, so tests (and
+        one-off scripts) can drive ingestion in-process.
+        
+        Returns:
+            Number of targets refreshed
+        """
+        db = self.session_factory()
+        processed = 0
+        try:
+            if self._last_sync is None or self.clock() - self._last_sync >= settings.NEWS_INGESTION_SYNC_SECONDS:
+                self.sync_targets(db)
+            
+            while self._queue and self._queue[0][0] <= self.clock():
+                due_at, priority, _, kind, key = heapq.heappop(self._queue)
+                if self._due.get((kind, key)) != due_at:
+                    continue
+                
+                await self.budget.acquire()
+                try:
+                    interval, risk_score = await self._refresh(db, kind, key)
+                except Exception as e:
+                    logger.warning(f"News ingestion failed for {kind} {key}: {e}")
+                    db.rollback()
+                    interval, risk_score = self.base_interval, -priority
+                
+                if interval is None:
+                    self._due.pop((kind, key), None)
+                else:
+                    self._schedule(kind, key, self.clock() + self._jittered(interval), risk_score or 0)
+                processed += 1
+        finally:
+            db.close()
+        return processed
+    
+    async def _refresh(self, db: Session, kind: str, key) -> Tuple[Optional[float], Optional[int]]:
+        """Refresh one target; returns its next interval (None to drop it) and priority."""
+        self._last_fetched[(kind, key)] = self.clock()
+        if kind == self.INDUSTRY:
+            articles = await self.repository.aggregator.fetch_industry_news(key, limit=settings.NEWS_INDUSTRY_ARTICLES)
+            if articles:
+                self._industry_news[key] = articles
+            return self.base_interval, 0
+        
+        company = db.get(Company, key)
+        if company is None or not company.is_active:
+            return None, None
+        
+        await self.repository.refresh_company(db, company, force=True)
+        return self.interval_for(company.risk_score), company.risk_score
+    
+    async def run_forever(self) -> None:
+        """Ingestion loop: refresh due targets, then sleep until the next one is due."""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await self.run_pending()
+            except Exception as e:
+                logger.error(f"News ingestion tick failed: {e}", exc_info=True)
+            
+            sleep_for = settings.NEWS_INGESTION_POLL_SECONDS
+            if self._queue:
+                sleep_for = max(0.0, min(sleep_for, self._queue[0][0] - self.clock()))
+            
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+    
+    def start(self) -> None:
+        """Start the ingestion loop as a background task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_forever())
+            logger.info("News ingestion scheduler started")
+    
+    async def stop(self) -> None:
+        """Cancel the ingestion loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    # Reads for request handlers
+    
+    async def refresh_if_idle(
+        self,
+        db: Union[Session, AsyncSession],
+        company: Optional[Company] = None,
+        industry: Optional[str] = None
+    ) -> None:
+        """
+        Refresh a company's or an industry's news on read when the loop is not running.
+        
+        Refreshes are throttled to one per NEWS_REFRESH_INTERVAL_SECONDS per
+        target. A no-op while the loop runs or without a news API key.
+        
+        Args:
+            db: The caller's session; request handlers pass their AsyncSession
+                so the article store's queries run through `run_sync`
+            company: Company whose articles to refresh
+            industry: Industry whose headlines to refresh
+        """
+        if self.running or not self.repository.aggregator.news_api_key:
+            return
+        if company is not None:
+            if isinstance(db, AsyncSession):
+                await self.repository.refresh_company_async(db, company)
+            else:
+                await self.repository.refresh_company(db, company)
+        if industry is not None:
+            last = self._last_fetched.get((self.INDUSTRY, industry))
+            if last is not None and self.clock() - last < settings.NEWS_REFRESH_INTERVAL_SECONDS:
+                return
+            self._last_fetched[(self.INDUSTRY, industry)] = self.clock()
+            articles = await self.repository.aggregator.fetch_industry_news(industry, limit=settings.NEWS_INDUSTRY_ARTICLES)
+            if articles:
+                self._industry_news[industry] = articles
+    
+    def company_news(self, db: Session, company: Company, days_back: int = 7, limit: int = 50) -> List[Dict]:
+        """
+        Stored news for a company; never calls the news API.
+        
+        Falls back to demo articles when no news API is configured. If the
+        API is configured but nothing is stored yet, the company is bumped
+        to the front of the ingestion queue (see `_schedule_now`).
+        """
+        articles = self.repository.recent_articles(db, company.id, days_back=days_back, limit=limit)
+        if articles:
+            return articles
+        
+        if not self.repository.aggregator.news_api_key:
+            return self.repository.aggregator._generate_mock_news(company.name)[:limit]
+        
+        self.request_refresh(company.id)
+        return []
+    
+    def industry_news(self, industry: str, limit: int = 5) -> List[Dict]:
+        """Latest ingested news for an industry; never calls the news API."""
+        if not self.repository.aggregator.news_api_key:
+            return self.repository.aggregator._generate_mock_news(industry)[:limit]
+        
+        articles = self._industry_news.get(industry)
+        if articles is None:
+            self._schedule_now(self.INDUSTRY, industry)
+        return (articles or [])[:limit]
+
+
+# Global instance
+news_ingestion = NewsIngestionScheduler()
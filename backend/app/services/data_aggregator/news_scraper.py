@@ -5,10 +5,15 @@ Demonstrates: External API integration, data aggregation, async processing
 
 from typing import List, Dict, Optional
 import asyncio
+import importlib.util
+import time
 from datetime import datetime, timedelta
 import httpx
 
 from app.core.config import settings
+from app.core.instrumentation import NEWS_REQUEST_DURATION
+from app.core.profiling import profiled_await
+from app.core.singleflight import SingleFlight
 
 
 class NewsAggregator:
@@ -21,6 +26,22 @@ class NewsAggregator:
         """Initialize news aggregator."""
         self.news_api_key = settings.NEWS_API_KEY
         self.base_url = "https://newsapi.org/v2"
+        
+        # Long-lived pooled client, opened on app startup and closed on shutdown
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        # Identical concurrent requests share one HTTP round trip
+        self.inflight = SingleFlight("news")
+    
+    async def startup(self) -> None:
+        """Open the shared HTTP client."""
+        self._get_client()
+    
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def fetch_company_news(
         self, 
@@ -51,36 +72,70 @@ class NewsAggregator:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/everything",
-                    params=params,
-                    timeout=10.0
-                )
+            response = await self._get(f"{self.base_url}/everything", params)
+            
+            if response.status_code == 200:
+                data = response.json()
+                articles = data.get('articles', [])
+                
+                return [
+                    self._normalize_article(article)
+                    for article in articles[:10]  # Limit to 10 articles
+                ]
+            else:
+                print(f"News API error: {response.status_code}")
+                return self._generate_mock_news(company_name)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    articles = data.get('articles', [])
-                    
-                    return [
-                        {
-                            'title': article.get('title'),
-                            'description': article.get('description'),
-                            'url': article.get('url'),
-                            'source': article.get('source', {}).get('name'),
-                            'published_at': article.get('publishedAt'),
-                            'sentiment': self._analyze_sentiment(article.get('title', '') + ' ' + article.get('description', ''))
-                        }
-                        for article in articles[:10]  # Limit to 10 articles
-                    ]
-                else:
-                    print(f"News API error: {response.status_code}")
-                    return self._generate_mock_news(company_name)
-                    
         except Exception as e:
             print(f"Error fetching news: {e}")
             return self._generate_mock_news(company_name)
     
+    async def fetch_company_articles(
+        self,
+        company_name: str,
+        since: datetime,
+        page_size: int = 50
+    ) -> Optional[List[Dict]]:
+        """
+        Fetch articles about a company published at or after `since`.
+        
+        Unlike fetch_company_news this never substitutes mock data, so the
+        result is safe to persist.
+        
+        Args:
+            company_name: Name of the company to search for
+            since: Only return articles published from this time (UTC)
+            page_size: Maximum number of articles to return
+            
+        Returns:
+            List of news articles, newest first, or None if the news API
+            is not configured or the request failed
+        """
+        if not self.news_api_key:
+            return None
+        
+        params = {
+            'q': company_name,
+            'from': since.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sortBy': 'publishedAt',
+            'pageSize': page_size,
+            'apiKey': self.news_api_key,
+            'language': 'en'
+        }
+        
+        try:
+            response = await self._get(f"{self.base_url}/everything", params)
+            
+            if response.status_code != 200:
+                print(f"News API error: {response.status_code}")
+                return None
+            
+            return [self._normalize_article(article) for article in response.json().get('articles', [])]
+            
+        except Exception as e:
+            print(f"Error fetching news: {e}")
+            return None
+    
     async def fetch_industry_news(self, industry: str, limit: int = 5) -> List[Dict]:
         """
         Fetch news about an industry.
@@ -96,36 +151,90 @@ class NewsAggregator:
             return self._generate_mock_news(industry)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/everything",
-                    params={
-                        'q': industry,
-                        'sortBy': 'publishedAt',
-                        'apiKey': self.news_api_key,
-                        'pageSize': limit
-                    },
-                    timeout=10.0
-                )
+            response = await self._get(
+                f"{self.base_url}/everything",
+                {
+                    'q': industry,
+                    'sortBy': 'publishedAt',
+                    'apiKey': self.news_api_key,
+                    'pageSize': limit
+                }
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                articles = data.get('articles', [])
+                
+                return [
+                    {
+                        'title': article.get('title'),
+                        'url': article.get('url'),
+                        'published_at': article.get('publishedAt')
+                    }
+                    for article in articles
+                ]
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    articles = data.get('articles', [])
-                    
-                    return [
-                        {
-                            'title': article.get('title'),
-                            'url': article.get('url'),
-                            'published_at': article.get('publishedAt')
-                        }
-                        for article in articles
-                    ]
-                    
         except Exception as e:
             print(f"Error fetching industry news: {e}")
             
         return []
     
+    @profiled_await("news")
+    async def _get(self, url: str, params: Dict) -> httpx.Response:
+        """
+        GET through the pooled client, respecting the per-host concurrency cap.
+        
+        Concurrent calls for the same URL and parameters are coalesced and
+        share the (fully read) response.
+        """
+        host = httpx.URL(url).host
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.NEWS_HTTP_PER_HOST_CONCURRENCY)
+        
+        async def fetch() -> httpx.Response:
+            async with self._host_limits[host]:
+                start = time.perf_counter()
+                status = "error"
+                try:
+                    response = await self._get_client().get(url, params=params)
+                    status = str(response.status_code)
+                    return response
+                finally:
+                    NEWS_REQUEST_DURATION.labels(httpx.URL(url).path, status).observe(time.perf_counter() - start)
+        
+        key = (url, tuple(sorted((name, str(value)) for name, value in params.items())))
+        return await self.inflight.do(key, fetch)
+    
+    def coalescing_stats(self) -> Dict:
+        """How many concurrent duplicate requests were folded into one call."""
+        return self.inflight.stats()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared client, creating it lazily (e.g. outside the app lifecycle in scripts)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.NEWS_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.NEWS_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.NEWS_HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=settings.NEWS_HTTP_TIMEOUT,
+                # HTTP/2 needs the optional `h2` package (httpx[http2])
+                http2=settings.NEWS_HTTP2 and importlib.util.find_spec("h2") is not None
+            )
+        return self._client
+    
+    def _normalize_article(self, article: Dict) -> Dict:
+        """Map a NewsAPI article onto our article shape."""
+        return {
+            'title': article.get('title'),
+            'description': article.get('description'),
+            'url': article.get('url'),
+            'source': (article.get('source') or {}).get('name'),
+            'published_at': article.get('publishedAt'),
+            'sentiment': self._analyze_sentiment((article.get('title') or '') + ' ' + (article.get('description') or ''))
+        }
+    
     def _analyze_sentiment(self, text: str) -> str:
         """
         Basic sentiment analysis.
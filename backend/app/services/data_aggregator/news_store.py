@@ -0,0 +1,189 @@
+"""
+Persistent news article store with incremental fetching.
+Demonstrates: Repository pattern, deduplication, high-water-mark sync
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+import hashlib
+import time
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Company, NewsArticle
+from app.services.data_aggregator.news_scraper import news_aggregator
+
+
+def url_hash(url: str) -> str:
+    """Stable dedup key for an article URL."""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def parse_published_at(value) -> Optional[datetime]:
+    """Parse an ISO-8601 timestamp into naive UTC (matching our DateTime columns)."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class NewsRepository:
+    """
+    Stores deduplicated articles per company and syncs them incrementally.
+
+    Each refresh only asks the news API for articles newer than the latest
+    `published_at` already stored for the company (its high-water mark), and
+    unforced refreshes of the same company, failed ones included, are
+    throttled to one per NEWS_REFRESH_INTERVAL_SECONDS per process.
+    """
+
+    def __init__(self):
+        """Initialize news repository."""
+        self.aggregator = news_aggregator
+        self._last_refreshed: Dict[int, float] = {}
+
+    def latest_published_at(self, db: Session, company_id: int) -> Optional[datetime]:
+        """High-water mark: newest stored publication time for a company."""
+        return db.query(func.max(NewsArticle.published_at)).filter(
+            NewsArticle.company_id == company_id
+        ).scalar()
+
+    def save_articles(self, db: Session, company_id: int, articles: List[Dict]) -> int:
+        """
+        Insert articles not already stored for the company.
+
+        Returns:
+            Number of newly stored articles
+        """
+        by_hash = {}
+        for article in articles:
+            key = article.get('url') or article.get('title')
+            if key:
+                by_hash.setdefault(url_hash(key), article)
+
+        if not by_hash:
+            return 0
+
+        existing = {
+            row.url_hash
+            for row in db.query(NewsArticle.url_hash).filter(
+                NewsArticle.company_id == company_id,
+                NewsArticle.url_hash.in_(list(by_hash))
+            )
+        }
+
+        new_rows = [
+            NewsArticle(
+                company_id=company_id,
+                url_hash=key,
+                url=article.get('url'),
+                title=(article.get('title') or '')[:500] or None,
+                description=article.get('description'),
+                source=article.get('source'),
+                sentiment=article.get('sentiment'),
+                published_at=parse_published_at(article.get('published_at'))
+            )
+            for key, article in by_hash.items()
+            if key not in existing
+        ]
+
+        if not new_rows:
+            return 0
+
+        db.add_all(new_rows)
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent refresh stored the same articles first
+            db.rollback()
+            return 0
+        return len(new_rows)
+
+    def recent_articles(
+        self,
+        db: Session,
+        company_id: int,
+        days_back: int = 7,
+        limit: int = 50
+    ) -> List[Dict]:
+        """Stored articles for a company from the last `days_back` days, newest first."""
+        cutoff = datetime.utcnow() - timedelta(days=days_back)
+        rows = db.query(NewsArticle).filter(
+            NewsArticle.company_id == company_id,
+            NewsArticle.published_at >= cutoff
+        ).order_by(NewsArticle.published_at.desc()).limit(limit).all()
+
+        return [self._to_dict(row) for row in rows]
+
+    async def refresh_company(self, db: Session, company: Company, force: bool = False) -> int:
+        """
+        Fetch and store articles newer than the company's high-water mark.
+
+        Args:
+            db: Database session
+            company: Company to refresh
+            force: Ignore the refresh interval
+
+        Returns:
+            Number of newly stored articles
+        """
+        if not self._refresh_due(company.id, force):
+            return 0
+
+        articles = await self._fetch(company, self._fetch_since(db, company.id))
+        if articles is None:
+            return 0
+        return self.save_articles(db, company.id, articles)
+
+    async def refresh_company_async(self, db: AsyncSession, company: Company, force: bool = False) -> int:
+        """`refresh_company` for request handlers: the queries go through `run_sync`."""
+        if not self._refresh_due(company.id, force):
+            return 0
+
+        since = await db.run_sync(lambda session: self._fetch_since(session, company.id))
+        articles = await self._fetch(company, since)
+        if articles is None:
+            return 0
+        return await db.run_sync(lambda session: self.save_articles(session, company.id, articles))
+
+    def _refresh_due(self, company_id: int, force: bool) -> bool:
+        last = self._last_refreshed.get(company_id)
+        return force or last is None or time.monotonic() - last >= settings.NEWS_REFRESH_INTERVAL_SECONDS
+
+    def _fetch_since(self, db: Session, company_id: int) -> datetime:
+        since = self.latest_published_at(db, company_id)
+        if since is None:
+            since = datetime.utcnow() - timedelta(days=settings.NEWS_BACKFILL_DAYS)
+        return since
+
+    async def _fetch(self, company: Company, since: datetime) -> Optional[List[Dict]]:
+        # Failed fetches count as refreshes too, so an unreachable news API is retried once per interval
+        self._last_refreshed[company.id] = time.monotonic()
+        return await self.aggregator.fetch_company_articles(company.name, since)
+
+    def _to_dict(self, article: NewsArticle) -> Dict:
+        """Serialize a stored article in the aggregator's article shape."""
+        return {
+            'title': article.title,
+            'description': article.description,
+            'url': article.url,
+            'source': article.source,
+            'published_at': article.published_at.isoformat() if article.published_at else None,
+            'sentiment': article.sentiment
+        }
+
+
+# Global instance
+news_repository = NewsRepository()
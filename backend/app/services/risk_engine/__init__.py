@@ -0,0 +1,6 @@
+"""Deterministic and hybrid risk scoring services."""
+
+from app.services.risk_engine.scorer import portfolio_risk_scorer, PortfolioRiskScorer, risk_level
+from app.services.risk_engine.hybrid import hybrid_risk_scorer, HybridRiskScorer
+
+__all__ = ["portfolio_risk_scorer", "PortfolioRiskScorer", "risk_level", "hybrid_risk_scorer", "HybridRiskScorer"]
@@ -0,0 +1,225 @@
+"""
+Tiered risk scoring: deterministic prefilter with LLM escalation.
+Demonstrates: Cost-aware AI orchestration, confidence estimation, latency accounting
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+import time
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Alert, AlertSeverity, Company
+from app.services.ai_engine import llm_analyzer
+from app.services.risk_engine.scorer import portfolio_risk_scorer, PortfolioRiskScorer, risk_level
+
+# Score boundaries between Low/Medium/High/Critical
+LEVEL_BOUNDARIES = (25.5, 50.5, 75.5)
+
+LOCAL_MODEL = "local-multifactor"
+
+
+class HybridRiskScorer:
+    """
+    Score locally first and only ask the LLM when the answer is unclear.
+    
+    Every company gets a deterministic score and a confidence in [0, 1]
+    (input completeness, discounted near a risk-level boundary). A company
+    escalates to `assess_risk_score` when its score falls in the uncertain
+    band, its confidence is below the threshold, or it has recent
+    medium-or-worse alerts (a material change the columns may not reflect).
+    """
+    
+    def __init__(
+        self,
+        scorer: PortfolioRiskScorer = portfolio_risk_scorer,
+        uncertain_band: Optional[tuple] = None,
+        min_confidence: Optional[float] = None,
+        material_change_days: Optional[int] = None
+    ):
+        """Initialize hybrid scorer."""
+        self.scorer = scorer
+        self.analyzer = llm_analyzer
+        self.uncertain_band = uncertain_band or (settings.RISK_UNCERTAIN_LOW, settings.RISK_UNCERTAIN_HIGH)
+        self.min_confidence = settings.RISK_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        self.material_change_days = material_change_days or settings.RISK_MATERIAL_CHANGE_DAYS
+    
+    def confidence(self, score: int, completeness: float) -> float:
+        """Confidence in a local score: full inputs, far from a level boundary."""
+        margin = min(abs(score - boundary) for boundary in LEVEL_BOUNDARIES)
+        return round(completeness * (0.5 + 0.5 * min(1.0, margin / 10)), 2)
+    
+    def recent_alerts(self, db: Session, company_ids: Sequence[int]) -> Dict[int, List[Dict]]:
+        """Unresolved medium-or-worse alerts raised within the material-change window."""
+        cutoff = datetime.utcnow() - timedelta(days=self.material_change_days)
+        rows = db.query(Alert.company_id, Alert.alert_type, Alert.severity).filter(
+            Alert.company_id.in_(list(company_ids)),
+            Alert.is_resolved == False,
+            Alert.severity.in_([AlertSeverity.MEDIUM, AlertSeverity.HIGH, AlertSeverity.CRITICAL]),
+            Alert.created_at >= cutoff
+        ).all()
+        
+        alerts: Dict[int, List[Dict]] = {}
+        for company_id, alert_type, severity in rows:
+            alerts.setdefault(company_id, []).append({'type': alert_type, 'severity': severity})
+        return alerts
+    
+    def escalation_reason(self, score: int, confidence: float, recent_alerts: int = 0) -> Optional[str]:
+        """Why a company needs the LLM tier, or None if the local score stands."""
+        low, high = self.uncertain_band
+        if recent_alerts:
+            return "recent_alerts"
+        if low <= score <= high:
+            return "uncertain_band"
+        if confidence < self.min_confidence:
+            return "low_confidence"
+        return None
+    
+    def local_pass(self, db: Session, company_ids: Optional[Sequence[int]] = None) -> Tuple[List[Dict], Dict[int, List[Dict]]]:
+        """Synchronous part of scoring: local scores plus recent material alerts."""
+        local_results = self.scorer.score_portfolio(db, company_ids)
+        ids = [r["company_id"] for r in local_results]
+        return local_results, (self.recent_alerts(db, ids) if ids else {})
+    
+    async def score_companies(
+        self,
+        db: AsyncSession,
+        company_ids: Optional[Sequence[int]] = None,
+        force_llm: bool = False
+    ) -> Dict:
+        """
+        Score companies through the local tier, escalating where needed.
+        
+        Args:
+            db: Async database session
+            company_ids: Companies to score (all active companies if None)
+            force_llm: Escalate every company (pure LLM mode)
+        
+        Returns:
+            Dictionary with per-company `results` and tier `stats`
+        """
+        local_start = time.perf_counter()
+        local_results, recent_alerts = await db.run_sync(self.local_pass, company_ids)
+        local_ms = (time.perf_counter() - local_start) * 1000
+        
+        llm_available = self.analyzer.available("risk")
+        escalate = []
+        results = []
+        for local in local_results:
+            confidence = self.confidence(local["risk_score"], local["completeness"])
+            reason = "forced" if force_llm else self.escalation_reason(
+                local["risk_score"], confidence, len(recent_alerts.get(local["company_id"], []))
+            )
+            result = {
+                "company_id": local["company_id"],
+                "company_name": local["company_name"],
+                "risk_score": local["risk_score"],
+                "risk_level": local["risk_level"],
+                "local_score": local["risk_score"],
+                "confidence": confidence,
+                "tier": "local",
+                "escalation_reason": reason,
+                "model_used": LOCAL_MODEL,
+                "analysis": self._explain(local),
+                "factors": local["factors"]
+            }
+            results.append(result)
+            if reason and llm_available:
+                escalate.append(result)
+        
+        llm_latencies, llm_requests, batch_fallbacks = await self._escalate(db, escalate, recent_alerts)
+        
+        tiers = {"local": 0, "llm": 0}
+        for result in results:
+            tiers[result["tier"]] += 1
+        
+        return {
+            "results": results,
+            "stats": {
+                "companies": len(results),
+                "tiers": tiers,
+                "escalation_candidates": sum(1 for r in results if r["escalation_reason"]),
+                "llm_available": llm_available,
+                "llm_requests": llm_requests,
+                "batch_fallbacks": batch_fallbacks,
+                "latency_ms": {
+                    "local_total": round(local_ms, 2),
+                    "llm_total": round(float(np.sum(llm_latencies)), 2) if llm_latencies else 0.0,
+                    "llm_p50": round(float(np.percentile(llm_latencies, 50)), 2) if llm_latencies else None,
+                    "llm_p95": round(float(np.percentile(llm_latencies, 95)), 2) if llm_latencies else None
+                }
+            }
+        }
+    
+    async def _escalate(
+        self,
+        db: AsyncSession,
+        escalate: List[Dict],
+        recent_alerts: Dict[int, List[Dict]]
+    ) -> Tuple[List[float], int, int]:
+        """
+        Run the LLM tier for escalated companies, several per request.
+        
+        Returns:
+            (latencies, requests, fallbacks): the latency (ms) of the request
+            that scored each company, the number of LLM requests made, and
+            how many companies a batched request failed to score
+        """
+        if not escalate:
+            return [], 0, 0
+        
+        rows = await db.execute(select(Company).where(Company.id.in_([r["company_id"] for r in escalate])))
+        companies = {c.id: c for c in rows.scalars()}
+        assessments, requests = await self.analyzer.assess_risk_scores([
+            {
+                "company_data": self._company_data(companies[result["company_id"]]),
+                "metrics": [],
+                "alerts": recent_alerts.get(result["company_id"], [])
+            }
+            for result in escalate
+        ])
+        
+        latencies: List[float] = []
+        fallbacks = 0
+        for result, assessment in zip(escalate, assessments):
+            latencies.append(assessment["latency_ms"])
+            fallbacks += assessment.get("batch_fallback", False)
+            
+            # The analyzer degrades to a runway-only mock on errors; keep the local score then
+            if assessment.get("model_used") == "fallback":
+                continue
+            result.update({
+                "risk_score": assessment["risk_score"],
+                "risk_level": risk_level(assessment["risk_score"]),
+                "tier": "llm",
+                "model_used": assessment.get("model_used"),
+                "analysis": assessment.get("analysis", "")
+            })
+        return latencies, requests, fallbacks
+    
+    def _company_data(self, company: Company) -> Dict:
+        return {
+            'name': company.name,
+            'industry': company.industry,
+            'stage': company.stage,
+            'runway_months': company.runway_months or 0,
+            'monthly_burn_rate': company.monthly_burn_rate or 0,
+            'current_arr': company.current_arr or 0,
+            'employee_count': company.employee_count or 0
+        }
+    
+    def _explain(self, local: Dict) -> str:
+        factors = local["factors"]
+        return (
+            f"Multi-factor score {local['risk_score']}: runway {factors['runway']:.0f} pts (40%), "
+            f"burn vs revenue {factors['burn']:.0f} pts (30%), growth {factors['growth']:.0f} pts (20%), "
+            f"efficiency {factors['efficiency']:.0f} pts (10%)."
+        )
+
+
+# Global instance
+hybrid_risk_scorer = HybridRiskScorer()
@@ -0,0 +1,71 @@
+"""
+Alembic migration environment.
+Demonstrates: Schema migrations driven by application settings and ORM metadata
+"""
+
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config, pool
+from alembic import context
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+config = context.config
+
+# The database URL always comes from the application settings (DATABASE_URL)
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+# Autogenerate compares the database against the ORM models
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit migration SQL to stdout without connecting (alembic upgrade --sql)."""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    """Run the migrations on an open connection."""
+    # Batch mode lets ALTER-style operations work on SQLite too
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Apply migrations over a live connection."""
+    # Callers (e.g. tests) may hand in their own connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool
+    )
+    
+    with connectable.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,119 @@
+"""initial schema
+
+Baseline of the original companies, alerts and metrics tables. Databases
+that init_db() already created are adopted as-is and only stamped; tables
+added since then come from later revisions (0004).
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 20:59:58.602893
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table('companies'):
+        # Created earlier by init_db(); later revisions bring it up to date
+        return
+    
+    op.create_table('companies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('website', sa.String(length=500), nullable=True),
+    sa.Column('industry', sa.String(length=100), nullable=True),
+    sa.Column('stage', sa.String(length=50), nullable=True),
+    sa.Column('investment_date', sa.DateTime(), nullable=True),
+    sa.Column('investment_amount', sa.Float(), nullable=True),
+    sa.Column('ownership_percentage', sa.Float(), nullable=True),
+    sa.Column('valuation', sa.Float(), nullable=True),
+    sa.Column('ceo_name', sa.String(length=255), nullable=True),
+    sa.Column('ceo_email', sa.String(length=255), nullable=True),
+    sa.Column('headquarters', sa.String(length=255), nullable=True),
+    sa.Column('current_arr', sa.Float(), nullable=True),
+    sa.Column('monthly_burn_rate', sa.Float(), nullable=True),
+    sa.Column('runway_months', sa.Integer(), nullable=True),
+    sa.Column('employee_count', sa.Integer(), nullable=True),
+    sa.Column('risk_score', sa.Integer(), nullable=True),
+    sa.Column('health_score', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('extra_data', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_companies_id'), 'companies', ['id'], unique=False)
+    op.create_index(op.f('ix_companies_name'), 'companies', ['name'], unique=False)
+
+    op.create_table('alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('alert_type', sa.Enum('RISK', 'OPPORTUNITY', 'ANOMALY', 'NEWS', 'FINANCIAL', 'COMPLIANCE', name='alerttype'), nullable=False),
+    sa.Column('severity', sa.Enum('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='alertseverity'), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('ai_summary', sa.Text(), nullable=True),
+    sa.Column('recommended_actions', sa.Text(), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('resolved_by', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alerts_alert_type'), 'alerts', ['alert_type'], unique=False)
+    op.create_index(op.f('ix_alerts_company_id'), 'alerts', ['company_id'], unique=False)
+    op.create_index(op.f('ix_alerts_created_at'), 'alerts', ['created_at'], unique=False)
+    op.create_index(op.f('ix_alerts_id'), 'alerts', ['id'], unique=False)
+    op.create_index(op.f('ix_alerts_severity'), 'alerts', ['severity'], unique=False)
+
+    op.create_table('metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('metric_type', sa.String(length=100), nullable=False),
+    sa.Column('metric_name', sa.String(length=255), nullable=False),
+    sa.Column('metric_value', sa.Float(), nullable=False),
+    sa.Column('metric_unit', sa.String(length=50), nullable=True),
+    sa.Column('period_start', sa.DateTime(), nullable=True),
+    sa.Column('period_end', sa.DateTime(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+    sa.Column('source', sa.String(length=100), nullable=True),
+    sa.Column('source_url', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_metrics_company_id'), 'metrics', ['company_id'], unique=False)
+    op.create_index(op.f('ix_metrics_id'), 'metrics', ['id'], unique=False)
+    op.create_index(op.f('ix_metrics_metric_type'), 'metrics', ['metric_type'], unique=False)
+    op.create_index(op.f('ix_metrics_recorded_at'), 'metrics', ['recorded_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_metrics_recorded_at'), table_name='metrics')
+    op.drop_index(op.f('ix_metrics_metric_type'), table_name='metrics')
+    op.drop_index(op.f('ix_metrics_id'), table_name='metrics')
+    op.drop_index(op.f('ix_metrics_company_id'), table_name='metrics')
+    op.drop_table('metrics')
+    op.drop_index(op.f('ix_alerts_severity'), table_name='alerts')
+    op.drop_index(op.f('ix_alerts_id'), table_name='alerts')
+    op.drop_index(op.f('ix_alerts_created_at'), table_name='alerts')
+    op.drop_index(op.f('ix_alerts_company_id'), table_name='alerts')
+    op.drop_index(op.f('ix_alerts_alert_type'), table_name='alerts')
+    op.drop_table('alerts')
+    op.drop_index(op.f('ix_companies_name'), table_name='companies')
+    op.drop_index(op.f('ix_companies_id'), table_name='companies')
+    op.drop_table('companies')
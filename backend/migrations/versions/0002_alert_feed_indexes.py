@@ -0,0 +1,61 @@
+"""alert feed indexes
+
+Replace the single-column alert indexes with composite (filter, created_at, id)
+indexes, plus partial indexes for the unresolved and unread feeds, so every
+alert feed query is an ordered index range read. On PostgreSQL the indexes
+are built CONCURRENTLY so the alerts table stays writable.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:00:36.481338
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEED_INDEXES = [
+    ('ix_alerts_feed', ['created_at', 'id'], None),
+    ('ix_alerts_company_feed', ['company_id', 'created_at', 'id'], None),
+    ('ix_alerts_severity_feed', ['severity', 'created_at', 'id'], None),
+    ('ix_alerts_type_feed', ['alert_type', 'created_at', 'id'], None),
+    ('ix_alerts_unresolved_feed', ['created_at', 'id'], 'is_resolved'),
+    ('ix_alerts_unread_feed', ['created_at', 'id'], 'is_read'),
+]
+
+# Single-column indexes from 0001; each is a prefix of (or superseded by) a feed index
+SUPERSEDED_INDEXES = [
+    ('ix_alerts_company_id', ['company_id']),
+    ('ix_alerts_alert_type', ['alert_type']),
+    ('ix_alerts_severity', ['severity']),
+    ('ix_alerts_created_at', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, columns, false_flag in FEED_INDEXES:
+            where = {}
+            if false_flag:
+                # Rendered per dialect (false / 0) to match the feed queries' predicates
+                predicate = sa.column(false_flag) == sa.false()
+                where = {'postgresql_where': predicate, 'sqlite_where': predicate}
+            op.create_index(name, 'alerts', columns, if_not_exists=True, postgresql_concurrently=True, **where)
+        for name, _ in SUPERSEDED_INDEXES:
+            op.drop_index(name, table_name='alerts', if_exists=True)
+
+
+def downgrade() -> None:
+    for name, columns in SUPERSEDED_INDEXES:
+        op.create_index(name, 'alerts', columns, if_not_exists=True)
+    for name, _, _ in FEED_INDEXES:
+        op.drop_index(name, table_name='alerts', if_exists=True)
@@ -0,0 +1,46 @@
+"""metric series index
+
+Add a (company_id, metric_type, recorded_at) index so a company's series for
+one metric type over a time window is a single ordered index range read; on
+PostgreSQL it INCLUDEs metric_value for index-only downsampling. Replaces the
+single-column company_id and metric_type indexes, which it supersedes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 23:12:05.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Single-column indexes from 0001; company_id is a prefix of ix_metrics_series
+SUPERSEDED_INDEXES = [
+    ('ix_metrics_company_id', ['company_id']),
+    ('ix_metrics_metric_type', ['metric_type']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_metrics_series', 'metrics', ['company_id', 'metric_type', 'recorded_at'],
+            if_not_exists=True, postgresql_concurrently=True, postgresql_include=['metric_value']
+        )
+        for name, _ in SUPERSEDED_INDEXES:
+            op.drop_index(name, table_name='metrics', if_exists=True)
+
+
+def downgrade() -> None:
+    for name, columns in SUPERSEDED_INDEXES:
+        op.create_index(name, 'metrics', columns, if_not_exists=True)
+    op.drop_index('ix_metrics_series', table_name='metrics', if_exists=True)
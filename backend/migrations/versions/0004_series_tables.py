@@ -0,0 +1,110 @@
+"""series tables
+
+Create the tables added after the 0001 baseline: alert_counters, batch_jobs,
+executive_summaries and news_articles. Each is created only if missing, so
+databases that init_db() or an earlier 0001 already gave some of them, and
+databases adopted from before they existed, all end up with every table.
+Alert counters start empty and are rebuilt from the alerts table at startup.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 09:14:27.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def missing(table: str) -> bool:
+    """Whether `table` still has to be created (always, when rendering offline SQL)."""
+    return context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table(table)
+
+
+def upgrade() -> None:
+    # alertseverity already exists on PostgreSQL; it was created with the alerts table
+    if missing('alert_counters'):
+        op.create_table('alert_counters',
+        sa.Column('severity', postgresql.ENUM('LOW', 'MEDIUM', 'HIGH', 'CRITICAL', name='alertseverity', create_type=False), nullable=False),
+        sa.Column('is_resolved', sa.Boolean(), nullable=False),
+        sa.Column('is_read', sa.Boolean(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('severity', 'is_resolved', 'is_read')
+        )
+
+    if missing('batch_jobs'):
+        op.create_table('batch_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='batchjobstatus'), nullable=False),
+        sa.Column('total_companies', sa.Integer(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('company_ids', sa.JSON(), nullable=False),
+        sa.Column('results', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_batch_jobs_created_at'), 'batch_jobs', ['created_at'], unique=False)
+        op.create_index(op.f('ix_batch_jobs_status'), 'batch_jobs', ['status'], unique=False)
+
+    if missing('executive_summaries'):
+        op.create_table('executive_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=False),
+        sa.Column('model_used', sa.String(length=100), nullable=False),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('news_analyzed', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_executive_summaries_company_id'), 'executive_summaries', ['company_id'], unique=False)
+        op.create_index(op.f('ix_executive_summaries_created_at'), 'executive_summaries', ['created_at'], unique=False)
+        op.create_index(op.f('ix_executive_summaries_id'), 'executive_summaries', ['id'], unique=False)
+
+    if missing('news_articles'):
+        op.create_table('news_articles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), nullable=False),
+        sa.Column('url_hash', sa.String(length=64), nullable=False),
+        sa.Column('url', sa.Text(), nullable=True),
+        sa.Column('title', sa.String(length=500), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('source', sa.String(length=255), nullable=True),
+        sa.Column('sentiment', sa.String(length=20), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('company_id', 'url_hash', name='uq_news_articles_company_url')
+        )
+        op.create_index('ix_news_articles_company_published', 'news_articles', ['company_id', 'published_at'], unique=False)
+        op.create_index(op.f('ix_news_articles_id'), 'news_articles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_news_articles_id'), table_name='news_articles')
+    op.drop_index('ix_news_articles_company_published', table_name='news_articles')
+    op.drop_table('news_articles')
+    op.drop_index(op.f('ix_executive_summaries_id'), table_name='executive_summaries')
+    op.drop_index(op.f('ix_executive_summaries_created_at'), table_name='executive_summaries')
+    op.drop_index(op.f('ix_executive_summaries_company_id'), table_name='executive_summaries')
+    op.drop_table('executive_summaries')
+    op.drop_index(op.f('ix_batch_jobs_status'), table_name='batch_jobs')
+    op.drop_index(op.f('ix_batch_jobs_created_at'), table_name='batch_jobs')
+    op.drop_table('batch_jobs')
+    op.drop_table('alert_counters')
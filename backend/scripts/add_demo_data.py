@@ -145,67 +145,66 @@ DEMO_ALERTS = [
 ]
 
 def add_companies():
-    """Add demo companies to the platform."""
+    """Add demo companies to the platform in one bulk request."""
     print("Adding demo companies...")
     added_companies = []
     
-    for company in DEMO_COMPANIES:
-        try:
-            response = requests.post(
-                f"{API_URL}/api/companies",
-                json=company,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                company_data = response.json()
-                added_companies.append(company_data)
+    try:
+        response = requests.post(f"{API_URL}/api/companies/bulk", json=DEMO_COMPANIES, timeout=30)
+        if response.status_code != 200:
+            print(f"  [ERROR] Bulk add failed: {response.status_code}")
+            return added_companies
+        
+        for company, result in zip(DEMO_COMPANIES, response.json()["results"]):
+            if result["status"] == "created":
+                added_companies.append({"id": result["id"], "name": company["name"]})
                 print(f"  [OK] Added: {company['name']}")
             else:
-                print(f"  [ERROR] Failed to add {company['name']}: {response.status_code}")
+                print(f"  [{result['status'].upper()}] {company['name']}: {result['error']}")
                 
-        except Exception as e:
-            print(f"  [ERROR] Error adding {company['name']}: {e}")
+    except Exception as e:
+        print(f"  [ERROR] Error adding companies: {e}")
     
     return added_companies
 
 def add_alerts(companies):
-    """Add demo alerts for companies."""
+    """Add demo alerts for companies in one bulk request."""
     print("\nAdding demo alerts...")
     
     # Map company names to IDs
     company_map = {c.get('name'): c.get('id') for c in companies if c.get('id')}
     
+    alerts = []
     for alert in DEMO_ALERTS:
         company_id = company_map.get(alert['company_name'])
         if not company_id:
             print(f"  [WARN] Skipping alert for {alert['company_name']} (company not found)")
             continue
-            
-        try:
-            alert_data = {
-                "company_id": company_id,
-                "severity": alert['severity'],
-                "title": alert['title'],
-                "description": alert['description'],
-                "source": "demo_data_script"
-            }
-            
-            response = requests.post(
-                f"{API_URL}/api/alerts",
-                json=alert_data,
-                headers={"Content-Type": "application/json"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
+        alerts.append({
+            "company_id": company_id,
+            "severity": alert['severity'],
+            "title": alert['title'],
+            "description": alert['description'],
+            "source": "demo_data_script"
+        })
+    
+    if not alerts:
+        return
+    
+    try:
+        response = requests.post(f"{API_URL}/api/alerts/bulk", json=alerts, timeout=30)
+        if response.status_code != 200:
+            print(f"  [ERROR] Bulk add failed: {response.status_code}")
+            return
+        
+        for alert, result in zip(alerts, response.json()["results"]):
+            if result["status"] == "created":
                 print(f"  [OK] Added: {alert['title'][:50]}...")
             else:
-                print(f"  [ERROR] Failed to add alert: {response.status_code}")
+                print(f"  [{result['status'].upper()}] {alert['title'][:50]}: {result['error']}")
                 
-        except Exception as e:
-            print(f"  [ERROR] Error adding alert: {e}")
+    except Exception as e:
+        print(f"  [ERROR] Error adding alerts: {e}")
 
 def verify_data():
     """Verify data was added successfully."""
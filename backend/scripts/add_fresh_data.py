@@ -96,16 +96,19 @@ COMPANIES = [
 ]
 
 print("Adding companies...")
-for company in COMPANIES:
-    try:
-        response = requests.post(f"{API_URL}/api/companies", json=company, timeout=10)
-        if response.status_code in [200, 201]:
-            risk = "LOW" if company['risk_score'] < 35 else "MED" if company['risk_score'] < 60 else "HIGH"
-            print(f"[OK] {company['name']} - Risk: {company['risk_score']}/100 ({risk})")
-        else:
-            print(f"[ERROR] {company['name']}: {response.status_code}")
-    except Exception as e:
-        print(f"[ERROR] {company['name']}: {e}")
+try:
+    response = requests.post(f"{API_URL}/api/companies/bulk", json=COMPANIES, timeout=30)
+    if response.status_code == 200:
+        for company, result in zip(COMPANIES, response.json()["results"]):
+            if result["status"] == "created":
+                risk = "LOW" if company['risk_score'] < 35 else "MED" if company['risk_score'] < 60 else "HIGH"
+                print(f"[OK] {company['name']} - Risk: {company['risk_score']}/100 ({risk})")
+            else:
+                print(f"[{result['status'].upper()}] {company['name']}: {result['error']}")
+    else:
+        print(f"[ERROR] Bulk add failed: {response.status_code}")
+except Exception as e:
+    print(f"[ERROR] {e}")
 
 print("\nDone! Refresh your dashboard.")
 
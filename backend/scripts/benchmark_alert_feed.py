@@ -0,0 +1,144 @@
+"""
+Benchmark the alert feed: lazy-loaded companies vs eager ORM vs one projection.
+
+Loads N synthetic alerts into a scratch database (SQLite file by default,
+or any URL via --database-url), then builds one /api/alerts page of
+--limit rows three ways and reports SQL statements per page and latency
+(query plus serialization):
+
+- lazy ORM: Alert objects, company.name lazy-loaded per row (N+1 queries)
+- eager ORM: Alert objects joined to Company, validated through AlertResponse
+- projection: the endpoint's alert_feed_query, serialized directly
+
+Usage:
+    python scripts/benchmark_alert_feed.py --alerts 100000 --limit 200
+    python scripts/benchmark_alert_feed.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import tempfile
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import contains_eager, sessionmaker
+
+from app.api.alerts import AlertResponse, alert_feed_query, feed_item
+from app.core.database import Base
+from app.models import Alert, Company
+from benchmark_alert_stats import load_alerts, time_it
+
+
+class QueryCounter:
+    """Count SQL statements an engine executes."""
+    
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+    
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+def alert_dict(alert: Alert) -> dict:
+    """The per-row dict the ORM versions of the endpoint built."""
+    return {
+        "id": alert.id,
+        "company_id": alert.company_id,
+        "company_name": alert.company.name,
+        "alert_type": alert.alert_type,
+        "severity": alert.severity,
+        "title": alert.title,
+        "description": alert.description,
+        "ai_summary": alert.ai_summary,
+        "is_read": alert.is_read,
+        "is_resolved": alert.is_resolved,
+        "created_at": alert.created_at
+    }
+
+
+def lazy_orm(db, limit: int) -> str:
+    """Original endpoint: each alert's company is a separate lazy load."""
+    alerts = db.execute(
+        select(Alert).where(Alert.is_resolved == False)
+        .order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit)
+    ).scalars().all()
+    items = [AlertResponse(**alert_dict(alert)).model_dump(mode="json") for alert in alerts]
+    db.expunge_all()
+    return json.dumps(items)
+
+
+def eager_orm(db, limit: int) -> str:
+    """Join-loaded companies, still hydrating Alert objects and re-validating."""
+    alerts = db.execute(
+        select(Alert).join(Company).options(contains_eager(Alert.company))
+        .where(Alert.is_resolved == False)
+        .order_by(Alert.created_at.desc(), Alert.id.desc()).limit(limit)
+    ).scalars().all()
+    items = [AlertResponse(**alert_dict(alert)).model_dump(mode="json") for alert in alerts]
+    db.expunge_all()
+    return json.dumps(items)
+
+
+def projection(db, limit: int) -> str:
+    """Current endpoint: one projection query, rows serialized as-is."""
+    rows = db.execute(alert_feed_query().limit(limit)).all()
+    return json.dumps([feed_item(row) for row in rows])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+    
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    counter = QueryCounter(engine)
+    
+    try:
+        print(f"Loading {args.alerts:,} alerts into {engine.url.render_as_string(hide_password=True)}")
+        load_alerts(db, args.alerts)
+        
+        pages = {name: json.loads(fn(db, args.limit)) for name, fn in [
+            ("lazy", lazy_orm), ("eager", eager_orm), ("projection", projection)
+        ]}
+        assert pages["lazy"] == pages["eager"] == pages["projection"], "Feed implementations disagree"
+        
+        print(f"\n{'Method (limit=' + str(args.limit) + ')':<28}{'queries':>9}{'median ms':>12}{'speedup':>10}")
+        print("-" * 59)
+        baseline = time_it(lambda: lazy_orm(db, args.limit), args.repeat)
+        for label, fn in [
+            ("lazy ORM (N+1)", lazy_orm),
+            ("eager ORM + validation", eager_orm),
+            ("projection", projection),
+        ]:
+            counter.count = 0
+            fn(db, args.limit)
+            queries = counter.count
+            elapsed = time_it(lambda: fn(db, args.limit), args.repeat)
+            print(f"{label:<28}{queries:>9}{elapsed:>12.2f}{baseline / elapsed:>9.1f}x")
+    finally:
+        db.close()
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark alert statistics: six COUNT queries vs one aggregate query vs alert_counters.
+
+Loads N synthetic alerts into a scratch database (SQLite file by default,
+or any URL via --database-url), then times each way of computing the
+/api/alerts/stats/summary payload and checks they agree.
+
+Usage:
+    python scripts/benchmark_alert_stats.py --alerts 1000000
+    python scripts/benchmark_alert_stats.py --database-url postgresql://user:pw@localhost/bench
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Alert, AlertSeverity, AlertType, Company
+from app.services.alerting import AlertStatsService
+
+
+def six_counts(db) -> dict:
+    """The original get_alert_stats: one COUNT(*) per number."""
+    unresolved = db.query(Alert).filter(Alert.is_resolved == False)
+    critical = unresolved.filter(Alert.severity == AlertSeverity.CRITICAL).count()
+    high = unresolved.filter(Alert.severity == AlertSeverity.HIGH).count()
+    return {
+        "total_unresolved": unresolved.count(),
+        "critical": critical,
+        "high": high,
+        "unread": db.query(Alert).filter(Alert.is_read == False).count(),
+        "by_severity": {
+            "critical": critical,
+            "high": high,
+            "medium": unresolved.filter(Alert.severity == AlertSeverity.MEDIUM).count(),
+            "low": unresolved.filter(Alert.severity == AlertSeverity.LOW).count()
+        }
+    }
+
+
+def load_alerts(db, count: int, companies: int = 200, chunk: int = 50_000) -> None:
+    """Bulk-insert synthetic alerts, then rebuild the counters once."""
+    db.execute(insert(Company), [{"name": f"Bench Co {i}"} for i in range(companies)])
+    db.commit()
+    
+    rng = random.Random(42)
+    severities = list(AlertSeverity)
+    types = list(AlertType)
+    for start in range(0, count, chunk):
+        rows = [
+            {
+                "company_id": rng.randint(1, companies),
+                "alert_type": rng.choice(types),
+                "severity": rng.choice(severities),
+                "title": "Benchmark alert",
+                "description": "Synthetic",
+                "is_read": rng.random() < 0.6,
+                "is_resolved": rng.random() < 0.7
+            }
+            for _ in range(min(chunk, count - start))
+        ]
+        # Core executemany skips the ORM events, so counters are rebuilt below
+        db.execute(insert(Alert), rows)
+        db.commit()
+        print(f"  loaded {start + len(rows):,} alerts", end="\r")
+    print()
+
+
+def time_it(fn, repeat: int) -> float:
+    """Median wall time of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+    
+    scratch = None
+    url = args.database_url
+    if url is None:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        url = f"sqlite:///{scratch.name}"
+    
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    service = AlertStatsService()
+    
+    try:
+        print(f"Loading {args.alerts:,} alerts into {engine.url.render_as_string(hide_password=True)}")
+        load_alerts(db, args.alerts)
+        
+        start = time.perf_counter()
+        service.rebuild(db)
+        print(f"Counter rebuild: {(time.perf_counter() - start) * 1000:,.1f} ms (one-off, at startup)")
+        
+        expected = six_counts(db)
+        assert service.aggregate(db) == expected, "Aggregate query differs from COUNT queries"
+        assert service.from_counters(db) == expected, "Counters differ from COUNT queries"
+        
+        print(f"\n{'Method':<28}{'median ms':>12}{'speedup':>10}")
+        print("-" * 50)
+        baseline = time_it(lambda: six_counts(db), args.repeat)
+        for label, fn in [
+            ("six COUNT(*) queries", lambda: six_counts(db)),
+            ("one aggregate query", lambda: service.aggregate(db)),
+            ("alert_counters (16 rows)", lambda: service.from_counters(db)),
+        ]:
+            elapsed = time_it(fn, args.repeat)
+            print(f"{label:<28}{elapsed:>12.2f}{baseline / elapsed:>9.1f}x")
+    finally:
+        db.close()
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
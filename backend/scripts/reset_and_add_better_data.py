@@ -108,45 +108,46 @@ COMPANIES = [
 ]
 
 def delete_all_companies():
-    """Delete existing companies."""
+    """Deactivate existing companies in one bulk request."""
     print("Clearing existing data...")
     try:
-        response = requests.get(f"{API_URL}/api/companies")
+        response = requests.get(f"{API_URL}/api/companies", params={"limit": 500})
         companies = response.json()
         
-        for company in companies:
-            delete_response = requests.delete(f"{API_URL}/api/companies/{company['id']}")
-            if delete_response.status_code in [200, 204]:
-                print(f"  [OK] Deleted: {company['name']}")
+        if companies:
+            deactivate_response = requests.patch(
+                f"{API_URL}/api/companies/bulk/deactivate",
+                json={"ids": [company['id'] for company in companies]}
+            )
+            if deactivate_response.status_code == 200:
+                print(f"  [OK] Deleted {deactivate_response.json()['updated']} companies")
         print()
     except Exception as e:
         print(f"  [WARN] Could not clear data: {e}")
         print()
 
 def add_companies():
-    """Add companies with varied data."""
+    """Add companies with varied data in one bulk request."""
     print("Adding portfolio companies...")
     added = []
     
-    for company in COMPANIES:
-        try:
-            response = requests.post(
-                f"{API_URL}/api/companies",
-                json=company,
-                timeout=10
-            )
+    try:
+        response = requests.post(f"{API_URL}/api/companies/bulk", json=COMPANIES, timeout=30)
+        
+        if response.status_code == 200:
+            for company, result in zip(COMPANIES, response.json()["results"]):
+                if result["status"] == "created":
+                    added.append(dict(company, id=result["id"]))
+                    risk_level = "LOW" if company['risk_score'] < 35 else "MED" if company['risk_score'] < 60 else "HIGH"
+                    print(f"  [OK] {company['name']} - Risk: {company['risk_score']}/100 ({risk_level})")
+                else:
+                    print(f"  [ERROR] Failed: {company['name']} - {result['error']}")
+        else:
+            print(f"  [ERROR] Bulk add failed - Status: {response.status_code}")
+            print(f"         Response: {response.text[:100]}")
             
-            if response.status_code in [200, 201]:
-                data = response.json()
-                added.append(data)
-                risk_level = "LOW" if company['risk_score'] < 35 else "MED" if company['risk_score'] < 60 else "HIGH"
-                print(f"  [OK] {company['name']} - Risk: {company['risk_score']}/100 ({risk_level})")
-            else:
-                print(f"  [ERROR] Failed: {company['name']} - Status: {response.status_code}")
-                print(f"         Response: {response.text[:100]}")
-                
-        except Exception as e:
-            print(f"  [ERROR] {company['name']}: {e}")
+    except Exception as e:
+        print(f"  [ERROR] {e}")
     
     print()
     return added
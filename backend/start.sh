@@ -4,6 +4,9 @@
 # Use PORT environment variable or default to 8000
 PORT=${PORT:-8000}
 
+# Apply schema migrations (adopts databases created before migrations existed)
+alembic upgrade head || exit 1
+
 # Start uvicorn
 exec uvicorn app.main:app --host 0.0.0.0 --port $PORT --timeout-keep-alive 120
 
@@ -3,12 +3,20 @@ Pytest configuration and fixtures.
 """
 
 import pytest
+import pytest_asyncio
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
-from app.core.database import Base, get_db
+from app.core.cache import InMemoryCache
+from app.core.database import Base, async_database_url, get_async_db, get_db
 from app.main import app
+from app.services.ai_engine import batch_engine
+from app.services.analytics import metric_store, portfolio_summary
+from app.services.caching import http_cache
+from app.services.data_aggregator import news_ingestion
 
 # Test database URL
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -17,11 +25,19 @@ TEST_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same file for the request handlers; NullPool because
+# TestClient runs the app on its own event loop
+async_engine = create_async_engine(async_database_url(TEST_DATABASE_URL), poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    # Cached metric columns and snapshots belong to the previous test's database
+    metric_store.clear()
+    portfolio_summary.clear()
     session = TestingSessionLocal()
     try:
         yield session
@@ -30,6 +46,13 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db_session(db_session):
+    """Async session on the same fresh database as `db_session`."""
+    async with AsyncTestingSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database session."""
@@ -39,7 +62,18 @@ def client(db_session):
         finally:
             db_session.close()
     
+    async def override_get_async_db():
+        async with AsyncTestingSessionLocal() as session:
+            yield session
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Background jobs open their own sessions
+    batch_engine.session_factory = TestingSessionLocal
+    news_ingestion.session_factory = TestingSessionLocal
+    # Every test starts from an empty database, so also from an empty response cache
+    http_cache.backend = InMemoryCache(max_entries=256)
+    http_cache.pending.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -3,8 +3,16 @@ Integration tests for API endpoints.
 Demonstrates: API testing, CRUD operations, status codes
 """
 
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.models import Alert, AlertSeverity, AlertType, Company
+from app.services.alerting import alert_stats
+from app.services.analytics import portfolio_summary
 
 
 class TestCompaniesAPI:
@@ -136,6 +144,431 @@ class TestCompaniesAPI:
         assert response2.status_code == status.HTTP_400_BAD_REQUEST
 
 
+class TestAlertsAPI:
+    """Test cases for Alerts API endpoints."""
+    
+    def _create_alert(self, client, severity="high"):
+        company = client.post("/api/companies", json={"name": "Alerted Co"}).json()
+        response = client.post("/api/alerts", json={
+            "company_id": company["id"],
+            "severity": severity,
+            "title": "Runway below 6 months",
+            "description": "Burn increased after the last hiring round"
+        })
+        return company, response
+    
+    def test_create_and_list_alerts(self, client):
+        """Test that created alerts are listed with their company name."""
+        company, response = self._create_alert(client)
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["company_name"] == "Alerted Co"
+        
+        alerts = client.get("/api/alerts").json()
+        assert len(alerts) == 1
+        assert alerts[0]["company_id"] == company["id"]
+        assert alerts[0]["company_name"] == "Alerted Co"
+    
+    def test_get_alert_by_id(self, client):
+        """Test retrieving a single alert."""
+        _, created = self._create_alert(client)
+        
+        response = client.get(f"/api/alerts/{created.json()['id']}")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["company_name"] == "Alerted Co"
+    
+    def test_resolve_alert_updates_stats(self, client):
+        """Test that resolved alerts drop out of the unresolved counts."""
+        _, created = self._create_alert(client, severity="critical")
+        assert client.get("/api/alerts/stats/summary").json()["critical"] == 1
+        
+        response = client.patch(f"/api/alerts/{created.json()['id']}/resolve")
+        
+        assert response.status_code == status.HTTP_200_OK
+        stats = client.get("/api/alerts/stats/summary").json()
+        assert stats["total_unresolved"] == 0
+        assert stats["unread"] == 1
+    
+    def test_feed_page_is_one_query(self, client, db_session):
+        """Test that a full page across many companies costs a single SQL statement."""
+        companies = [Company(name=f"Feed Co {i}") for i in range(50)]
+        db_session.add_all(companies)
+        db_session.commit()
+        base = datetime(2024, 1, 1)
+        db_session.add_all([
+            Alert(company_id=companies[i % 50].id, alert_type=AlertType.RISK, severity=AlertSeverity.HIGH,
+                  title=f"Alert {i}", description="d", created_at=base + timedelta(minutes=i))
+            for i in range(250)
+        ])
+        db_session.commit()
+        
+        statements = []
+        count = lambda *args: statements.append(args[2])
+        event.listen(Engine, "before_cursor_execute", count)
+        try:
+            response = client.get("/api/alerts", params={"limit": 200})
+        finally:
+            event.remove(Engine, "before_cursor_execute", count)
+        
+        assert response.status_code == status.HTTP_200_OK
+        alerts = response.json()
+        assert len(alerts) == 200
+        assert len(statements) == 1
+        assert alerts[0] == {
+            "id": 250, "company_id": companies[249 % 50].id, "company_name": "Feed Co 49",
+            "alert_type": "risk", "severity": "high", "title": "Alert 249", "description": "d",
+            "ai_summary": None, "is_read": False, "is_resolved": False,
+            "created_at": "2024-01-01T04:09:00"
+        }
+
+
+class TestBulkCreate:
+    """Test cases for the bulk company and alert endpoints."""
+    
+    def test_bulk_companies_report_each_row(self, client):
+        """Test created, duplicate and invalid rows in one batch."""
+        client.post("/api/companies", json={"name": "Existing Co"})
+        rows = [
+            {"name": "New Co", "industry": "AI", "risk_score": 40},
+            {"name": "Existing Co"},
+            {"industry": "No name"},
+            {"name": "New Co"},
+            {"name": "Other Co", "ownership_percentage": 150},
+        ]
+        
+        statements = []
+        count = lambda *args: statements.append(args[2])
+        event.listen(Engine, "before_cursor_execute", count)
+        try:
+            response = client.post("/api/companies/bulk", json=rows)
+        finally:
+            event.remove(Engine, "before_cursor_execute", count)
+        
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert [r["status"] for r in body["results"]] == ["created", "duplicate", "error", "duplicate", "error"]
+        assert (body["created"], body["duplicates"], body["failed"]) == (1, 2, 2)
+        assert "name" in body["results"][2]["error"]
+        assert len([sql for sql in statements if sql.startswith("INSERT")]) == 1
+        
+        created = client.get(f"/api/companies/{body['results'][0]['id']}").json()
+        assert created["name"] == "New Co"
+        assert created["health_score"] == 50
+        assert {c["name"] for c in client.get("/api/companies").json()} == {"Existing Co", "New Co"}
+    
+    def test_bulk_alerts_update_counters(self, client, db_session):
+        """Test that bulk-inserted alerts are counted and re-runs are deduplicated."""
+        company = client.post("/api/companies", json={"name": "Bulk Alerts Co"}).json()
+        rows = [
+            {"company_id": company["id"], "severity": "critical", "title": "Runway", "description": "d"},
+            {"company_id": company["id"], "severity": "high", "alert_type": "news", "title": "Press", "description": "d"},
+            {"company_id": 999, "severity": "low", "title": "Orphan", "description": "d"},
+        ]
+        
+        first = client.post("/api/alerts/bulk", json=rows).json()
+        again = client.post("/api/alerts/bulk", json=rows[:2]).json()
+        
+        assert [r["status"] for r in first["results"]] == ["created", "created", "error"]
+        assert [r["status"] for r in again["results"]] == ["duplicate", "duplicate"]
+        stats = client.get("/api/alerts/stats/summary").json()
+        assert (stats["critical"], stats["high"], stats["unread"]) == (1, 1, 2)
+        assert alert_stats.from_counters(db_session) == alert_stats.aggregate(db_session)
+        assert [a["title"] for a in client.get("/api/alerts").json()] == ["Press", "Runway"]
+    
+    def test_bulk_rejects_empty_batch(self, client):
+        """Test that an empty batch is a client error."""
+        assert client.post("/api/companies/bulk", json=[]).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.post("/api/alerts/bulk", json=[]).status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestBulkUpdate:
+    """Test cases for bulk deactivate, read and resolve."""
+    
+    def _seed(self, client):
+        a = client.post("/api/companies", json={"name": "A", "industry": "AI"}).json()
+        b = client.post("/api/companies", json={"name": "B", "industry": "SaaS"}).json()
+        rows = [
+            {"company_id": a["id"], "severity": "critical", "title": "a1", "description": "d"},
+            {"company_id": a["id"], "severity": "high", "title": "a2", "description": "d"},
+            {"company_id": b["id"], "severity": "critical", "title": "b1", "description": "d"},
+        ]
+        ids = [r["id"] for r in client.post("/api/alerts/bulk", json=rows).json()["results"]]
+        return a, b, ids
+    
+    def test_bulk_read_by_ids_keeps_counters_exact(self, client, db_session):
+        """Test that one UPDATE marks alerts read and adjusts the unread count."""
+        _, _, ids = self._seed(client)
+        assert client.get("/api/alerts/stats/summary").json()["unread"] == 3
+        
+        response = client.patch("/api/alerts/bulk/read", json={"ids": ids[:2]})
+        repeat = client.patch("/api/alerts/bulk/read", json={"ids": ids[:2]})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["updated"] == 2
+        assert repeat.json()["updated"] == 0
+        assert client.get("/api/alerts/stats/summary").json()["unread"] == 1
+        assert alert_stats.from_counters(db_session) == alert_stats.aggregate(db_session)
+    
+    def test_bulk_resolve_by_filter(self, client, db_session):
+        """Test resolving only the alerts that match every filter."""
+        a, _, ids = self._seed(client)
+        
+        response = client.patch(
+            "/api/alerts/bulk/resolve",
+            params={"resolved_by": "ops"},
+            json={"company_id": a["id"], "severity": "critical"}
+        )
+        
+        assert response.json()["updated"] == 1
+        assert sorted(alert["id"] for alert in client.get("/api/alerts").json()) == ids[1:]
+        stats = client.get("/api/alerts/stats/summary").json()
+        assert (stats["critical"], stats["high"], stats["total_unresolved"]) == (1, 1, 2)
+        assert alert_stats.from_counters(db_session) == alert_stats.aggregate(db_session)
+        resolved = db_session.get(Alert, ids[0])
+        assert resolved.resolved_by == "ops"
+        assert resolved.resolved_at is not None
+    
+    def test_bulk_updates_require_a_selection(self, client):
+        """Test that an empty selection is refused instead of updating everything."""
+        assert client.patch("/api/alerts/bulk/read", json={}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.patch("/api/companies/bulk/deactivate", json={}).status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_bulk_deactivate_companies_by_filter(self, client):
+        """Test soft-deleting companies by industry, reflected in list and detail."""
+        a, b, _ = self._seed(client)
+        client.get(f"/api/companies/{a['id']}")
+        
+        response = client.patch("/api/companies/bulk/deactivate", json={"industry": "AI"})
+        
+        assert response.json()["ids"] == [a["id"]]
+        assert [c["id"] for c in client.get("/api/companies").json()] == [b["id"]]
+        assert client.get(f"/api/companies/{a['id']}").json()["is_active"] is False
+
+
+class TestMetricsAPI:
+    """Test cases for metric ingestion and series queries."""
+    
+    def _ingest_daily(self, client, company_id, days, start=datetime(2025, 1, 6)):
+        rows = [
+            {
+                "company_id": company_id, "metric_type": "revenue",
+                "metric_value": float(day), "recorded_at": (start + timedelta(days=day)).isoformat()
+            }
+            for day in range(days)
+        ]
+        return client.post("/api/metrics/bulk", json=rows).json()
+    
+    def test_bulk_ingest_reports_duplicates_and_errors(self, client):
+        """Test that re-sent points are duplicates and unknown companies are errors."""
+        company = client.post("/api/companies", json={"name": "Metric Co"}).json()
+        point = {"company_id": company["id"], "metric_type": "revenue", "metric_value": 1.0,
+                 "recorded_at": "2025-01-01T00:00:00"}
+        
+        result = client.post("/api/metrics/bulk", json=[
+            point, point, {**point, "company_id": 999}, {"metric_type": "revenue"}
+        ]).json()
+        
+        assert [r["status"] for r in result["results"]] == ["created", "duplicate", "error", "error"]
+        repeat = client.post("/api/metrics/bulk", json=[point]).json()
+        assert repeat["duplicates"] == 1
+    
+    def test_raw_series_in_window(self, client):
+        """Test that raw points are returned oldest first within [start, end)."""
+        company = client.post("/api/companies", json={"name": "Raw Co"}).json()
+        self._ingest_daily(client, company["id"], 10)
+        
+        response = client.get(f"/api/metrics/{company['id']}/revenue", params={
+            "start": "2025-01-08T00:00:00", "end": "2025-01-11T00:00:00", "bucket": "raw"
+        })
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["value"] for p in response.json()["points"]] == [2.0, 3.0, 4.0]
+    
+    @pytest.mark.parametrize("agg,expected", [
+        ("last", [6.0, 13.0]), ("avg", [3.0, 10.0]), ("min", [0.0, 7.0]), ("max", [6.0, 13.0])
+    ])
+    def test_weekly_buckets(self, client, agg, expected):
+        """Test Monday-aligned weekly buckets with each aggregate."""
+        company = client.post("/api/companies", json={"name": "Weekly Co"}).json()
+        self._ingest_daily(client, company["id"], 14)  # Two weeks from Monday 2025-01-06
+        
+        body = client.get(f"/api/metrics/{company['id']}/revenue", params={
+            "start": "2025-01-01T00:00:00", "end": "2025-02-01T00:00:00", "bucket": "week", "agg": agg
+        }).json()
+        
+        assert [p["t"] for p in body["points"]] == ["2025-01-06T00:00:00", "2025-01-13T00:00:00"]
+        assert [p["value"] for p in body["points"]] == expected
+        assert [p["count"] for p in body["points"]] == [7, 7]
+    
+    def test_auto_bucket_bounds_points(self, client):
+        """Test that a multi-year window is downsampled to few points."""
+        company = client.post("/api/companies", json={"name": "Long Co"}).json()
+        self._ingest_daily(client, company["id"], 900, start=datetime(2023, 1, 1))
+        
+        body = client.get(f"/api/metrics/{company['id']}/revenue", params={
+            "start": "2023-01-01T00:00:00", "end": "2025-12-31T00:00:00", "limit": 200
+        }).json()
+        
+        assert body["bucket"] == "week"
+        assert len(body["points"]) <= 200
+        assert sum(p["count"] for p in body["points"]) == 900
+        assert body["truncated"] is False
+    
+    def test_ingest_invalidates_cached_series(self, client):
+        """Test that new points show up in a previously cached series."""
+        company = client.post("/api/companies", json={"name": "Fresh Co"}).json()
+        url = f"/api/metrics/{company['id']}/revenue"
+        params = {"start": "2025-01-01T00:00:00", "end": "2025-02-01T00:00:00", "bucket": "raw"}
+        assert client.get(url, params=params).json()["points"] == []
+        
+        self._ingest_daily(client, company["id"], 2)
+        
+        assert len(client.get(url, params=params).json()["points"]) == 2
+    
+    def test_series_errors(self, client):
+        """Test unknown companies and inverted windows."""
+        company = client.post("/api/companies", json={"name": "Err Co"}).json()
+        
+        missing = client.get("/api/metrics/999/revenue")
+        inverted = client.get(f"/api/metrics/{company['id']}/revenue", params={
+            "start": "2025-02-01T00:00:00", "end": "2025-01-01T00:00:00"
+        })
+        
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+        assert inverted.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestPortfolioSummaryAPI:
+    """Test cases for the precomputed dashboard summary."""
+    
+    def _seed(self, client):
+        rows = [
+            {"name": "Low", "risk_score": 20, "current_arr": 3000000},
+            {"name": "Medium", "risk_score": 50, "current_arr": 1000000},
+            {"name": "High", "risk_score": 80, "current_arr": 0},
+        ]
+        return [r["id"] for r in client.post("/api/companies/bulk", json=rows).json()["results"]]
+    
+    def test_summary_headline_numbers(self, client):
+        """Test totals, risk buckets, weighted risk and the top at-risk list."""
+        ids = self._seed(client)
+        client.post("/api/alerts", json={"company_id": ids[2], "severity": "critical",
+                                         "title": "Runway", "description": "d"})
+        
+        response = client.get("/api/portfolio/summary", params={"top": 2})
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total_companies"] == 3
+        assert data["total_arr"] == 4000000
+        assert data["average_risk_score"] == 50.0
+        assert data["weighted_risk_score"] == 27.5
+        assert data["risk_buckets"] == {"low": 1, "medium": 1, "high": 1}
+        assert data["alerts"]["critical"] == 1
+        assert [c["name"] for c in data["top_at_risk"]] == ["High", "Medium"]
+    
+    def test_snapshot_is_reused_until_a_write(self, client):
+        """Test that reads share one computation and writes trigger a recompute."""
+        ids = self._seed(client)
+        client.get("/api/portfolio/summary")
+        computations = portfolio_summary.computations
+        
+        client.get("/api/portfolio/summary")
+        assert portfolio_summary.computations == computations
+        
+        client.put(f"/api/companies/{ids[0]}", json={"current_arr": 5000000})
+        data = client.get("/api/portfolio/summary").json()
+        
+        assert portfolio_summary.computations == computations + 1
+        assert data["total_arr"] == 6000000
+    
+    def test_bulk_writes_refresh_the_snapshot(self, client):
+        """Test that bulk deactivation (no ORM events) is reflected."""
+        ids = self._seed(client)
+        client.get("/api/portfolio/summary")
+        
+        client.patch("/api/companies/bulk/deactivate", json={"ids": ids[2:]})
+        data = client.get("/api/portfolio/summary").json()
+        
+        assert data["total_companies"] == 2
+        assert data["risk_buckets"]["high"] == 0
+
+
+class TestKeysetPagination:
+    """Test cases for cursor pagination on companies and alerts."""
+    
+    def _pages(self, client, url, limit):
+        pages = []
+        params = {"limit": limit}
+        while True:
+            response = client.get(url, params=params)
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.json())
+            assert len(pages) <= 50, "cursor pagination did not terminate"
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                return pages
+            assert 'rel="next"' in response.headers["Link"]
+            params = {"limit": limit, "cursor": cursor}
+    
+    def test_companies_pages_cover_everything_once(self, client):
+        """Test that following next cursors visits every company once, in id order."""
+        ids = [client.post("/api/companies", json={"name": f"Co {i}"}).json()["id"] for i in range(5)]
+        
+        pages = self._pages(client, "/api/companies", limit=2)
+        
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert [c["id"] for page in pages for c in page] == ids
+    
+    def test_alerts_pages_break_created_at_ties_by_id(self, client, db_session):
+        """Test newest-first paging when many alerts share a timestamp."""
+        company = Company(name="Paged Co")
+        db_session.add(company)
+        db_session.commit()
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(7):
+            db_session.add(Alert(company_id=company.id, alert_type=AlertType.NEWS, severity=AlertSeverity.LOW,
+                                 title=f"Alert {i}", description="d",
+                                 created_at=base + timedelta(minutes=i // 3)))
+        db_session.commit()
+        
+        pages = self._pages(client, "/api/alerts", limit=3)
+        alerts = [a for page in pages for a in page]
+        
+        assert len(alerts) == 7
+        assert len({a["id"] for a in alerts}) == 7
+        keys = [(a["created_at"], a["id"]) for a in alerts]
+        assert keys == sorted(keys, reverse=True)
+    
+    def test_alerts_pages_with_server_default_timestamps(self, client, db_session):
+        """Test paging over alerts stamped by the database, which SQLite stores without fractional seconds."""
+        company = Company(name="Stamped Co")
+        db_session.add(company)
+        db_session.commit()
+        db_session.add_all([
+            Alert(company_id=company.id, alert_type=AlertType.NEWS, severity=AlertSeverity.LOW,
+                  title=f"Alert {i}", description="d")
+            for i in range(12)
+        ])
+        db_session.commit()
+        
+        pages = self._pages(client, "/api/alerts", limit=5)
+        ids = [a["id"] for page in pages for a in page]
+        
+        assert [len(page) for page in pages] == [5, 5, 2]
+        assert sorted(ids) == sorted(set(ids)) and len(ids) == 12
+    
+    def test_invalid_cursor_is_rejected(self, client):
+        """Test that a tampered cursor returns 400 rather than a wrong page."""
+        assert client.get("/api/companies", params={"cursor": "not-a-cursor"}).status_code == 400
+        
+        client.post("/api/companies", json={"name": "A"})
+        client.post("/api/companies", json={"name": "B"})
+        company_cursor = client.get("/api/companies", params={"limit": 1}).headers["X-Next-Cursor"]
+        assert client.get("/api/alerts", params={"cursor": company_cursor}).status_code == 400
+
+
 class TestHealthEndpoint:
     """Test health check endpoint."""
     
@@ -156,3 +589,132 @@ class TestHealthEndpoint:
         assert "message" in data
         assert "docs" in data
 
+
+
+class TestBatchAnalysisAPI:
+    """Test cases for portfolio batch analysis endpoints."""
+    
+    def test_batch_analyze_creates_job(self, client):
+        """Test that starting a batch run returns a pollable job."""
+        client.post("/api/companies", json={"name": "Batch Co", "runway_months": 4})
+        
+        response = client.post("/api/analysis/batch-analyze")
+        
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        data = response.json()
+        assert data["companies_count"] == 1
+        
+        status_response = client.get(
+            f"/api/analysis/batch-analyze/{data['task_id']}",
+            params={"include_results": True}
+        )
+        assert status_response.status_code == status.HTTP_200_OK
+        job = status_response.json()
+        assert job["status"] == "completed"
+        assert job["completed"] == 1
+        assert len(job["results"]) == 1
+    
+    def test_batch_status_not_found(self, client):
+        """Test polling an unknown job."""
+        response = client.get("/api/analysis/batch-analyze/does-not-exist")
+        
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def parse_sse(body: str) -> list:
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    import json
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestStreamingInsightsAPI:
+    """Test cases for streamed executive summaries."""
+    
+    def test_stream_insights_persists_summary(self, client):
+        """Test that a streamed summary arrives as SSE and is saved."""
+        company_id = client.post("/api/companies", json={"name": "Stream Co"}).json()["id"]
+        
+        response = client.get(f"/api/companies/{company_id}/insights", params={"stream": True})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert events[0][0] == "meta"
+        assert any(name == "token" for name, _ in events)
+        assert events[-1][0] == "done"
+        
+        summaries = client.get(f"/api/companies/{company_id}/summaries").json()["summaries"]
+        assert len(summaries) == 1
+        assert summaries[0]["id"] == events[-1][1]["summary_id"]
+        assert summaries[0]["source"] == "insights"
+    
+    def test_stream_summarize(self, client):
+        """Test streaming from the summarize endpoint."""
+        company_id = client.post("/api/companies", json={"name": "Stream Two"}).json()["id"]
+        
+        response = client.post("/api/analysis/summarize", json={
+            "company_id": company_id,
+            "include_news": False,
+            "stream": True
+        })
+        
+        events = parse_sse(response.text)
+        tokens = "".join(data["text"] for name, data in events if name == "token")
+        assert "Stream Two" in tokens
+        assert events[-1][0] == "done"
+
+
+class TestRiskScoresAPI:
+    """Test cases for the bulk deterministic risk endpoint."""
+    
+    def test_bulk_risk_scores(self, client):
+        """Test that every active company is scored, riskiest first."""
+        client.post("/api/companies", json={"name": "Safe Co", "runway_months": 30,
+                                            "current_arr": 5000000, "monthly_burn_rate": 50000})
+        client.post("/api/companies", json={"name": "Risky Co", "runway_months": 2,
+                                            "current_arr": 100000, "monthly_burn_rate": 90000})
+        
+        response = client.get("/api/analysis/risk-scores")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["count"] == 2
+        assert data["scores"][0]["company_name"] == "Risky Co"
+        assert data["scores"][0]["risk_level"] in ("High", "Critical")
+    
+    def test_triage_saves_local_scores(self, client):
+        """Test that hybrid triage scores and persists without an LLM configured."""
+        created = client.post("/api/companies", json={"name": "Safe Co", "runway_months": 30,
+                                                      "current_arr": 5000000, "monthly_burn_rate": 50000})
+        
+        response = client.post("/api/analysis/risk-scores/triage")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["stats"]["companies"] == 1
+        assert data["results"][0]["model_used"] == "local-multifactor"
+        company = client.get(f"/api/companies/{created.json()['id']}").json()
+        assert company["risk_score"] == data["results"][0]["risk_score"]
+    
+    def test_benchmarks_by_stage(self, client):
+        """Test peer-group benchmarks over ingested revenue series."""
+        company = client.post("/api/companies", json={"name": "Bench Co", "stage": "Seed",
+                                                      "current_arr": 200000, "monthly_burn_rate": 10000}).json()
+        now = datetime.utcnow()
+        client.post("/api/metrics/bulk", json=[
+            {"company_id": company["id"], "metric_type": "revenue", "metric_value": value,
+             "recorded_at": (now - timedelta(days=days_ago)).isoformat()}
+            for days_ago, value in [(200, 100.0), (10, 200.0)]
+        ])
+        
+        response = client.get("/api/analysis/benchmarks", params={"group_by": "stage"})
+        
+        assert response.status_code == status.HTTP_200_OK
+        [group] = response.json()["groups"]
+        assert group["stage"] == "Seed"
+        assert group["median_growth"] == 1.0
+        assert group["median_burn_multiple"] == pytest.approx(10000 * 365 / 30 / 100000, rel=1e-3)
@@ -0,0 +1,139 @@
+"""
+Integration tests for the HTTP response cache.
+Demonstrates: Tag invalidation, conditional GETs, cache-hit accounting
+"""
+
+from fastapi import status
+
+from app.models import Company
+from app.services.caching import http_cache
+from app.services.caching.http_cache import etag_matches
+
+
+class TestHTTPCache:
+    """Test cached GETs, ETag revalidation and precise invalidation."""
+    
+    def _company(self, client, name):
+        return client.post("/api/companies", json={"name": name}).json()
+    
+    def test_repeat_get_is_served_from_cache(self, client):
+        """Test that an identical GET is a hit with the same body and ETag."""
+        self._company(client, "Cached Co")
+        
+        first = client.get("/api/companies")
+        hits = http_cache.hits
+        second = client.get("/api/companies")
+        
+        assert second.status_code == status.HTTP_200_OK
+        assert http_cache.hits == hits + 1
+        assert second.json() == first.json()
+        assert second.headers["ETag"] == first.headers["ETag"]
+        assert second.headers["Cache-Control"] == "private, no-cache"
+    
+    def test_if_none_match_returns_304(self, client):
+        """Test conditional GETs, before and after the resource changes."""
+        company = self._company(client, "Etag Co")
+        url = f"/api/companies/{company['id']}"
+        etag = client.get(url).headers["ETag"]
+        
+        unchanged = client.get(url, headers={"If-None-Match": etag})
+        
+        assert unchanged.status_code == status.HTTP_304_NOT_MODIFIED
+        assert unchanged.content == b""
+        assert unchanged.headers["ETag"] == etag
+        
+        client.put(url, json={"name": "Etag Co Renamed"})
+        changed = client.get(url, headers={"If-None-Match": etag})
+        
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed.json()["name"] == "Etag Co Renamed"
+        assert changed.headers["ETag"] != etag
+    
+    def test_update_invalidates_only_affected_company(self, client):
+        """Test that updating one company leaves other companies' entries cached."""
+        a = self._company(client, "Alpha")
+        b = self._company(client, "Beta")
+        client.get(f"/api/companies/{a['id']}")
+        client.get(f"/api/companies/{b['id']}")
+        
+        client.put(f"/api/companies/{a['id']}", json={"employee_count": 12})
+        hits = http_cache.hits
+        
+        assert client.get(f"/api/companies/{a['id']}").json()["employee_count"] == 12
+        assert http_cache.hits == hits
+        client.get(f"/api/companies/{b['id']}")
+        assert http_cache.hits == hits + 1
+    
+    def test_alert_writes_invalidate_feed_and_stats(self, client):
+        """Test that resolving an alert refreshes the feed and stats but not companies."""
+        company = self._company(client, "Alerting Co")
+        alert = client.post("/api/alerts", json={
+            "company_id": company["id"], "severity": "critical",
+            "title": "Covenant breach", "description": "d"
+        }).json()
+        assert client.get("/api/alerts/stats/summary").json()["critical"] == 1
+        assert len(client.get("/api/alerts").json()) == 1
+        client.get("/api/companies")
+        
+        client.patch(f"/api/alerts/{alert['id']}/resolve")
+        
+        assert client.get("/api/alerts/stats/summary").json()["critical"] == 0
+        assert client.get("/api/alerts").json() == []
+        hits = http_cache.hits
+        client.get("/api/companies")
+        assert http_cache.hits == hits + 1
+    
+    def test_company_rename_refreshes_alert_feed(self, client):
+        """Test that the feed's company_name follows a rename."""
+        company = self._company(client, "Old Name")
+        client.post("/api/alerts", json={
+            "company_id": company["id"], "severity": "low", "title": "t", "description": "d"
+        })
+        assert client.get("/api/alerts").json()[0]["company_name"] == "Old Name"
+        
+        client.put(f"/api/companies/{company['id']}", json={"name": "New Name"})
+        
+        assert client.get("/api/alerts").json()[0]["company_name"] == "New Name"
+    
+    def test_commits_outside_requests_invalidate(self, client, db_session):
+        """Test that ORM writes from jobs or scripts are picked up by the next request."""
+        client.get("/api/companies")
+        
+        db_session.add(Company(name="Written By Job"))
+        db_session.commit()
+        
+        assert [c["name"] for c in client.get("/api/companies").json()] == ["Written By Job"]
+    
+    def test_pagination_headers_are_replayed(self, client):
+        """Test that cursor headers survive a cache hit."""
+        for name in ("One", "Two", "Three"):
+            self._company(client, name)
+        
+        first = client.get("/api/companies", params={"limit": 2})
+        second = client.get("/api/companies", params={"limit": 2})
+        
+        assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert second.headers["Link"] == first.headers["Link"]
+    
+    def test_errors_are_not_cached(self, client):
+        """Test that a 404 is not stored and the company is found once created."""
+        assert client.get("/api/companies/1").status_code == status.HTTP_404_NOT_FOUND
+        
+        self._company(client, "Late Co")
+        
+        assert client.get("/api/companies/1").status_code == status.HTTP_200_OK
+
+
+class TestEtagMatching:
+    """Test If-None-Match parsing."""
+    
+    def test_weak_and_listed_tags_match(self):
+        """Test weak comparison across a list of entity tags."""
+        assert etag_matches('W/"abc"', '"abc"')
+        assert etag_matches('"x", "abc"', '"abc"')
+        assert etag_matches("*", '"abc"')
+    
+    def test_other_tags_do_not_match(self):
+        """Test that different or missing tags never match."""
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
@@ -0,0 +1,155 @@
+"""
+Integration tests for the Prometheus /metrics surface.
+Demonstrates: Asserting on registry samples, fake providers, mocked transports
+"""
+
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.cache import InMemoryCache
+from app.core.instrumentation import InstrumentedQueuePool
+from app.services.ai_engine.llm_analyzer import LLMAnalyzer
+from app.services.ai_engine.response_cache import LLMResponseCache
+from app.services.data_aggregator.news_scraper import NewsAggregator
+
+
+def sample(name, **labels):
+    """Current value of one sample, 0 if it was never recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class FakeCompletions:
+    """Stands in for openai.chat.completions, reporting usage or failing."""
+    
+    def __init__(self, fail=False):
+        self.fail = fail
+    
+    async def create(self, **kwargs):
+        if self.fail:
+            raise TimeoutError("provider timed out")
+        message = SimpleNamespace(content="fine")
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def make_analyzer(fail=False):
+    analyzer = LLMAnalyzer()
+    analyzer.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(fail)))
+    analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=16), ttl=60)
+    return analyzer
+
+
+class TestHTTPMetrics:
+    """Test cases for request latency and per-request SQL accounting."""
+    
+    def test_metrics_endpoint_serves_exposition_format(self, client):
+        """Test that /metrics is plain-text Prometheus output."""
+        client.get("/health")
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "investorlens_http_request_duration_seconds_bucket" in response.text
+    
+    def test_latency_is_labelled_by_route_template(self, client):
+        """Test that path parameters do not leak into labels."""
+        company_id = client.post("/api/companies", json={"name": "Acme"}).json()["id"]
+        labels = dict(method="GET", route="/api/companies/{company_id}", status="200")
+        before = sample("investorlens_http_request_duration_seconds_count", **labels)
+        
+        client.get(f"/api/companies/{company_id}")
+        
+        assert sample("investorlens_http_request_duration_seconds_count", **labels) == before + 1
+        assert f"/api/companies/{company_id}\"" not in client.get("/metrics").text
+    
+    def test_queries_are_counted_per_request(self, client):
+        """Test that the SQL statements of a request are attributed to its route."""
+        client.post("/api/companies", json={"name": "Acme"})
+        count = sample("investorlens_db_queries_per_request_count", route="/api/companies")
+        queries = sample("investorlens_db_queries_per_request_sum", route="/api/companies")
+        
+        client.get("/api/companies")
+        
+        assert sample("investorlens_db_queries_per_request_count", route="/api/companies") == count + 1
+        assert sample("investorlens_db_queries_per_request_sum", route="/api/companies") >= queries + 1
+    
+    def test_cached_responses_keep_their_route(self, client):
+        """Test that responses served by the HTTP cache are still labelled by route."""
+        labels = dict(method="GET", route="/api/alerts", status="200")
+        before = sample("investorlens_http_request_duration_seconds_count", **labels)
+        hits = sample("investorlens_cache_hits_total", cache="http")
+        
+        client.get("/api/alerts")
+        client.get("/api/alerts")
+        
+        assert sample("investorlens_http_request_duration_seconds_count", **labels) == before + 2
+        assert sample("investorlens_cache_hits_total", cache="http") == hits + 1
+    
+    def test_unknown_paths_share_one_label(self, client):
+        """Test that 404s for arbitrary paths do not create new series."""
+        labels = dict(method="GET", route="<unmatched>", status="404")
+        before = sample("investorlens_http_request_duration_seconds_count", **labels)
+        
+        client.get("/no/such/page")
+        
+        assert sample("investorlens_http_request_duration_seconds_count", **labels) == before + 1
+
+
+class TestDependencyMetrics:
+    """Test cases for pool, LLM and news instrumentation."""
+    
+    def test_pool_checkout_wait_is_recorded(self, tmp_path):
+        """Test that every checkout from the instrumented pool is timed."""
+        engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool)
+        before = sample("investorlens_db_pool_checkout_wait_seconds_count", pool="sync")
+        
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        
+        assert sample("investorlens_db_pool_checkout_wait_seconds_count", pool="sync") == before + 1
+        engine.dispose()
+    
+    @pytest.mark.asyncio
+    async def test_llm_tokens_and_latency(self):
+        """Test that a completion records its latency and billed tokens."""
+        analyzer = make_analyzer()
+        labels = dict(provider="openai", model="gpt-4")
+        calls = sample("investorlens_llm_request_duration_seconds_count", outcome="ok", **labels)
+        prompt = sample("investorlens_llm_tokens_total", kind="prompt", **labels)
+        
+        await analyzer._complete_openai("gpt-4", "system", "prompt", 0.3, 100)
+        
+        assert sample("investorlens_llm_request_duration_seconds_count", outcome="ok", **labels) == calls + 1
+        assert sample("investorlens_llm_tokens_total", kind="prompt", **labels) == prompt + 120
+    
+    @pytest.mark.asyncio
+    async def test_llm_errors_by_type(self):
+        """Test that failed completions are counted by exception type."""
+        analyzer = make_analyzer(fail=True)
+        labels = dict(provider="openai", model="gpt-4", error="TimeoutError")
+        before = sample("investorlens_llm_errors_total", **labels)
+        
+        with pytest.raises(TimeoutError):
+            await analyzer._complete_openai("gpt-4", "system", "prompt", 0.3, 100)
+        
+        assert sample("investorlens_llm_errors_total", **labels) == before + 1
+    
+    @pytest.mark.asyncio
+    async def test_news_api_latency_by_status(self):
+        """Test that NewsAPI calls are timed per endpoint and status."""
+        aggregator = NewsAggregator()
+        aggregator.news_api_key = "test-key"
+        aggregator._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(429, json={}))
+        )
+        labels = dict(endpoint="/v2/everything", status="429")
+        before = sample("investorlens_news_api_request_duration_seconds_count", **labels)
+        
+        await aggregator.fetch_company_news("Acme")
+        
+        assert sample("investorlens_news_api_request_duration_seconds_count", **labels) == before + 1
+        await aggregator.aclose()
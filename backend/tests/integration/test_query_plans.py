@@ -0,0 +1,297 @@
+"""
+Query plan tests for the alert feed and metric series.
+Demonstrates: EXPLAIN-based regression tests, index coverage, Alembic migrations
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, insert, inspect, text
+
+from app.api.alerts import alert_feed_query
+from app.api.metrics import metric_series_query
+from app.core.database import Base
+from app.models import Alert, AlertSeverity, AlertType, Company, Metric
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Set to a scratch PostgreSQL database to check the production planner too
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+CURSOR = {"created_at": datetime(2026, 1, 1), "id": 500}
+
+# Every filter combination the feed UI issues, first pages and cursor pages
+HOT_QUERIES = {
+    "unresolved": {},
+    "unresolved_page": {"after": CURSOR},
+    "all": {"unresolved_only": False},
+    "all_page": {"unresolved_only": False, "after": CURSOR},
+    "unread": {"unread_only": True},
+    "unread_all": {"unread_only": True, "unresolved_only": False},
+    "severity": {"severity": AlertSeverity.CRITICAL},
+    "severity_all": {"severity": AlertSeverity.CRITICAL, "unresolved_only": False},
+    "severity_page": {"severity": AlertSeverity.CRITICAL, "after": CURSOR},
+    "alert_type": {"alert_type": AlertType.NEWS},
+    "alert_type_all": {"alert_type": AlertType.NEWS, "unresolved_only": False},
+    "severity_and_type": {"severity": AlertSeverity.HIGH, "alert_type": AlertType.RISK},
+    "company": {"company_id": 7},
+    "company_all": {"company_id": 7, "unresolved_only": False},
+    "company_page": {"company_id": 7, "after": CURSOR},
+}
+
+# Raw reads stream the index in order; bucketed reads sort only their own range
+SERIES_QUERIES = {
+    "raw": {"bucket": "raw"},
+    "day_last": {"bucket": "day", "agg": "last"},
+    "week_avg": {"bucket": "week", "agg": "avg"},
+    "month_max": {"bucket": "month", "agg": "max"},
+}
+
+
+def seed_alerts(connection, companies: int = 20, alerts: int = 2000) -> None:
+    """Insert a realistic mix of alerts and refresh planner statistics."""
+    connection.execute(insert(Company), [{"name": f"Plan Co {i}"} for i in range(companies)])
+    start = datetime(2025, 1, 1)
+    severities = list(AlertSeverity)
+    types = list(AlertType)
+    connection.execute(insert(Alert), [
+        {
+            "company_id": i % companies + 1,
+            "alert_type": types[i % len(types)],
+            "severity": severities[i % len(severities)],
+            "title": "Plan alert",
+            "description": "Synthetic",
+            # Most alerts end up read and resolved, as in production
+            "is_read": i % 5 != 0,
+            "is_resolved": i % 4 != 0,
+            "created_at": start + timedelta(minutes=i)
+        }
+        for i in range(alerts)
+    ])
+    connection.execute(text("ANALYZE"))
+
+
+def seed_metrics(connection, companies: int = 20, days: int = 400) -> None:
+    """Insert daily readings of a few metric types per company and refresh statistics."""
+    connection.execute(insert(Company), [{"name": f"Series Co {i}"} for i in range(companies)])
+    start = datetime(2025, 1, 1)
+    connection.execute(insert(Metric), [
+        {
+            "company_id": company_id,
+            "metric_type": metric_type,
+            "metric_name": metric_type,
+            "metric_value": float(day),
+            "recorded_at": start + timedelta(days=day)
+        }
+        for company_id in range(1, companies + 1)
+        for metric_type in ("revenue", "burn_rate", "employee_count")
+        for day in range(days)
+    ])
+    connection.execute(text("ANALYZE"))
+
+
+def sqlite_plan_problems(connection, statement, allow_sort: bool = False) -> list:
+    """Plan steps that read a whole table or sort the result (EXPLAIN QUERY PLAN)."""
+    # Scans of subqueries and CTEs read rows already fetched by an index search
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    steps = [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [
+        step for step in steps
+        if (step.startswith("SCAN") and "USING" not in step and step.split()[1] in Base.metadata.tables)
+        or ("TEMP B-TREE" in step and not allow_sort)
+    ]
+
+
+def postgres_plan_problems(connection, statement, allow_sort: bool = False) -> list:
+    """Plan nodes that are sequential scans or sorts (EXPLAIN FORMAT JSON)."""
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    
+    problems = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan" or (node["Node Type"] == "Sort" and not allow_sort):
+            problems.append(f"{node['Node Type']} on {node.get('Relation Name', '?')}")
+        nodes.extend(node.get("Plans", []))
+    return problems
+
+
+def alembic_config(connection) -> Config:
+    """Alembic configuration that migrates over `connection`."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+
+class TestAlertFeedQueryPlans:
+    """Every hot alert feed query must be an index range read, never a scan."""
+    
+    @pytest.fixture
+    def sqlite_connection(self, tmp_path):
+        """Seeded SQLite database built from the models."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            seed_alerts(connection)
+            yield connection
+        engine.dispose()
+    
+    @pytest.mark.parametrize("filters", HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+    def test_sqlite_plan_uses_feed_indexes(self, sqlite_connection, filters):
+        """No full table scan and no sort step for any feed filter."""
+        statement = alert_feed_query(**filters).limit(51)
+        
+        assert sqlite_plan_problems(sqlite_connection, statement) == []
+    
+    @pytest.fixture
+    def postgres_connection(self):
+        """Seeded PostgreSQL database, rolled back and downgraded afterwards."""
+        # Migrated rather than create_all, so the production DDL is what gets planned
+        engine = create_engine(POSTGRES_URL)
+        with engine.connect() as connection:
+            config = alembic_config(connection)
+            command.upgrade(config, "head")
+            try:
+                with connection.begin() as transaction:
+                    seed_alerts(connection)
+                    # A small table is cheapest to scan; ask whether an index path exists at all
+                    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                    yield connection
+                    transaction.rollback()
+            finally:
+                command.downgrade(config, "base")
+        engine.dispose()
+    
+    @pytest.mark.skipif(POSTGRES_URL is None, reason="TEST_POSTGRES_URL not set")
+    @pytest.mark.parametrize("filters", HOT_QUERIES.values(), ids=HOT_QUERIES.keys())
+    def test_postgres_plan_uses_feed_indexes(self, postgres_connection, filters):
+        """Same check against PostgreSQL, with the partial indexes from the migrations."""
+        statement = alert_feed_query(**filters).limit(51)
+        
+        assert postgres_plan_problems(postgres_connection, statement) == []
+    
+    def test_check_flags_missing_index(self, sqlite_connection):
+        """Sanity check: without the feed indexes the same query is flagged."""
+        for index in Alert.__table__.indexes:
+            if index.name.endswith("_feed"):
+                index.drop(bind=sqlite_connection)
+        
+        statement = alert_feed_query(severity=AlertSeverity.CRITICAL).limit(51)
+        
+        assert sqlite_plan_problems(sqlite_connection, statement) != []
+
+
+class TestMetricSeriesQueryPlans:
+    """Every metric series read must be one range of ix_metrics_series."""
+    
+    WINDOW = (datetime(2025, 3, 1), datetime(2025, 9, 1))
+    
+    @pytest.fixture
+    def sqlite_connection(self, tmp_path):
+        """Seeded SQLite database built from the models."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'series.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            seed_metrics(connection)
+            yield connection
+        engine.dispose()
+    
+    @pytest.mark.parametrize("options", SERIES_QUERIES.values(), ids=SERIES_QUERIES.keys())
+    def test_sqlite_plan_uses_series_index(self, sqlite_connection, options):
+        """No table scan; only bucketed reads may sort (their own window of rows)."""
+        statement = metric_series_query(7, "revenue", *self.WINDOW, **options).limit(501)
+        steps = [row[3] for row in sqlite_connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + str(statement.compile(
+                dialect=sqlite_connection.dialect, compile_kwargs={"literal_binds": True}
+            ))
+        )]
+        
+        assert sqlite_plan_problems(sqlite_connection, statement, allow_sort=options["bucket"] != "raw") == []
+        assert any("USING INDEX ix_metrics_series" in step for step in steps)
+    
+    @pytest.fixture
+    def postgres_connection(self):
+        """Seeded PostgreSQL database, rolled back and downgraded afterwards."""
+        engine = create_engine(POSTGRES_URL)
+        with engine.connect() as connection:
+            config = alembic_config(connection)
+            command.upgrade(config, "head")
+            try:
+                with connection.begin() as transaction:
+                    seed_metrics(connection)
+                    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                    yield connection
+                    transaction.rollback()
+            finally:
+                command.downgrade(config, "base")
+        engine.dispose()
+    
+    @pytest.mark.skipif(POSTGRES_URL is None, reason="TEST_POSTGRES_URL not set")
+    @pytest.mark.parametrize("options", SERIES_QUERIES.values(), ids=SERIES_QUERIES.keys())
+    def test_postgres_plan_uses_series_index(self, postgres_connection, options):
+        """Same check against PostgreSQL, with the covering index from the migrations."""
+        statement = metric_series_query(7, "revenue", *self.WINDOW, **options).limit(501)
+        
+        assert postgres_plan_problems(postgres_connection, statement, allow_sort=options["bucket"] != "raw") == []
+
+
+class TestMigrations:
+    """The Alembic history must produce the schema the models declare."""
+    
+    def test_upgrade_head_matches_models(self, tmp_path):
+        """Migrating an empty database yields every model index, partial ones included."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+        with engine.connect() as connection:
+            command.upgrade(alembic_config(connection), "head")
+            migrated = {index["name"]: index for index in inspect(connection).get_indexes("alerts")}
+            metric_indexes = {index["name"] for index in inspect(connection).get_indexes("metrics")}
+            drift = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        engine.dispose()
+        
+        assert drift == []
+        assert set(migrated) == {index.name for index in Alert.__table__.indexes}
+        assert migrated["ix_alerts_unresolved_feed"]["column_names"] == ["created_at", "id"]
+        assert "ix_alerts_created_at" not in migrated
+        assert set(metric_indexes) == {index.name for index in Metric.__table__.indexes}
+    
+    def test_adopts_database_created_by_init_db(self, tmp_path):
+        """A pre-migration database (create_all, old indexes) is upgraded in place."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            for index in Alert.__table__.indexes:
+                if index.name.endswith("_feed"):
+                    index.drop(bind=connection)
+            connection.exec_driver_sql("CREATE INDEX ix_alerts_created_at ON alerts (created_at)")
+        
+        with engine.connect() as connection:
+            command.upgrade(alembic_config(connection), "head")
+            indexes = {index["name"] for index in inspect(connection).get_indexes("alerts")}
+        engine.dispose()
+        
+        assert "ix_alerts_unresolved_feed" in indexes
+        assert "ix_alerts_created_at" not in indexes
+    
+    def test_adopted_database_gets_the_later_tables(self, tmp_path):
+        """A database from before the series tables existed gets every one of them."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+        Base.metadata.create_all(bind=engine, tables=[Company.__table__, Alert.__table__, Metric.__table__])
+        
+        with engine.connect() as connection:
+            command.upgrade(alembic_config(connection), "head")
+            tables = set(inspect(connection).get_table_names())
+            drift = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        engine.dispose()
+        
+        assert {"alert_counters", "batch_jobs", "executive_summaries", "news_articles"} <= tables
+        assert drift == []
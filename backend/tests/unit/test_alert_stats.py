@@ -0,0 +1,114 @@
+"""
+Unit tests for alert statistics and the materialized counters.
+Demonstrates: Testing denormalized data against a source of truth
+"""
+
+import random
+
+from sqlalchemy import update
+
+from app.models import Alert, AlertCounter, AlertSeverity, AlertType, Company
+from app.services.alerting import AlertStatsService
+
+
+def count_per_query(db_session) -> dict:
+    """The original one-COUNT-per-number implementation, as the reference."""
+    unresolved = db_session.query(Alert).filter(Alert.is_resolved == False)
+    by_severity = {
+        severity.value: unresolved.filter(Alert.severity == severity).count()
+        for severity in (AlertSeverity.CRITICAL, AlertSeverity.HIGH, AlertSeverity.MEDIUM, AlertSeverity.LOW)
+    }
+    return {
+        "total_unresolved": unresolved.count(),
+        "critical": by_severity["critical"],
+        "high": by_severity["high"],
+        "unread": db_session.query(Alert).filter(Alert.is_read == False).count(),
+        "by_severity": by_severity
+    }
+
+
+def make_company(db_session):
+    company = Company(name="Acme")
+    db_session.add(company)
+    db_session.commit()
+    return company
+
+
+def add_alert(db_session, company, severity):
+    alert = Alert(company_id=company.id, alert_type=AlertType.RISK, severity=severity,
+                  title="Alert", description="Details")
+    db_session.add(alert)
+    db_session.commit()
+    return alert
+
+
+class TestAlertCounters:
+    """Test cases for incremental counter maintenance."""
+    
+    def test_create_read_resolve_delete(self, db_session):
+        """Test that every alert transition moves exactly one count."""
+        company = make_company(db_session)
+        service = AlertStatsService()
+        alert = add_alert(db_session, company, AlertSeverity.CRITICAL)
+        add_alert(db_session, company, AlertSeverity.LOW)
+        
+        stats = service.from_counters(db_session)
+        assert stats["critical"] == 1
+        assert stats["total_unresolved"] == 2
+        assert stats["unread"] == 2
+        
+        alert.is_read = True
+        db_session.commit()
+        assert service.from_counters(db_session)["unread"] == 1
+        
+        alert.is_resolved = True
+        db_session.commit()
+        stats = service.from_counters(db_session)
+        assert stats["critical"] == 0
+        assert stats["total_unresolved"] == 1
+        
+        db_session.delete(alert)
+        db_session.commit()
+        assert service.from_counters(db_session) == count_per_query(db_session)
+    
+    def test_severity_change_moves_count(self, db_session):
+        """Test that re-grading an alert moves it between severities."""
+        company = make_company(db_session)
+        alert = add_alert(db_session, company, AlertSeverity.MEDIUM)
+        
+        alert.severity = AlertSeverity.HIGH
+        db_session.commit()
+        
+        stats = AlertStatsService().from_counters(db_session)
+        assert stats["by_severity"]["medium"] == 0
+        assert stats["high"] == 1
+    
+    def test_all_sources_agree_after_random_changes(self, db_session):
+        """Test counters and the grouped aggregate against per-severity COUNTs."""
+        rng = random.Random(7)
+        company = make_company(db_session)
+        alerts = [add_alert(db_session, company, rng.choice(list(AlertSeverity))) for _ in range(40)]
+        for alert in rng.sample(alerts, 25):
+            alert.is_read = rng.random() < 0.7
+            alert.is_resolved = rng.random() < 0.4
+        db_session.commit()
+        
+        service = AlertStatsService()
+        expected = count_per_query(db_session)
+        assert service.aggregate(db_session) == expected
+        assert service.from_counters(db_session) == expected
+    
+    def test_rebuild_repairs_bulk_update_drift(self, db_session):
+        """Test that a bulk UPDATE (which skips mapper events) is fixed by rebuild."""
+        company = make_company(db_session)
+        for _ in range(3):
+            add_alert(db_session, company, AlertSeverity.HIGH)
+        db_session.execute(update(Alert).values(is_resolved=True))
+        db_session.commit()
+        
+        service = AlertStatsService()
+        assert service.from_counters(db_session)["high"] == 3
+        
+        assert service.rebuild(db_session) == 16
+        assert service.from_counters(db_session)["high"] == 0
+        assert db_session.query(AlertCounter).count() == 16
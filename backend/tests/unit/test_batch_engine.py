@@ -0,0 +1,110 @@
+"""
+Unit tests for the portfolio batch engine.
+Demonstrates: Async testing, concurrency limits, fakes for external services
+"""
+
+import asyncio
+import pytest
+
+from app.models import Company, BatchJob, BatchJobStatus
+from app.services.ai_engine.batch_engine import PortfolioBatchEngine
+from tests.conftest import TestingSessionLocal
+
+
+class FakeAnalyzer:
+    """Records how many calls are in flight at once."""
+    
+    def __init__(self, fail_for=None):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_for = fail_for
+    
+    async def _track(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+    
+    async def generate_executive_summary(self, company_data, metrics, news):
+        await self._track()
+        if company_data['name'] == self.fail_for:
+            raise RuntimeError("provider unavailable")
+        return {"summary": f"Summary for {company_data['name']}", "model_used": "fake"}
+    
+    async def assess_risk_score(self, company_data, metrics, alerts):
+        await self._track()
+        return {"risk_score": 70, "model_used": "fake"}
+
+
+class FakeNews:
+    async def refresh_if_idle(self, db, company=None, industry=None):
+        pass
+    
+    def company_news(self, db, company, days_back=7, limit=10):
+        return [{"title": f"{company.name} news"}]
+
+
+def make_engine(db_session, companies=5, **kwargs):
+    for i in range(companies):
+        db_session.add(Company(name=f"Company {i}", runway_months=12))
+    db_session.commit()
+    
+    engine = PortfolioBatchEngine(session_factory=TestingSessionLocal, **kwargs)
+    engine.news = FakeNews()
+    return engine
+
+
+class TestPortfolioBatchEngine:
+    """Test cases for batch analysis runs."""
+    
+    @pytest.mark.asyncio
+    async def test_run_job_analyzes_every_company(self, db_session):
+        """Test that a job completes and persists results and risk scores."""
+        engine = make_engine(db_session)
+        engine.analyzer = FakeAnalyzer()
+        ids = [c.id for c in db_session.query(Company).all()]
+        
+        job = engine.create_job(db_session, ids)
+        await engine.run_job(job.id)
+        
+        db_session.expire_all()
+        job = db_session.get(BatchJob, job.id)
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.completed_count == 5
+        assert job.failed_count == 0
+        assert set(job.results) == {str(i) for i in ids}
+        assert all(c.risk_score == 70 for c in db_session.query(Company).all())
+    
+    @pytest.mark.asyncio
+    async def test_provider_concurrency_is_bounded(self, db_session):
+        """Test that per-provider limits cap in-flight calls."""
+        engine = make_engine(
+            db_session,
+            companies=10,
+            max_concurrency=10,
+            provider_limits={"openai": 2, "anthropic": 2}
+        )
+        engine.analyzer = FakeAnalyzer()
+        ids = [c.id for c in db_session.query(Company).all()]
+        
+        job = engine.create_job(db_session, ids)
+        await engine.run_job(job.id)
+        
+        # One summary and one risk call may overlap per provider slot
+        assert engine.analyzer.max_in_flight <= 4
+    
+    @pytest.mark.asyncio
+    async def test_company_failure_does_not_fail_job(self, db_session):
+        """Test that one failing company is recorded without aborting the run."""
+        engine = make_engine(db_session, companies=3)
+        engine.analyzer = FakeAnalyzer(fail_for="Company 1")
+        ids = [c.id for c in db_session.query(Company).all()]
+        
+        job = engine.create_job(db_session, ids)
+        await engine.run_job(job.id)
+        
+        db_session.expire_all()
+        job = db_session.get(BatchJob, job.id)
+        assert job.status == BatchJobStatus.COMPLETED
+        assert job.completed_count == 2
+        assert job.failed_count == 1
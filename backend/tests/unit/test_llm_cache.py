@@ -0,0 +1,160 @@
+"""
+Unit tests for the LLM response cache.
+Demonstrates: Async testing, LRU/TTL behavior, fake API clients
+"""
+
+import pytest
+from types import SimpleNamespace
+
+from app.core.cache import CacheBackend, InMemoryCache
+from app.services.ai_engine.llm_analyzer import LLMAnalyzer
+from app.services.ai_engine.response_cache import LLMResponseCache
+
+
+class FakeCompletions:
+    """Stands in for openai.chat.completions and counts requests."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f"completion #{self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_analyzer():
+    analyzer = LLMAnalyzer()
+    completions = FakeCompletions()
+    analyzer.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=16), ttl=60)
+    return analyzer, completions
+
+
+class TestInMemoryCache:
+    """Test cases for the in-process backend."""
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = InMemoryCache(max_entries=2)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+        
+        assert await cache.get("a") == "1"
+        assert await cache.get("b") is None
+        assert cache.evictions == 1
+    
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, monkeypatch):
+        """Test that entries expire after their TTL."""
+        now = [1000.0]
+        monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+        cache = InMemoryCache(max_entries=2, default_ttl=10)
+        await cache.set("a", "1")
+        
+        now[0] += 11
+        assert await cache.get("a") is None
+    
+    def test_incomplete_backend_cannot_be_created(self):
+        """Test that a backend missing part of the interface fails when instantiated."""
+        class GetOnly(CacheBackend):
+            async def get(self, key):
+                return None
+        
+        with pytest.raises(TypeError):
+            GetOnly()
+
+
+class TestLLMResponseCache:
+    """Test cases for LLMAnalyzer response caching."""
+    
+    @pytest.mark.asyncio
+    async def test_identical_prompt_served_from_cache(self):
+        """Test that a repeated summary request does not call the provider."""
+        analyzer, completions = make_analyzer()
+        company = {"name": "Acme", "industry": "SaaS", "stage": "Seed"}
+        
+        first = await analyzer.generate_executive_summary(company, [], [])
+        second = await analyzer.generate_executive_summary(company, [], [])
+        
+        assert completions.calls == 1
+        assert first["summary"] == second["summary"]
+        assert analyzer.cache_stats()["hits"] == 1
+        assert analyzer.cache_stats()["misses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_different_prompt_misses(self):
+        """Test that any prompt change produces a new request."""
+        analyzer, completions = make_analyzer()
+        
+        await analyzer.generate_executive_summary({"name": "Acme"}, [], [])
+        await analyzer.generate_executive_summary({"name": "Globex"}, [], [])
+        
+        assert completions.calls == 2
+    
+    def test_key_covers_temperature(self):
+        """Test that temperature is part of the content address."""
+        key_a = LLMResponseCache.make_key("gpt-4", "sys", "prompt", 0.3)
+        key_b = LLMResponseCache.make_key("gpt-4", "sys", "prompt", 0.4)
+        
+        assert key_a != key_b
+
+
+class FakeStreamingCompletions:
+    """Stands in for a streaming openai.chat.completions."""
+    
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        assert kwargs["stream"] is True
+        
+        async def stream():
+            for i, text in enumerate(self.chunks):
+                if self.fail_after is not None and i == self.fail_after:
+                    raise RuntimeError("connection reset")
+                delta = SimpleNamespace(content=text)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        return stream()
+
+
+class TestSummaryStreaming:
+    """Test cases for streamed executive summaries."""
+    
+    def make_streaming_analyzer(self, **kwargs):
+        analyzer = LLMAnalyzer()
+        completions = FakeStreamingCompletions(["Acme ", "is ", "growing."], **kwargs)
+        analyzer.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=16), ttl=60)
+        return analyzer, completions
+    
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens_then_done(self):
+        """Test that tokens are forwarded and the full text is cached."""
+        analyzer, completions = self.make_streaming_analyzer()
+        
+        events = [e async for e in analyzer.stream_executive_summary({"name": "Acme"}, [], [])]
+        
+        assert [e["text"] for e in events if e["type"] == "token"] == ["Acme ", "is ", "growing."]
+        assert events[-1] == {"type": "done", "summary": "Acme is growing.", "model_used": "gpt-4"}
+        
+        replay = [e async for e in analyzer.stream_executive_summary({"name": "Acme"}, [], [])]
+        assert completions.calls == 1
+        assert replay[-1]["summary"] == "Acme is growing."
+    
+    @pytest.mark.asyncio
+    async def test_stream_interrupted_reports_error(self):
+        """Test that a mid-stream failure is reported and not cached."""
+        analyzer, completions = self.make_streaming_analyzer(fail_after=2)
+        
+        events = [e async for e in analyzer.stream_executive_summary({"name": "Acme"}, [], [])]
+        
+        assert events[-1]["type"] == "error"
+        assert events[-1]["partial"] == "Acme is "
+        assert analyzer.cache_stats()["entries"] == 0
@@ -0,0 +1,206 @@
+"""
+Unit tests for the columnar metrics cache and portfolio benchmarks.
+Demonstrates: Testing cache freshness, memory bounds and vectorized reductions
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.models import Company, Metric
+from app.services.analytics import MetricColumns, MetricColumnStore, PortfolioBenchmarks, metric_store
+from tests.conftest import AsyncTestingSessionLocal
+
+NOW = datetime.utcnow()
+
+
+def add_series(db_session, company, metric_type, points):
+    """Add (days_ago, value) readings for one company."""
+    for days_ago, value in points:
+        db_session.add(Metric(company_id=company.id, metric_type=metric_type, metric_name=metric_type,
+                              metric_value=value, recorded_at=NOW - timedelta(days=days_ago)))
+    db_session.commit()
+
+
+@pytest.fixture
+def companies(db_session):
+    """Two companies with revenue series, committed."""
+    a, b = Company(name="A", stage="Seed"), Company(name="B", stage="Seed")
+    db_session.add_all([a, b])
+    db_session.commit()
+    add_series(db_session, a, "revenue", [(300, 100), (200, 120), (10, 150)])
+    add_series(db_session, b, "revenue", [(100, 200), (5, 180)])
+    return a, b
+
+
+class TestMetricColumns:
+    """Test cases for the CSR layout and window reductions."""
+    
+    def test_rows_are_grouped_by_company_in_time_order(self):
+        """Test offsets and ordering from unsorted input."""
+        t = lambda day: datetime(2025, 1, day)
+        columns = MetricColumns.from_rows([(2, t(3), 3.0), (1, t(2), 2.0), (2, t(1), 1.0), (1, t(1), 0.5)])
+        
+        assert columns.companies.tolist() == [1, 2]
+        assert columns.offsets.tolist() == [0, 2, 4]
+        assert columns.values.tolist() == [0.5, 2.0, 1.0, 3.0]
+    
+    def test_window_finds_first_reading_and_count(self):
+        """Test the per-company window bounds."""
+        t = lambda day: datetime(2025, 1, day)
+        columns = MetricColumns.from_rows([(1, t(1), 1.0), (1, t(5), 2.0), (1, t(9), 3.0), (2, t(2), 4.0)])
+        
+        first, count = columns.window(t(4))
+        
+        assert first.tolist() == [1, 4]
+        assert count.tolist() == [2, 0]
+    
+    def test_window_over_a_large_portfolio_is_fast(self):
+        """Test that a million readings reduce in well under a second."""
+        rng = np.random.default_rng(0)
+        n = 1_000_000
+        columns = MetricColumns(
+            rng.integers(1, 5_000, n),
+            np.datetime64("2024-01-01") + rng.integers(0, 730 * 86400, n).astype("timedelta64[s]"),
+            rng.uniform(0, 1e6, n)
+        )
+        
+        start = time.perf_counter()
+        columns.window(datetime(2025, 1, 1))
+        assert time.perf_counter() - start < 0.5
+
+
+class TestMetricColumnStore:
+    """Test cases for loading, refreshing and bounding the cache."""
+    
+    def test_growth_matches_series(self, db_session, companies):
+        """Test first-to-last growth within the window."""
+        a, b = companies
+        store = MetricColumnStore()
+        
+        growth = store.growth(db_session, "revenue", [a.id, b.id, 999], NOW - timedelta(days=250))
+        
+        assert growth[0] == pytest.approx(0.25)
+        assert growth[1] == pytest.approx(-0.1)
+        assert np.isnan(growth[2])
+    
+    def test_growth_when_the_last_company_has_no_readings_in_the_window(self, db_session, companies):
+        """Test that the highest-ID company with only old readings gets NaN rather than an IndexError."""
+        a, b = companies
+        store = MetricColumnStore()
+        
+        growth = store.growth(db_session, "revenue", [a.id, b.id], NOW - timedelta(days=3))
+        
+        assert np.isnan(growth).all()
+    
+    def test_new_rows_are_appended_incrementally(self, db_session, companies):
+        """Test that inserts, backfilled ones included, appear without a reload."""
+        a, _ = companies
+        store = MetricColumnStore()
+        store.latest(db_session, "revenue", [a.id])
+        
+        add_series(db_session, a, "revenue", [(1, 170), (400, 90)])
+        
+        assert store.latest(db_session, "revenue", [a.id])[0] == 170
+        assert store.growth(db_session, "revenue", [a.id], NOW - timedelta(days=500))[0] == pytest.approx(170 / 90 - 1)
+        assert store.loads == 1
+        assert store.refreshes == 1
+    
+    def test_late_commit_below_the_high_water_mark_is_picked_up(self, db_session, companies):
+        """Test that an insert with a lower ID committing after a higher one is not skipped."""
+        a, _ = companies
+        store = MetricColumnStore(id_margin=100)
+        db_session.add(Metric(id=60, company_id=a.id, metric_type="revenue", metric_name="revenue",
+                              metric_value=160, recorded_at=NOW - timedelta(days=2)))
+        db_session.commit()
+        store.latest(db_session, "revenue", [a.id])
+        
+        # ID 50 was assigned before 60 but its transaction committed later
+        db_session.add(Metric(id=50, company_id=a.id, metric_type="revenue", metric_name="revenue",
+                              metric_value=175, recorded_at=NOW - timedelta(days=1)))
+        db_session.commit()
+        
+        assert store.latest(db_session, "revenue", [a.id])[0] == 175
+        assert len(store.columns(db_session, "revenue")) == 7
+        assert store.loads == 1
+    
+    def test_concurrent_async_reads_do_not_block_the_event_loop(self, db_session, companies):
+        """Test that two run_sync reads in flight together both complete."""
+        a, _ = companies
+        store = MetricColumnStore()
+        results = []
+        
+        async def read():
+            async with AsyncTestingSessionLocal() as session:
+                return await session.run_sync(lambda s: store.latest(s, "revenue", [a.id])[0])
+        
+        async def main():
+            results.extend(await asyncio.wait_for(asyncio.gather(read(), read()), timeout=5))
+        
+        # A blocked loop cannot time itself out, so watch it from another thread
+        runner = threading.Thread(target=asyncio.run, args=(main(),), daemon=True)
+        runner.start()
+        runner.join(timeout=10)
+        
+        assert not runner.is_alive()
+        assert results == [150, 150]
+    
+    def test_orm_delete_invalidates(self, db_session, companies):
+        """Test that deleting a reading through the ORM drops the cached columns."""
+        a, _ = companies
+        metric_store.latest(db_session, "revenue", [a.id])
+        loads = metric_store.loads
+        
+        newest = db_session.query(Metric).filter_by(company_id=a.id).order_by(Metric.recorded_at.desc()).first()
+        db_session.delete(newest)
+        db_session.commit()
+        
+        assert metric_store.latest(db_session, "revenue", [a.id])[0] == 120
+        assert metric_store.loads == loads + 1
+    
+    def test_least_recently_used_types_are_evicted(self, db_session, companies):
+        """Test that the cache stays within its byte budget."""
+        a, _ = companies
+        add_series(db_session, a, "burn_rate", [(10, 50)])
+        store = MetricColumnStore(max_bytes=150)
+        
+        store.latest(db_session, "revenue", [a.id])
+        store.latest(db_session, "burn_rate", [a.id])
+        
+        assert store.stats()["metric_types"] == ["burn_rate"]
+        assert store.nbytes <= 150
+        assert store.evictions == 1
+
+
+class TestPortfolioBenchmarks:
+    """Test cases for group-by benchmarks."""
+    
+    def test_median_burn_multiple_by_stage(self, db_session):
+        """Test burn multiple from the revenue growth and burn series."""
+        grower = Company(name="Grower", stage="Series A", current_arr=2_000_000, monthly_burn_rate=999)
+        shrinker = Company(name="Shrinker", stage="Series A", current_arr=1_000_000, monthly_burn_rate=50_000)
+        seed = Company(name="Seedling", stage="Seed", current_arr=100_000)
+        db_session.add_all([grower, shrinker, seed])
+        db_session.commit()
+        # ARR doubled over the window: 1M added, 100k/month burned for 365 days
+        add_series(db_session, grower, "revenue", [(300, 100), (10, 200)])
+        add_series(db_session, grower, "burn_rate", [(300, 50_000), (10, 150_000)])
+        add_series(db_session, shrinker, "revenue", [(300, 100), (10, 90)])
+        
+        groups = {g["stage"]: g for g in PortfolioBenchmarks(MetricColumnStore()).by_group(db_session, "stage", 365)}
+        
+        series_a = groups["Series A"]
+        assert series_a["companies"] == 2
+        assert series_a["total_arr"] == 3_000_000
+        assert series_a["median_burn_multiple"] == pytest.approx(100_000 * 365 / 30 / 1_000_000, rel=1e-3)
+        assert series_a["median_monthly_burn"] == pytest.approx(75_000)
+        assert groups["Seed"]["median_burn_multiple"] is None
+    
+    def test_unknown_grouping_is_rejected(self, db_session):
+        """Test that only stage and industry are accepted."""
+        with pytest.raises(ValueError):
+            PortfolioBenchmarks(MetricColumnStore()).by_group(db_session, "ceo_name")
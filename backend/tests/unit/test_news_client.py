@@ -0,0 +1,67 @@
+"""
+Unit tests for the pooled news HTTP client.
+Demonstrates: Connection reuse, lifecycle management, mocked transports
+"""
+
+import asyncio
+import httpx
+import pytest
+
+from app.services.data_aggregator.news_scraper import NewsAggregator
+
+
+def make_aggregator(handler):
+    aggregator = NewsAggregator()
+    aggregator.news_api_key = "test-key"
+    aggregator._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return aggregator
+
+
+class TestPooledNewsClient:
+    """Test cases for NewsAggregator connection handling."""
+    
+    @pytest.mark.asyncio
+    async def test_client_is_reused_across_calls(self):
+        """Test that successive fetches share one client."""
+        def handler(request):
+            return httpx.Response(200, json={"articles": [{"title": "Acme wins award", "url": "https://x/1"}]})
+        
+        aggregator = make_aggregator(handler)
+        client = aggregator._get_client()
+        
+        await aggregator.fetch_company_news("Acme")
+        await aggregator.fetch_industry_news("fintech")
+        
+        assert aggregator._get_client() is client
+        await aggregator.aclose()
+        assert aggregator._client is None
+    
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_cap(self, monkeypatch):
+        """Test that in-flight requests to one host are capped."""
+        monkeypatch.setattr("app.core.config.settings.NEWS_HTTP_PER_HOST_CONCURRENCY", 2)
+        state = {"in_flight": 0, "max": 0}
+        
+        async def handler(request):
+            state["in_flight"] += 1
+            state["max"] = max(state["max"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            return httpx.Response(200, json={"articles": []})
+        
+        aggregator = make_aggregator(handler)
+        await asyncio.gather(*(aggregator.fetch_company_news(f"Co {i}") for i in range(6)))
+        
+        assert state["max"] == 2
+        await aggregator.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_client_recreated_after_close(self):
+        """Test lazy re-creation for use outside the app lifecycle."""
+        aggregator = NewsAggregator()
+        await aggregator.startup()
+        await aggregator.aclose()
+        
+        client = aggregator._get_client()
+        assert not client.is_closed
+        await aggregator.aclose()
@@ -0,0 +1,202 @@
+"""
+Unit tests for the background news ingestion scheduler.
+Demonstrates: Deterministic scheduling with fake clocks, rate budgets
+"""
+
+import asyncio
+import random
+import pytest
+
+from app.models import Company
+from app.services.data_aggregator.ingestion import NewsIngestionScheduler, RateBudget
+from tests.conftest import TestingSessionLocal
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeAggregator:
+    news_api_key = "test-key"
+    
+    def __init__(self):
+        self.company_calls = []
+        self.industry_calls = []
+    
+    async def fetch_company_articles(self, company_name, since, page_size=50):
+        self.company_calls.append(company_name)
+        return []
+    
+    async def fetch_industry_news(self, industry, limit=5):
+        self.industry_calls.append(industry)
+        return [{"title": f"{industry} roundup"}]
+
+
+class FakeRepository:
+    def __init__(self):
+        self.aggregator = FakeAggregator()
+        self.refreshed = []
+        self.forced = []
+        self.async_refreshed = []
+    
+    async def refresh_company(self, db, company, force=False):
+        self.refreshed.append(company.name)
+        self.forced.append(force)
+        return 0
+    
+    async def refresh_company_async(self, db, company, force=False):
+        self.async_refreshed.append(company.name)
+        return 0
+    
+    def recent_articles(self, db, company_id, days_back=7, limit=50):
+        return []
+
+
+def as_running(scheduler):
+    """Mark the loop as running; tests drive its ticks with run_pending()."""
+    scheduler._task = asyncio.get_running_loop().create_future()
+    return scheduler
+
+
+def make_scheduler(clock, rate_per_minute=6000):
+    return NewsIngestionScheduler(
+        session_factory=TestingSessionLocal,
+        repository=FakeRepository(),
+        base_interval=3600,
+        jitter=0.1,
+        rate_per_minute=rate_per_minute,
+        clock=clock,
+        rng=random.Random(7)
+    )
+
+
+class TestNewsIngestionScheduler:
+    """Test cases for NewsIngestionScheduler."""
+    
+    @pytest.mark.asyncio
+    async def test_riskier_companies_refresh_more_often(self, db_session):
+        """Test that refresh frequency follows risk score."""
+        db_session.add_all([
+            Company(name="Risky", risk_score=90, industry="FinTech"),
+            Company(name="Safe", risk_score=10, industry="FinTech"),
+        ])
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        
+        for _ in range(8 * 60):  # Eight simulated hours, one tick per minute
+            await scheduler.run_pending()
+            clock.now += 60
+        
+        refreshed = scheduler.repository.refreshed
+        assert refreshed.count("Risky") >= 3 * refreshed.count("Safe")
+        assert refreshed.count("Safe") >= 7
+    
+    @pytest.mark.asyncio
+    async def test_inactive_companies_are_dropped(self, db_session):
+        """Test that deactivated companies leave the schedule."""
+        company = Company(name="Gone", is_active=False)
+        db_session.add(company)
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        scheduler.sync_targets(db_session)
+        
+        clock.now += 7200
+        await scheduler.run_pending()
+        
+        assert scheduler.repository.refreshed == []
+    
+    @pytest.mark.asyncio
+    async def test_empty_read_bumps_priority(self, db_session):
+        """Test that reading a company with no stored news schedules it immediately."""
+        company = Company(name="Fresh", risk_score=10)
+        db_session.add(company)
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = as_running(make_scheduler(clock))
+        scheduler.sync_targets(db_session)
+        
+        assert scheduler.company_news(db_session, company) == []
+        await scheduler.run_pending()
+        
+        assert scheduler.repository.refreshed == ["Fresh"]
+    
+    @pytest.mark.asyncio
+    async def test_repeated_empty_reads_do_not_refetch(self, db_session):
+        """Test that reads bump a company once per refresh interval, not once per read."""
+        company = Company(name="Quiet", risk_score=10)
+        db_session.add(company)
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = as_running(make_scheduler(clock))
+        scheduler.sync_targets(db_session)
+        
+        for _ in range(5):
+            scheduler.company_news(db_session, company)
+        queued = len(scheduler._queue)
+        await scheduler.run_pending()
+        for _ in range(5):
+            clock.now += 10
+            scheduler.company_news(db_session, company)
+            await scheduler.run_pending()
+        
+        assert queued == 2  # The sync entry plus a single bump
+        assert scheduler.repository.refreshed == ["Quiet"]
+    
+    @pytest.mark.asyncio
+    async def test_reads_without_the_loop_refresh_directly(self, db_session, async_db_session):
+        """Test that, with ingestion disabled, reads use the throttled fetch instead of queueing."""
+        company = Company(name="Solo", industry="Robotics")
+        db_session.add(company)
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        
+        await scheduler.refresh_if_idle(async_db_session, company, industry="Robotics")
+        await scheduler.refresh_if_idle(async_db_session, industry="Robotics")
+        await scheduler.refresh_if_idle(db_session, company)
+        
+        assert scheduler.company_news(db_session, company) == []
+        assert scheduler._queue == []
+        # Request handlers go through their AsyncSession, the batch engine its own Session
+        assert scheduler.repository.async_refreshed == ["Solo"]
+        assert scheduler.repository.refreshed == ["Solo"]
+        assert scheduler.repository.forced == [False]
+        assert scheduler.repository.aggregator.industry_calls == ["Robotics"]
+        assert scheduler.industry_news("Robotics") == [{"title": "Robotics roundup"}]
+    
+    @pytest.mark.asyncio
+    async def test_industry_news_served_from_memory(self, db_session):
+        """Test that industry news is ingested once and then read locally."""
+        db_session.add(Company(name="Acme", industry="Robotics"))
+        db_session.commit()
+        clock = FakeClock()
+        scheduler = make_scheduler(clock)
+        scheduler.sync_targets(db_session)
+        
+        clock.now += 3600
+        await scheduler.run_pending()
+        
+        assert scheduler.industry_news("Robotics") == [{"title": "Robotics roundup"}]
+        assert scheduler.repository.aggregator.industry_calls == ["Robotics"]
+
+
+class TestRateBudget:
+    """Test cases for the global request budget."""
+    
+    def test_budget_caps_burst_and_refills(self):
+        """Test that tokens run out and come back at the configured rate."""
+        clock = FakeClock()
+        budget = RateBudget(rate_per_minute=60, burst=2, clock=clock)
+        
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+        
+        clock.now += 1.0
+        assert budget.try_acquire()
@@ -0,0 +1,114 @@
+"""
+Unit tests for the persistent news article store.
+Demonstrates: Repository testing, deduplication, incremental sync
+"""
+
+from datetime import datetime, timedelta
+import pytest
+
+from app.models import Company, NewsArticle
+from app.services.data_aggregator.news_store import NewsRepository
+
+
+class FakeAggregator:
+    """Returns canned articles and records the `since` it was asked for."""
+    
+    news_api_key = "test-key"
+    
+    def __init__(self, articles):
+        self.articles = articles
+        self.calls = []
+    
+    async def fetch_company_articles(self, company_name, since, page_size=50):
+        self.calls.append(since)
+        return [a for a in self.articles if datetime.fromisoformat(a['published_at']) >= since]
+
+
+def article(n, days_ago):
+    return {
+        'title': f'Article {n}',
+        'url': f'https://news.example.com/{n}',
+        'source': 'Example',
+        'published_at': (datetime.utcnow() - timedelta(days=days_ago)).replace(microsecond=0).isoformat(),
+        'sentiment': 'neutral'
+    }
+
+
+@pytest.fixture
+def company(db_session):
+    company = Company(name="Acme")
+    db_session.add(company)
+    db_session.commit()
+    return company
+
+
+class TestNewsRepository:
+    """Test cases for NewsRepository."""
+    
+    @pytest.mark.asyncio
+    async def test_refresh_deduplicates_by_url(self, db_session, company):
+        """Test that re-fetched articles are stored once."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([article(1, 3), article(2, 2)])
+        
+        assert await repository.refresh_company(db_session, company) == 2
+        assert await repository.refresh_company(db_session, company, force=True) == 0
+        assert db_session.query(NewsArticle).count() == 2
+    
+    @pytest.mark.asyncio
+    async def test_refresh_uses_high_water_mark(self, db_session, company):
+        """Test that later fetches only ask for articles newer than the latest stored."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([article(1, 5), article(2, 1)])
+        
+        await repository.refresh_company(db_session, company)
+        await repository.refresh_company(db_session, company, force=True)
+        
+        newest = repository.latest_published_at(db_session, company.id)
+        assert repository.aggregator.calls[1] == newest
+    
+    @pytest.mark.asyncio
+    async def test_refresh_is_throttled(self, db_session, company):
+        """Test that unforced refreshes within the interval do not hit the API."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([article(1, 1)])
+        
+        await repository.refresh_company(db_session, company)
+        await repository.refresh_company(db_session, company)
+        
+        assert len(repository.aggregator.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_throttled_too(self, db_session, company):
+        """Test that an unreachable news API is not retried on every read."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([])
+        
+        async def unavailable(company_name, since, page_size=50):
+            repository.aggregator.calls.append(since)
+            return None
+        repository.aggregator.fetch_company_articles = unavailable
+        
+        assert await repository.refresh_company(db_session, company) == 0
+        assert await repository.refresh_company(db_session, company) == 0
+        assert len(repository.aggregator.calls) == 1
+    
+    @pytest.mark.asyncio
+    async def test_async_refresh_stores_through_the_request_session(self, async_db_session, db_session, company):
+        """Test that handlers can refresh over their AsyncSession."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([article(1, 3), article(2, 2)])
+        
+        assert await repository.refresh_company_async(async_db_session, company) == 2
+        assert db_session.query(NewsArticle).count() == 2
+    
+    @pytest.mark.asyncio
+    async def test_recent_articles_window(self, db_session, company):
+        """Test that reads honor days_back and order newest first."""
+        repository = NewsRepository()
+        repository.aggregator = FakeAggregator([article(1, 10), article(2, 3), article(3, 1)])
+        await repository.refresh_company(db_session, company)
+        
+        articles = repository.recent_articles(db_session, company.id, days_back=7)
+        
+        assert [a['title'] for a in articles] == ['Article 3', 'Article 2']
@@ -0,0 +1,135 @@
+"""
+Unit tests for the vectorized portfolio risk scorer.
+Demonstrates: Testing NumPy code against a scalar reference, time-series fixtures
+"""
+
+from datetime import datetime, timedelta
+import time
+
+import numpy as np
+import pytest
+
+from app.models import Company, Metric
+from app.services.risk_engine import PortfolioRiskScorer, risk_level
+
+
+def reference_score(runway, burn, arr, employees, growth) -> int:
+    """Scalar transcription of ENHANCED_RISK_ALGORITHM.md."""
+    if runway is None:
+        runway_points = 50
+    elif runway < 3:
+        runway_points = 100
+    elif runway < 6:
+        runway_points = 80
+    elif runway < 12:
+        runway_points = 60
+    elif runway < 18:
+        runway_points = 30
+    else:
+        runway_points = 10
+    
+    if not burn:
+        burn_points = 20
+    elif not arr:
+        burn_points = 100
+    elif burn > arr / 12:
+        burn_points = 100
+    elif burn > arr / 24:
+        burn_points = 60
+    else:
+        burn_points = 20
+    
+    if growth is None:
+        growth_points = 50
+    elif growth < -0.02:
+        growth_points = 80
+    elif growth <= 0.02:
+        growth_points = 50
+    elif growth < 0.20:
+        growth_points = 30
+    else:
+        growth_points = 10
+    
+    if not employees or arr is None:
+        efficiency_points = 50
+    elif arr / employees < 50_000:
+        efficiency_points = 80
+    elif arr / employees <= 100_000:
+        efficiency_points = 50
+    else:
+        efficiency_points = 20
+    
+    return round(runway_points * 0.4 + burn_points * 0.3 + growth_points * 0.2 + efficiency_points * 0.1)
+
+
+class TestPortfolioRiskScorer:
+    """Test cases for PortfolioRiskScorer."""
+    
+    def test_matches_reference_model(self):
+        """Test the vectorized pass against the scalar reference on random portfolios."""
+        rng = np.random.default_rng(42)
+        n = 500
+        runway = rng.integers(0, 36, n).astype(float)
+        burn = rng.uniform(0, 500_000, n)
+        arr = rng.uniform(0, 20_000_000, n)
+        employees = rng.integers(1, 200, n).astype(float)
+        growth = rng.uniform(-0.5, 1.0, n)
+        runway[::7] = np.nan
+        growth[::5] = np.nan
+        
+        scores = PortfolioRiskScorer().score_arrays(runway, burn, arr, employees, growth)["risk_score"]
+        
+        for i in range(n):
+            expected = reference_score(
+                None if np.isnan(runway[i]) else runway[i],
+                burn[i], arr[i], employees[i],
+                None if np.isnan(growth[i]) else growth[i]
+            )
+            assert scores[i] == expected
+    
+    def test_documented_example(self):
+        """Test the PayFlow Secure example inputs."""
+        scores = PortfolioRiskScorer().score_arrays(
+            np.array([10.0]), np.array([95_000.0]), np.array([980_000.0]),
+            np.array([18.0]), np.array([np.nan])
+        )
+        
+        assert scores["runway"][0] == 60
+        assert scores["efficiency"][0] == 50
+        assert risk_level(int(scores["risk_score"][0])) == "High"
+    
+    def test_scores_large_portfolio_quickly(self):
+        """Test that tens of thousands of companies score in well under a second."""
+        n = 50_000
+        rng = np.random.default_rng(0)
+        start = time.perf_counter()
+        PortfolioRiskScorer().score_arrays(
+            rng.uniform(0, 36, n), rng.uniform(0, 1e6, n), rng.uniform(0, 5e7, n),
+            rng.uniform(1, 500, n), rng.uniform(-1, 2, n)
+        )
+        assert time.perf_counter() - start < 0.5
+    
+    def test_score_portfolio_uses_metric_growth(self, db_session):
+        """Test that growth is derived from the revenue series."""
+        growing = Company(name="Growing", runway_months=24, monthly_burn_rate=10_000,
+                          current_arr=5_000_000, employee_count=20)
+        flat = Company(name="Flat", runway_months=24, monthly_burn_rate=10_000,
+                       current_arr=5_000_000, employee_count=20)
+        db_session.add_all([growing, flat])
+        db_session.commit()
+        
+        now = datetime.utcnow()
+        for months_ago, growing_value in [(9, 300_000), (6, 350_000), (1, 450_000)]:
+            recorded = now - timedelta(days=30 * months_ago)
+            db_session.add(Metric(company_id=growing.id, metric_type="revenue", metric_name="MRR",
+                                  metric_value=growing_value, recorded_at=recorded))
+            db_session.add(Metric(company_id=flat.id, metric_type="revenue", metric_name="MRR",
+                                  metric_value=400_000, recorded_at=recorded))
+        db_session.commit()
+        
+        results = {r["company_name"]: r for r in PortfolioRiskScorer().score_portfolio(db_session)}
+        
+        assert results["Growing"]["growth_rate"] == pytest.approx(0.5)
+        assert results["Growing"]["factors"]["growth"] == 10
+        assert results["Flat"]["factors"]["growth"] == 50
+        assert results["Growing"]["risk_score"] < results["Flat"]["risk_score"]
@@ -0,0 +1,121 @@
+"""
+Unit tests for opt-in request profiling.
+Demonstrates: Sampling attribution, overlapping await accounting, profile files
+"""
+
+from types import SimpleNamespace
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.core.profiling import ProfileSession, profiled_await
+from app.services.ai_engine import llm_analyzer
+from app.services.ai_engine.response_cache import LLMResponseCache
+
+
+def spin(seconds):
+    """Hold the event loop, so the sampler sees this frame."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SlowCompletions:
+    """Stands in for openai.chat.completions: waits, then burns CPU."""
+    
+    async def create(self, **kwargs):
+        await asyncio.sleep(0.05)
+        spin(0.05)
+        message = SimpleNamespace(content="Summary")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """Profiling enabled by header, writing to a temporary directory."""
+    monkeypatch.setattr("app.core.config.settings.PROFILING_TOKEN", "secret")
+    monkeypatch.setattr("app.core.config.settings.PROFILING_OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr("app.core.config.settings.PROFILING_INTERVAL_MS", 1.0)
+    return tmp_path
+
+
+class TestAwaitAccounting:
+    """Test cases for the per-category await timers."""
+    
+    @pytest.mark.asyncio
+    async def test_overlapping_awaits_count_once(self):
+        """Test that concurrent calls add their union, not their sum."""
+        session = ProfileSession(SimpleNamespace(method="GET", url=SimpleNamespace(path="/")), "header", None)
+        
+        async def call():
+            with session.awaiting("llm"):
+                await asyncio.sleep(0.05)
+        
+        await asyncio.gather(call(), call())
+        
+        assert session.calls["llm"] == 2
+        assert 0.05 <= session.seconds["llm"] < 0.09
+    
+    @pytest.mark.asyncio
+    async def test_decorator_is_transparent_without_a_session(self):
+        """Test that unprofiled calls and generators behave as before."""
+        @profiled_await("news")
+        async def fetch():
+            return 42
+        
+        @profiled_await("llm")
+        async def tokens():
+            yield "a"
+            yield "b"
+        
+        assert await fetch() == 42
+        assert [token async for token in tokens()] == ["a", "b"]
+
+
+class TestRequestProfiling:
+    """Test cases for profiling requests end to end."""
+    
+    def test_requests_are_not_profiled_by_default(self, client, profiling):
+        """Test that requests without the header leave no trace."""
+        response = client.get("/api/companies")
+        
+        assert "X-Profile-Id" not in response.headers
+        assert list(profiling.iterdir()) == []
+    
+    def test_wrong_token_is_ignored(self, client, profiling):
+        """Test that only the configured token enables profiling."""
+        response = client.get("/api/companies", headers={"X-Profile": "guess"})
+        
+        assert "X-Profile-Id" not in response.headers
+    
+    def test_profile_breaks_down_sql_llm_and_cpu(self, client, profiling, monkeypatch):
+        """Test the written breakdown and collapsed stacks of an insights call."""
+        monkeypatch.setattr(llm_analyzer, "openai_client", SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions())))
+        monkeypatch.setattr(llm_analyzer, "cache", LLMResponseCache(InMemoryCache(max_entries=16), ttl=60))
+        company_id = client.post("/api/companies", json={"name": "Acme"}).json()["id"]
+        
+        response = client.get(f"/api/companies/{company_id}/insights", headers={"X-Profile": "secret"})
+        
+        profile_id = response.headers["X-Profile-Id"]
+        assert "llm;dur=" in response.headers["Server-Timing"]
+        breakdown = json.loads(next(profiling.glob(f"*{profile_id}.json")).read_text())
+        assert breakdown["route"] == "/api/companies/{company_id}/insights"
+        assert breakdown["status"] == 200
+        assert breakdown["sql"]["queries"] >= 1
+        assert breakdown["llm"]["calls"] >= 1
+        assert breakdown["llm"]["seconds"] >= 0.1
+        stacks = next(profiling.glob(f"*{profile_id}.collapsed")).read_text()
+        assert "test_profiling:spin" in stacks
+    
+    def test_old_profiles_are_pruned(self, client, profiling, monkeypatch):
+        """Test that the output directory keeps at most PROFILING_MAX_FILES profiles."""
+        monkeypatch.setattr("app.core.config.settings.PROFILING_MAX_FILES", 2)
+        
+        for _ in range(4):
+            client.get("/health", headers={"X-Profile": "secret"})
+        
+        assert len(list(profiling.glob("*.json"))) == 2
+        assert len(list(profiling.glob("*.collapsed"))) == 2
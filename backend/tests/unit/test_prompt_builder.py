@@ -0,0 +1,141 @@
+"""
+Unit tests for token-budget-aware prompt assembly.
+Demonstrates: Deterministic fake encodings, ranking and packing under a budget
+"""
+
+from datetime import datetime, timedelta
+
+from app.services.ai_engine.prompt_builder import (
+    METRICS_MARKER, NEWS_MARKER, PromptBuilder, TokenCounter, rank_metrics, rank_news
+)
+
+NOW = datetime.utcnow()
+TEMPLATE = f"Company: Acme\nMetrics:\n{METRICS_MARKER}\nNews:\n{NEWS_MARKER}\nSummarize."
+
+
+class WordEncoding:
+    """Stands in for a tiktoken encoding: one token per word, counting calls."""
+    
+    name = "words"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def encode(self, text, disallowed_special=()):
+        self.calls += 1
+        return text.split()
+
+
+def make_builder():
+    encoding = WordEncoding()
+    counter = TokenCounter(max_entries=100)
+    counter.encoding = lambda model: encoding
+    return PromptBuilder(counter), encoding
+
+
+def article(title, days_ago, sentiment="neutral"):
+    return {"title": title, "published_at": (NOW - timedelta(days=days_ago)).isoformat(),
+            "source": "Wire", "sentiment": sentiment}
+
+
+class TestRanking:
+    """Test cases for choosing what is worth including first."""
+    
+    def test_latest_value_per_metric_with_change(self):
+        """Test one line per metric, key metrics first, with the change from the previous reading."""
+        metrics = [
+            {"metric_name": "NPS", "metric_value": 40},
+            {"metric_name": "burn_rate", "metric_type": "burn_rate", "metric_value": 90_000.0, "metric_unit": "USD"},
+            {"metric_name": "burn_rate", "metric_type": "burn_rate", "metric_value": 100_000.0, "metric_unit": "USD"},
+            {"metric_name": "burn_rate", "metric_type": "burn_rate", "metric_value": 80_000.0, "metric_unit": "USD"},
+        ]
+        
+        latest, history = rank_metrics(metrics)
+        
+        assert latest == ["- burn_rate: 90,000 USD (previous 100,000, -10.0%)", "- NPS: 40"]
+        assert history == ["- burn_rate: 80,000 USD"]
+    
+    def test_news_is_deduplicated_and_ranked(self):
+        """Test that recent, non-neutral, distinct articles come first."""
+        news = [
+            article("Old neutral", 10),
+            article("Fresh neutral", 1),
+            article("Layoffs announced", 2, "negative"),
+            article("layoffs announced", 2, "negative"),
+        ]
+        
+        lines = rank_news(news, now=NOW)
+        
+        assert [line.split(" (")[0] for line in lines] == ["- Layoffs announced", "- Fresh neutral", "- Old neutral"]
+
+
+class TestPromptBuilder:
+    """Test cases for packing sections into a token budget."""
+    
+    def test_everything_fits_under_a_large_budget(self):
+        """Test that nothing is dropped when there is room."""
+        builder, _ = make_builder()
+        
+        prompt = builder.build("gpt-4", TEMPLATE, metrics=[{"metric_name": "ARR", "metric_value": 5}],
+                               news=[article("Launch", 1)], budget=500)
+        
+        assert "- ARR: 5" in prompt
+        assert "- Launch" in prompt
+        assert builder.omitted_lines == 0
+    
+    def test_prompt_stays_within_budget(self):
+        """Test that low-ranked lines are dropped to respect the budget."""
+        builder, encoding = make_builder()
+        news = [article(f"Story number {i} about the company", i) for i in range(30)]
+        
+        prompt = builder.build("gpt-4", TEMPLATE, news=news, system_prompt="You are an analyst.", budget=60)
+        
+        assert len(encoding.encode(prompt)) + 4 <= 60
+        assert "Story number 0 " in prompt
+        assert "Story number 29 " not in prompt
+        assert builder.omitted_lines > 0
+    
+    def test_sections_report_omission(self):
+        """Test the placeholder text when data exists but nothing fits."""
+        builder, _ = make_builder()
+        
+        prompt = builder.build("gpt-4", TEMPLATE, metrics=[], news=[article("A long headline " * 10, 1)], budget=20)
+        
+        assert "No recent metrics available" in prompt
+        assert "News omitted to fit the token budget" in prompt
+    
+    def test_article_token_counts_are_cached(self):
+        """Test that repeated articles are not re-tokenized."""
+        builder, encoding = make_builder()
+        news = [article("Launch", 1), article("Funding", 2)]
+        
+        builder.build("gpt-4", TEMPLATE, news=news, budget=500)
+        calls = encoding.calls
+        builder.build("gpt-4", TEMPLATE, news=news, budget=500)
+        
+        # Only the fixed text and the final prompt are counted again
+        assert encoding.calls - calls == 2
+        assert builder.counter.stats()["hits"] == 2
+    
+    def test_budget_comes_from_the_model(self, monkeypatch):
+        """Test per-model budgets with a default for unknown models."""
+        monkeypatch.setattr("app.core.config.settings.LLM_PROMPT_TOKEN_BUDGETS", {"gpt-4": 900})
+        monkeypatch.setattr("app.core.config.settings.LLM_PROMPT_TOKEN_BUDGET_DEFAULT", 300)
+        
+        assert PromptBuilder.budget_for("gpt-4") == 900
+        assert PromptBuilder.budget_for("claude-3-haiku") == 300
+
+
+class TestTokenCounter:
+    """Test cases for the tiktoken wrapper."""
+    
+    def test_estimates_when_encodings_are_unavailable(self, monkeypatch):
+        """Test the byte-based estimate when tiktoken cannot load an encoding."""
+        def unavailable(name):
+            raise OSError("offline")
+        
+        monkeypatch.setattr("tiktoken.encoding_for_model", unavailable)
+        counter = TokenCounter()
+        
+        assert counter.count("x" * 40, "gpt-4") == 10
+        assert counter.stats()["encoding"] == "estimate"
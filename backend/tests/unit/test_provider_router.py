@@ -0,0 +1,215 @@
+"""
+Unit tests for latency-aware LLM provider routing.
+Demonstrates: Offline fake providers, failover, hedged requests, rolling windows
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.core.config import Settings
+from app.services.ai_engine.fake_providers import FakeAnthropicClient, FakeOpenAIClient, LatencyProfile
+from app.services.ai_engine.llm_analyzer import LLMAnalyzer
+from app.services.ai_engine.provider_router import NoRouteAvailable, ProviderRouter, Route, RouteStats
+from app.services.ai_engine.response_cache import LLMResponseCache
+
+FAST = Route("fast", "a")
+SLOW = Route("slow", "b")
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    """Small sample thresholds so a few calls make a route measured."""
+    monkeypatch.setattr("app.core.config.settings.LLM_ROUTER_MIN_SAMPLES", 3)
+    monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_MIN_DELAY_MS", 10.0)
+    monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_ENABLED", True)
+
+
+def make_router():
+    return ProviderRouter({"summary": [str(SLOW), str(FAST)]})
+
+
+def warm(router, route, seconds, count=5, error=False):
+    for _ in range(count):
+        router.route_stats(route).record(seconds, error=error)
+
+
+def fake_call(router, delays, fail=()):
+    """A call that sleeps per route and records its latency like a provider call."""
+    async def call(route):
+        with router.observe(route):
+            await asyncio.sleep(delays[route])
+            if route in fail:
+                raise TimeoutError(f"{route} timed out")
+            return f"answer from {route}"
+    return call
+
+
+def make_analyzer(openai_profile, anthropic_profile):
+    analyzer = LLMAnalyzer()
+    analyzer.openai_client = FakeOpenAIClient(openai_profile)
+    analyzer.anthropic_client = FakeAnthropicClient(anthropic_profile)
+    analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=64), ttl=60)
+    analyzer.router = ProviderRouter()
+    return analyzer
+
+
+class TestRouteSelection:
+    """Test cases for ordering candidates by health and latency."""
+    
+    def test_unmeasured_routes_keep_configured_order(self, routing):
+        """Test that the configured preference holds until stats exist."""
+        assert make_router().candidates("summary") == [SLOW, FAST]
+    
+    def test_fastest_healthy_route_first(self, routing):
+        """Test that measured routes are ordered by median latency."""
+        router = make_router()
+        warm(router, SLOW, 0.8)
+        warm(router, FAST, 0.2)
+        
+        assert router.candidates("summary") == [FAST, SLOW]
+    
+    def test_failing_route_goes_last(self, routing):
+        """Test that a route above the error-rate limit is only a last resort."""
+        router = make_router()
+        warm(router, SLOW, 0.8)
+        warm(router, FAST, 0.2, error=True)
+        
+        assert not router.healthy(FAST)
+        assert router.candidates("summary") == [SLOW, FAST]
+    
+    def test_unavailable_providers_are_skipped(self, routing):
+        """Test that routes without a configured client are never chosen."""
+        router = make_router()
+        
+        assert router.candidates("summary", lambda provider: provider == "fast") == [FAST]
+        with pytest.raises(NoRouteAvailable):
+            asyncio.run(router.run("summary", fake_call(router, {}), lambda provider: False))
+    
+    def test_errors_age_out_of_the_window(self):
+        """Test that old samples leave the rolling window."""
+        stats = RouteStats(window_seconds=60, max_samples=100)
+        now = time.monotonic()
+        stats.record(0.5, error=True, now=now - 120)
+        stats.record(0.3, error=False, now=now)
+        
+        summary = stats.summary(now=now)
+        
+        assert summary["calls"] == 1
+        assert summary["error_rate"] == 0.0
+
+
+class TestFailoverAndHedging:
+    """Test cases for running a task across routes."""
+    
+    @pytest.mark.asyncio
+    async def test_error_fails_over_to_next_route(self, routing):
+        """Test that a failing first route is retried on the next one."""
+        router = make_router()
+        
+        result, route = await router.run("summary", fake_call(router, {SLOW: 0, FAST: 0}, fail={SLOW}))
+        
+        assert route == FAST
+        assert result == "answer from fast:a"
+        assert router.stats()["failovers"] == 1
+        assert router.stats()["routes"]["slow:b"]["error_rate"] == 1.0
+    
+    @pytest.mark.asyncio
+    async def test_every_route_failing_raises_the_last_error(self, routing):
+        """Test that callers see the error when no route succeeds."""
+        router = make_router()
+        
+        with pytest.raises(TimeoutError, match="fast:a"):
+            await router.run("summary", fake_call(router, {SLOW: 0, FAST: 0}, fail={SLOW, FAST}))
+    
+    @pytest.mark.asyncio
+    async def test_slow_call_is_hedged_after_its_p95(self, routing):
+        """Test that the next route is asked once the first exceeds its p95, and wins."""
+        router = make_router()
+        warm(router, SLOW, 0.01)
+        
+        start = time.perf_counter()
+        result, route = await router.run("summary", fake_call(router, {SLOW: 2.0, FAST: 0.01}))
+        
+        assert route == FAST
+        assert time.perf_counter() - start < 0.5
+        assert router.stats()["hedges"] == 1
+        assert router.stats()["hedge_wins"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_a_known_p95(self, routing):
+        """Test that an unmeasured route is waited for rather than hedged."""
+        router = make_router()
+        
+        result, route = await router.run("summary", fake_call(router, {SLOW: 0.05, FAST: 0.01}))
+        
+        assert route == SLOW
+        assert router.stats()["hedges"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_hedging_can_be_disabled(self, routing, monkeypatch):
+        """Test that LLM_HEDGE_ENABLED turns hedging off."""
+        monkeypatch.setattr("app.core.config.settings.LLM_HEDGE_ENABLED", False)
+        router = make_router()
+        warm(router, SLOW, 0.01)
+        
+        result, route = await router.run("summary", fake_call(router, {SLOW: 0.1, FAST: 0.01}))
+        
+        assert route == SLOW
+    
+    def test_hedging_is_opt_in(self):
+        """Test that hedging, which can pay for two calls, is off unless configured."""
+        assert Settings.model_fields["LLM_HEDGE_ENABLED"].default is False
+
+
+class TestAnalyzerWithFakeProviders:
+    """Test cases for the analyzer routed over offline fake providers."""
+    
+    @pytest.mark.asyncio
+    async def test_failing_provider_falls_over_instead_of_mocking(self, routing):
+        """Test that a failing GPT-4 is replaced by Claude rather than the mock summary."""
+        analyzer = make_analyzer(LatencyProfile(median_ms=1, error_rate=1.0, seed=1), LatencyProfile(median_ms=1, seed=2))
+        
+        summary = await analyzer.generate_executive_summary({"name": "Acme"}, metrics=[], news=[])
+        
+        assert summary["model_used"] == "claude-3-sonnet"
+        assert "Fake claude-3-sonnet-20240229 analysis" in summary["summary"]
+    
+    @pytest.mark.asyncio
+    async def test_fake_replies_parse_as_batched_risk_scores(self, routing):
+        """Test that the fake providers answer batched risk prompts in the expected format."""
+        analyzer = make_analyzer(LatencyProfile(median_ms=1, seed=1), LatencyProfile(median_ms=1, seed=2))
+        items = [
+            {"company_data": {"name": name, "runway_months": 12}, "metrics": [], "alerts": []}
+            for name in ("A", "B", "C")
+        ]
+        
+        results, requests = await analyzer.assess_risk_scores(items, batch_size=10)
+        
+        assert all(0 <= r["risk_score"] <= 100 and not r["batch_fallback"] for r in results)
+        assert analyzer.anthropic_client.profile.calls == 1
+        assert requests == 1
+    
+    @pytest.mark.asyncio
+    async def test_streams_skip_a_provider_that_fails_before_the_first_token(self, routing):
+        """Test that the summary stream moves on to the next route."""
+        analyzer = make_analyzer(LatencyProfile(median_ms=1, error_rate=1.0, seed=1), LatencyProfile(median_ms=1, seed=2))
+        
+        events = [event async for event in analyzer.stream_executive_summary({"name": "Acme"}, metrics=[], news=[])]
+        
+        assert events[-1]["type"] == "done"
+        assert events[-1]["model_used"] == "claude-3-sonnet"
+    
+    @pytest.mark.asyncio
+    async def test_streams_feed_the_route_stats(self, routing):
+        """Test that streamed summaries are timed into their routes like other calls."""
+        analyzer = make_analyzer(LatencyProfile(median_ms=1, error_rate=1.0, seed=1), LatencyProfile(median_ms=1, seed=2))
+        
+        [event async for event in analyzer.stream_executive_summary({"name": "Acme"}, metrics=[], news=[])]
+        routes = analyzer.router.stats()["routes"]
+        
+        assert routes["openai:gpt-4"]["error_rate"] == 1.0
+        assert routes["anthropic:claude-3-sonnet-20240229"]["calls"] == 1
+        assert routes["anthropic:claude-3-sonnet-20240229"]["error_rate"] == 0.0
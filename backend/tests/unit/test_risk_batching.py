@@ -0,0 +1,150 @@
+"""
+Unit tests for batched multi-company risk assessment.
+Demonstrates: Parsing per-company blocks, validation, fallback to single calls
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.services.ai_engine.llm_analyzer import LLMAnalyzer
+from app.services.ai_engine.response_cache import LLMResponseCache
+
+
+def block(ref, score, factors="Short runway"):
+    return f"COMPANY: {ref}\nRISK_SCORE: {score}\nFACTORS: {factors}\nCONFIDENCE: medium\nEND\n"
+
+
+class FakeMessages:
+    """Stands in for anthropic.messages: batched prompts get `reply`, single prompts a fixed score."""
+    
+    def __init__(self, reply="", fail=False):
+        self.reply = reply
+        self.fail = fail
+        self.prompts = []
+    
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        self.prompts.append(prompt)
+        if "COMPANY 1:" not in prompt:
+            text = "RISK_SCORE: 42\nFACTORS: Single call"
+        elif self.fail:
+            raise TimeoutError("provider timed out")
+        else:
+            text = self.reply
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], usage=None)
+
+
+def make_analyzer(reply="", fail=False):
+    analyzer = LLMAnalyzer()
+    analyzer.anthropic_client = SimpleNamespace(messages=FakeMessages(reply, fail))
+    analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=64), ttl=60)
+    return analyzer
+
+
+def items(*names):
+    return [
+        {
+            "company_data": {"name": name, "industry": "SaaS", "stage": "Seed", "runway_months": 8,
+                             "monthly_burn_rate": 50_000, "current_arr": 600_000},
+            "metrics": [{"metric_name": "ARR", "metric_value": 600_000}],
+            "alerts": []
+        }
+        for name in names
+    ]
+
+
+class TestRiskBlockParsing:
+    """Test cases for reading per-company blocks out of one response."""
+    
+    def test_blocks_are_keyed_by_company_number(self):
+        """Test that each block carries its own score and analysis."""
+        analyzer = LLMAnalyzer()
+        
+        blocks = analyzer._parse_risk_blocks("Here you go:\n" + block(2, 80, "Burn") + block(1, 30), 2)
+        
+        assert blocks[1]["risk_score"] == 30
+        assert blocks[2]["risk_score"] == 80
+        assert "Burn" in blocks[2]["analysis"]
+        assert "COMPANY" not in blocks[1]["analysis"]
+    
+    def test_invalid_blocks_are_dropped(self):
+        """Test that unknown, duplicated, unscored and out-of-range blocks are rejected."""
+        analyzer = LLMAnalyzer()
+        content = block(1, 30) + block(2, 40) + block(2, 45) + block(3, 250) + "COMPANY: 4\nNo score\nEND\n" + block(9, 10)
+        
+        blocks = analyzer._parse_risk_blocks(content, 4)
+        
+        assert list(blocks) == [1]
+    
+    def test_single_score_parsing_rejects_out_of_range(self):
+        """Test that an impossible score falls back to the default."""
+        analyzer = LLMAnalyzer()
+        
+        assert analyzer._parse_risk_score("RISK_SCORE: 73") == 73
+        assert analyzer._parse_risk_score("RISK_SCORE: 130") == 50
+
+
+class TestBatchedAssessment:
+    """Test cases for packing companies into shared requests."""
+    
+    @pytest.mark.asyncio
+    async def test_one_request_scores_the_batch(self):
+        """Test that three companies share one request and keep their order."""
+        analyzer = make_analyzer(reply=block(1, 20) + block(2, 50) + block(3, 90))
+        
+        results, requests = await analyzer.assess_risk_scores(items("A", "B", "C"), batch_size=10)
+        
+        assert [r["risk_score"] for r in results] == [20, 50, 90]
+        assert all(r["batch_size"] == 3 and not r["batch_fallback"] for r in results)
+        assert len(analyzer.anthropic_client.messages.prompts) == 1
+        assert "COMPANY 2: B | Industry: SaaS" in analyzer.anthropic_client.messages.prompts[0]
+        assert analyzer.batching_stats() == {"requests": 1, "companies": 3, "fallbacks": 0}
+        assert requests == 1
+    
+    @pytest.mark.asyncio
+    async def test_missing_blocks_fall_back_to_single_calls(self):
+        """Test that only the companies without a valid block are retried one by one."""
+        analyzer = make_analyzer(reply=block(1, 20) + block(3, 300))
+        
+        results, requests = await analyzer.assess_risk_scores(items("A", "B", "C"), batch_size=10)
+        
+        assert [r["risk_score"] for r in results] == [20, 42, 42]
+        assert [r["batch_fallback"] for r in results] == [False, True, True]
+        assert len(analyzer.anthropic_client.messages.prompts) == 3
+        assert requests == 3
+    
+    @pytest.mark.asyncio
+    async def test_failed_request_falls_back_for_the_whole_batch(self):
+        """Test that a provider error degrades to single calls rather than failing."""
+        analyzer = make_analyzer(fail=True)
+        
+        results, requests = await analyzer.assess_risk_scores(items("A", "B"), batch_size=10)
+        
+        assert [r["risk_score"] for r in results] == [42, 42]
+        assert analyzer.batching_stats()["fallbacks"] == 2
+        # The failed batch request counts as well as the two single calls
+        assert requests == 3
+    
+    @pytest.mark.asyncio
+    async def test_batches_respect_the_size_limit(self):
+        """Test that companies are split into batches of at most `batch_size`."""
+        analyzer = make_analyzer(reply=block(1, 20) + block(2, 30))
+        
+        results, requests = await analyzer.assess_risk_scores(items("A", "B", "C", "D"), batch_size=2)
+        
+        assert [r["risk_score"] for r in results] == [20, 30, 20, 30]
+        assert len(analyzer.anthropic_client.messages.prompts) == 2
+        assert requests == 2
+    
+    @pytest.mark.asyncio
+    async def test_batches_respect_the_token_budget(self, monkeypatch):
+        """Test that a small prompt budget sends companies in smaller batches."""
+        monkeypatch.setattr("app.core.config.settings.LLM_PROMPT_TOKEN_BUDGETS", {"claude-3-sonnet-20240229": 250})
+        analyzer = make_analyzer(reply=block(1, 20) + block(2, 30))
+        
+        _, requests = await analyzer.assess_risk_scores(items("A", "B", "C", "D", "E", "F"), batch_size=10)
+        
+        assert len(analyzer.anthropic_client.messages.prompts) > 1
+        assert requests == len(analyzer.anthropic_client.messages.prompts)
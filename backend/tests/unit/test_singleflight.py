@@ -0,0 +1,139 @@
+"""
+Unit tests for single-flight request coalescing.
+Demonstrates: Async testing, shared futures, cancellation, fake API clients
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.core.cache import InMemoryCache
+from app.core.singleflight import SingleFlight
+from app.services.ai_engine.llm_analyzer import LLMAnalyzer
+from app.services.ai_engine.response_cache import LLMResponseCache
+from app.services.data_aggregator.news_scraper import NewsAggregator
+
+
+class SlowCompletions:
+    """Stands in for openai.chat.completions; slow enough for callers to overlap."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        message = SimpleNamespace(content=f"completion #{self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class TestSingleFlight:
+    """Test cases for the coalescing primitive."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_execution(self):
+        """Test that overlapping calls with one key run the work once."""
+        group = SingleFlight("test")
+        runs = []
+        
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+        
+        results = await asyncio.gather(*(group.do("key", work) for _ in range(5)))
+        
+        assert results == ["result"] * 5
+        assert len(runs) == 1
+        assert group.stats() == {"calls": 5, "executions": 1, "coalesced": 4,
+                                 "coalesce_ratio": 0.8, "in_flight": 0}
+    
+    @pytest.mark.asyncio
+    async def test_sequential_and_distinct_calls_are_not_coalesced(self):
+        """Test that only overlapping calls with equal keys are merged."""
+        group = SingleFlight("test")
+        
+        async def work():
+            await asyncio.sleep(0)
+            return "result"
+        
+        await group.do("a", work)
+        await group.do("a", work)
+        await asyncio.gather(group.do("a", work), group.do("b", work))
+        
+        assert group.executions == 4
+        assert group.coalesced == 0
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Test that a failure is shared and the key is released afterwards."""
+        group = SingleFlight("test")
+        
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider unavailable")
+        
+        results = await asyncio.gather(*(group.do("key", failing) for _ in range(3)), return_exceptions=True)
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert group.stats()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_work(self):
+        """Test that the first caller disconnecting leaves the others their result."""
+        group = SingleFlight("test")
+        
+        async def work():
+            await asyncio.sleep(0.02)
+            return "result"
+        
+        first = asyncio.create_task(group.do("key", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(group.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await second == "result"
+
+
+class TestCoalescedServices:
+    """Test cases for coalescing in the LLM analyzer and news aggregator."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_summaries_make_one_llm_call(self):
+        """Test that analysts opening the same company share one GPT-4 call."""
+        analyzer = LLMAnalyzer()
+        completions = SlowCompletions()
+        analyzer.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        analyzer.cache = LLMResponseCache(InMemoryCache(max_entries=16), ttl=60)
+        analyzer.inflight = SingleFlight("llm")
+        company = {"name": "Acme", "industry": "SaaS", "stage": "Seed"}
+        
+        results = await asyncio.gather(*(analyzer.generate_executive_summary(company, [], []) for _ in range(4)))
+        
+        assert completions.calls == 1
+        assert len({r["summary"] for r in results}) == 1
+        assert analyzer.coalescing_stats()["coalesced"] == 3
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_news_requests_make_one_http_call(self):
+        """Test that duplicate NewsAPI fetches share one round trip."""
+        requests = []
+        
+        async def handler(request):
+            requests.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"articles": [{"title": "Acme raises", "url": "https://x/1"}]})
+        
+        aggregator = NewsAggregator()
+        aggregator.news_api_key = "test-key"
+        aggregator._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        results = await asyncio.gather(*(aggregator.fetch_company_news("Acme") for _ in range(3)))
+        
+        assert len(requests) == 1
+        assert all(r[0]["title"] == "Acme raises" for r in results)
+        assert aggregator.coalescing_stats()["coalesced"] == 2
+        await aggregator.aclose()
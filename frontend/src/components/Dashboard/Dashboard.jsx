@@ -7,13 +7,15 @@ import { useState, useEffect } from 'react';
 import { TrendingUp, AlertTriangle, Building2, Activity } from 'lucide-react';
 import CompanyCard from '../CompanyCard/CompanyCard';
 import AlertPanel from '../AlertPanel/AlertPanel';
-import { companiesAPI, alertsAPI } from '../../services/api';
+import { companiesAPI, alertsAPI, portfolioAPI } from '../../services/api';
 
 const Dashboard = () => {
   const [companies, setCompanies] = useState([]);
   const [alerts, setAlerts] = useState([]);
   const [alertStats, setAlertStats] = useState({});
+  const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [listsLoading, setListsLoading] = useState(true);
   const [error, setError] = useState(null);
   const [sortBy, setSortBy] = useState('risk_score'); // risk_score, current_arr, name
   const [filterIndustry, setFilterIndustry] = useState('all');
@@ -33,21 +35,33 @@ const Dashboard = () => {
       setLoading(true);
       setError(null);
 
-      // Fetch companies and alerts in parallel
-      const [companiesData, alertsData, statsData] = await Promise.all([
+      // Paint the headline numbers from the small precomputed summary first
+      const summaryData = await portfolioAPI.getSummary();
+      setSummary(summaryData);
+      setAlertStats(summaryData.alerts);
+    } catch (err) {
+      console.error('Error fetching dashboard data:', err);
+      setError('Failed to load dashboard data. Please try again.');
+      return;
+    } finally {
+      setLoading(false);
+    }
+
+    // Then fill in the company list and alert feed
+    try {
+      setListsLoading(true);
+      const [companiesData, alertsData] = await Promise.all([
         companiesAPI.getAll(),
         alertsAPI.getAll({ unresolved_only: true, limit: 10 }),
-        alertsAPI.getStats(),
       ]);
 
       setCompanies(companiesData);
       setAlerts(alertsData);
-      setAlertStats(statsData);
     } catch (err) {
-      console.error('Error fetching dashboard data:', err);
+      console.error('Error fetching portfolio lists:', err);
       setError('Failed to load dashboard data. Please try again.');
     } finally {
-      setLoading(false);
+      setListsLoading(false);
     }
   };
 
@@ -73,13 +87,10 @@ const Dashboard = () => {
 
   const displayedCompanies = filteredAndSortedCompanies();
 
-  // Calculate portfolio stats
+  // Portfolio stats come from the server-side summary
   const portfolioStats = {
-    totalCompanies: companies.length,
-    activeCompanies: companies.filter(c => c.is_active).length,
-    avgRiskScore: companies.length > 0 
-      ? Math.round(companies.reduce((sum, c) => sum + c.risk_score, 0) / companies.length)
-      : 0,
+    totalCompanies: summary?.total_companies || 0,
+    avgRiskScore: Math.round(summary?.average_risk_score || 0),
     totalAlerts: alertStats.total_unresolved || 0,
     criticalAlerts: alertStats.critical || 0,
   };
@@ -236,7 +247,12 @@ const Dashboard = () => {
               </div>
             </div>
 
-            {companies.length === 0 ? (
+            {listsLoading ? (
+              <div className="card text-center py-12">
+                <Activity className="w-12 h-12 mx-auto mb-4 text-primary-600 animate-pulse" />
+                <p className="text-gray-600">Loading companies...</p>
+              </div>
+            ) : companies.length === 0 ? (
               <div className="card text-center py-12">
                 <Building2 className="w-12 h-12 mx-auto mb-4 text-gray-400" />
                 <p className="text-gray-600">No companies in portfolio yet.</p>
@@ -61,6 +61,12 @@ export const companiesAPI = {
     return response.data;
   },
 
+  // Get one page of companies; pass nextCursor back as params.cursor
+  getPage: async (params = {}) => {
+    const response = await apiClient.get('/api/companies', { params });
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
   // Get single company
   getById: async (id) => {
     const response = await apiClient.get(`/api/companies/${id}`);
@@ -98,6 +104,25 @@ export const companiesAPI = {
     const response = await apiClient.get(`/api/companies/${id}/insights`);
     return response.data;
   },
+
+  // Stream AI insights token by token (Server-Sent Events)
+  // Returns the EventSource so callers can close() it early
+  streamInsights: (id, { onMeta, onToken, onDone, onError } = {}) => {
+    const source = new EventSource(`${API_BASE_URL}/api/companies/${id}/insights?stream=true`);
+
+    source.addEventListener('meta', (e) => onMeta?.(JSON.parse(e.data)));
+    source.addEventListener('token', (e) => onToken?.(JSON.parse(e.data).text));
+    source.addEventListener('done', (e) => {
+      source.close();
+      onDone?.(JSON.parse(e.data));
+    });
+    source.addEventListener('error', (e) => {
+      source.close();
+      onError?.(e.data ? JSON.parse(e.data) : e);
+    });
+
+    return source;
+  },
 };
 
 /**
@@ -145,6 +170,12 @@ export const alertsAPI = {
     return response.data;
   },
 
+  // Get one page of alerts (newest first); pass nextCursor back as params.cursor
+  getPage: async (params = {}) => {
+    const response = await apiClient.get('/api/alerts', { params });
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
   // Get single alert
   getById: async (id) => {
     const response = await apiClient.get(`/api/alerts/${id}`);
@@ -172,6 +203,17 @@ export const alertsAPI = {
   },
 };
 
+/**
+ * Portfolio API
+ */
+export const portfolioAPI = {
+  // Headline numbers for the dashboard (totals, risk buckets, alert counts, top at-risk)
+  getSummary: async (top = 5) => {
+    const response = await apiClient.get('/api/portfolio/summary', { params: { top } });
+    return response.data;
+  },
+};
+
 /**
  * Health check
  */